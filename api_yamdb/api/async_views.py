@@ -0,0 +1,84 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import URLPattern
+from rest_framework.permissions import SAFE_METHODS
+
+from api_yamdb.metrics import instrument_queries
+
+# Маршруты каталога, которые под ASGI читаются асинхронно.
+ASYNC_READ_ROUTES = (
+    'titles-list', 'titles-detail', 'genres-list', 'categories-list',
+    'reviews-list', 'comments-list',
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_read_executor():
+    """Пул потоков процесса для чтения каталога."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_READ_THREADS,
+                thread_name_prefix='async-read',
+            )
+        return _executor
+
+
+def run_read_view(view, request, *args, **kwargs):
+    """Выполняет синхронную вьюху так, как это делает WSGI-обработчик."""
+    close_old_connections()
+    try:
+        instrument_queries()
+        response = view(request, *args, **kwargs)
+        # Ответ сериализуется здесь, а не в цикле событий.
+        if not getattr(response, 'is_rendered', True):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_read_view(view):
+    """Асинхронная обёртка над вьюхой DRF.
+
+    В Django 3.2 нет асинхронного ORM, поэтому безопасные запросы
+    выполняются в отдельном пуле из ``ASYNC_READ_THREADS`` потоков:
+    цикл событий не ждёт базу, медленный клиент не занимает поток, а
+    чтения не выстраиваются в очередь к единственному потоку, в котором
+    Django по умолчанию выполняет синхронный код под ASGI. Запись идёт
+    прежним путём.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return await sync_to_async(view)(request, *args, **kwargs)
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            get_read_executor(),
+            functools.partial(
+                context.run, run_read_view, view, request, *args, **kwargs
+            ),
+        )
+    return wrapper
+
+
+def async_read_urls(patterns, names=ASYNC_READ_ROUTES):
+    """Заменяет вьюхи маршрутов ``names`` асинхронными обёртками."""
+    return [
+        URLPattern(
+            pattern.pattern, async_read_view(pattern.callback),
+            pattern.default_args, pattern.name,
+        ) if isinstance(pattern, URLPattern) and pattern.name in names
+        else pattern
+        for pattern in patterns
+    ]
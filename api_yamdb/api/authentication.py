@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import TOKEN_VERSION_CACHE_KEY, User
+
+TOKEN_VERSION_CLAIM = 'ver'
+USER_CLAIMS = ('username', 'role', 'is_superuser')
+
+
+class UserClaimsRefreshToken(RefreshToken):
+    """Токен, несущий роль пользователя и версию его токенов."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+
+def get_token_state(user_id):
+    """Актуальные версия токенов и активность пользователя.
+
+    Значение кэшируется; модель пользователя сбрасывает его при изменении
+    полей, вшитых в токен.
+    """
+    key = TOKEN_VERSION_CACHE_KEY.format(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = User.objects.filter(pk=user_id).values_list(
+            'token_version', 'is_active'
+        ).first()
+        if state is None:
+            return None
+        cache.set(key, state, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return state
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без чтения пользователя из базы.
+
+    Пользователь собирается из утверждений токена как экземпляр ``User``
+    с отложенными полями: роль и права проверяются без запросов, а
+    остальные поля догружаются одним запросом при первом обращении.
+    Токены без этих утверждений обрабатываются как раньше.
+    """
+
+    def get_user(self, validated_token):
+        claims = (*USER_CLAIMS, TOKEN_VERSION_CLAIM)
+        if any(claim not in validated_token for claim in claims):
+            return super().get_user(validated_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        state = get_token_state(user_id)
+        if state is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found'
+            )
+        token_version, is_active = state
+        if token_version != validated_token[TOKEN_VERSION_CLAIM]:
+            raise AuthenticationFailed(
+                'Токен отозван.', code='token_revoked'
+            )
+        if not is_active:
+            raise AuthenticationFailed(
+                'Пользователь заблокирован.', code='user_inactive'
+            )
+        loaded = {
+            'id': user_id,
+            'token_version': token_version,
+            'is_active': is_active,
+            **{claim: validated_token[claim] for claim in USER_CLAIMS},
+        }
+        field_names = [
+            field.attname for field in User._meta.concrete_fields
+            if field.attname in loaded
+        ]
+        user = User.from_db(
+            router.db_for_read(User),
+            field_names,
+            [loaded[name] for name in field_names],
+        )
+        user._from_token = True
+        return user
@@ -0,0 +1,219 @@
+from collections.abc import Mapping
+from functools import partial
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils import model_meta
+from rest_framework.validators import UniqueValidator
+
+from api.cache import bump_generation
+from api.fields import PreloadedSlugRelatedField
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """Проверяет и сохраняет пакет объектов за постоянное число запросов.
+
+    Slug связанных объектов разрешаются одним запросом на поле для всего
+    пакета, уникальность полей проверяется одним запросом на поле, а
+    объекты и строки промежуточных таблиц many-to-many вставляются через
+    ``bulk_create`` в одной транзакции. Пакет сохраняется целиком или не
+    сохраняется вовсе; ошибки возвращаются списком по элементам.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            message = self.error_messages['not_a_list'].format(
+                input_type=type(data).__name__
+            )
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [message]},
+                code='not_a_list'
+            )
+        if not data:
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [
+                    self.error_messages['empty']
+                ]},
+                code='empty'
+            )
+        if len(data) > settings.BULK_CREATE_MAX_ITEMS:
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Не больше {} объектов за запрос.'.format(
+                        settings.BULK_CREATE_MAX_ITEMS
+                    )
+                ]},
+                code='max_length'
+            )
+        unique_fields = self.pop_unique_validators()
+        self.preload_related(data)
+        ret = []
+        errors = []
+        for item in data:
+            try:
+                validated = self.child.run_validation(item)
+            except serializers.ValidationError as exc:
+                ret.append(None)
+                errors.append(exc.detail)
+            else:
+                ret.append(validated)
+                errors.append({})
+        self.check_unique(unique_fields, ret, errors)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return ret
+
+    def pop_unique_validators(self):
+        """Снимает с полей поэлементные проверки уникальности."""
+        unique_fields = []
+        for field in self.child.fields.values():
+            validators = [
+                validator for validator in field.validators
+                if isinstance(validator, UniqueValidator)
+            ]
+            if validators:
+                field.validators = [
+                    validator for validator in field.validators
+                    if validator not in validators
+                ]
+                unique_fields.append((field, validators))
+        return unique_fields
+
+    def check_unique(self, unique_fields, validated_data, errors):
+        """Проверяет уникальность по базе и внутри пакета."""
+        for field, validators in unique_fields:
+            values = [
+                attrs.get(field.source) if attrs is not None else None
+                for attrs in validated_data
+            ]
+            for validator in validators:
+                existing = set(validator.queryset.filter(**{
+                    f'{field.source}__in': {
+                        value for value in values if value is not None
+                    }
+                }).values_list(field.source, flat=True))
+                for index, value in enumerate(values):
+                    if value is None:
+                        continue
+                    if value in existing:
+                        errors[index].setdefault(field.field_name, []).append(
+                            serializers.ErrorDetail(
+                                validator.message, code='unique'
+                            )
+                        )
+                    existing.add(value)
+
+    def preload_related(self, data):
+        """Загружает объекты для всех slug пакета одним запросом на поле."""
+        for field in self.child.fields.values():
+            if field.read_only:
+                continue
+            many = isinstance(field, serializers.ManyRelatedField)
+            relation = field.child_relation if many else field
+            if not isinstance(relation, PreloadedSlugRelatedField):
+                continue
+            slugs = set()
+            for item in data:
+                if not isinstance(item, Mapping):
+                    continue
+                value = item.get(field.field_name)
+                if many and isinstance(value, list):
+                    slugs.update(str(slug) for slug in value)
+                elif not many and value is not None:
+                    slugs.add(str(value))
+            relation.preloaded = {
+                str(getattr(obj, relation.slug_field)): obj
+                for obj in relation.get_queryset().filter(
+                    **{f'{relation.slug_field}__in': slugs}
+                )
+            }
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        info = model_meta.get_field_info(model)
+        instances = []
+        links = []
+        for attrs in validated_data:
+            attrs = dict(attrs)
+            many_to_many = {
+                name: attrs.pop(name)
+                for name, relation in info.relations.items()
+                if relation.to_many and name in attrs
+            }
+            instance = model(**attrs)
+            instances.append(instance)
+            links.append(many_to_many)
+
+        using = router.db_for_write(model)
+        through_models = {
+            model._meta.get_field(name).remote_field.through
+            for many_to_many in links for name in many_to_many
+        }
+        # Ключи нужны для связей и для ответа; если база не возвращает их
+        # из пакетной вставки, объекты сохраняются по одному.
+        bulk = (
+            connections[using].features.can_return_rows_from_bulk_insert
+            or not (through_models or 'id' in self.child.fields)
+        )
+        with transaction.atomic(using=using):
+            if bulk:
+                model._default_manager.db_manager(using).bulk_create(
+                    instances
+                )
+                self.bulk_created(instances)
+            else:
+                for instance in instances:
+                    instance.save(force_insert=True, using=using)
+            self.create_links(model, instances, links, using)
+            self.links_created(instances, links, using)
+            # bulk_create не отправляет сигналы, поэтому кэш ответов
+            # сбрасывается здесь.
+            transaction.on_commit(
+                partial(bump_generation, model, *through_models),
+                using=using
+            )
+        return instances
+
+    def create_links(self, model, instances, links, using):
+        """Вставляет строки промежуточных таблиц many-to-many."""
+        rows = {}
+        for instance, many_to_many in zip(instances, links):
+            for name, related in many_to_many.items():
+                field = model._meta.get_field(name)
+                through = field.remote_field.through
+                rows.setdefault(through, []).extend(
+                    through(**{
+                        field.m2m_field_name(): instance,
+                        field.m2m_reverse_field_name(): obj,
+                    })
+                    for obj in dict.fromkeys(related)
+                )
+        for through, objs in rows.items():
+            through._default_manager.db_manager(using).bulk_create(objs)
+
+    def bulk_created(self, instances):
+        """Вызывается после пакетной вставки объектов."""
+
+    def links_created(self, instances, links, using):
+        """Вызывается после вставки объектов и их связей many-to-many.
+
+        ``links`` — связанные объекты по именам полей для каждого объекта.
+        """
+
+
+class BulkCreateMixin:
+    """Принимает в create как один объект, так и список объектов."""
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        self.perform_bulk_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def perform_bulk_create(self, serializer):
+        serializer.save()
@@ -0,0 +1,172 @@
+import datetime as dt
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from api.conditional import get_not_modified_response
+from api.proxy_cache import allow_proxy_cache, purge_proxy_cache
+from api_yamdb.replicas import get_read_database
+
+GENERATION_KEY = 'generation:{}'
+CHANGED_KEY = 'changed:{}'
+MODIFIED_KEY = 'modified:{}'
+RESPONSE_KEY = 'response:{view}:{action}:{role}:{path}:{generations}'
+
+
+def generation_key(model):
+    return GENERATION_KEY.format(model._meta.label_lower)
+
+
+def get_generations(models):
+    """Текущие поколения моделей; отсутствующие счётчики заводятся заново.
+
+    Новый счётчик начинается с отметки времени, а не с нуля, чтобы после
+    вытеснения ключа из кэша не ожить старым ответам.
+    """
+    keys = [generation_key(model) for model in models]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns(), None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def bump_generation(*models):
+    """Делает недействительными все ответы, зависящие от моделей."""
+    for model in models:
+        key = generation_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), None)
+    cache.set_many(
+        {
+            MODIFIED_KEY.format(model._meta.label_lower): time.time()
+            for model in models
+        },
+        None
+    )
+    if settings.DATABASE_REPLICAS and settings.REPLICA_PIN_SECONDS > 0:
+        cache.set_many(
+            {
+                CHANGED_KEY.format(model._meta.label_lower): True
+                for model in models
+            },
+            settings.REPLICA_PIN_SECONDS
+        )
+    purge_proxy_cache(*models)
+
+
+def get_modification_state(models):
+    """``(last_modified, version)`` моделей без запросов к базе.
+
+    Версия — поколения моделей, время — последний ``bump_generation``.
+    Отсутствующая отметка времени заводится текущим моментом: время
+    изменения может оказаться позже настоящего, но не раньше.
+    """
+    generations = get_generations(models)
+    keys = [MODIFIED_KEY.format(model._meta.label_lower) for model in models]
+    stamps = cache.get_many(keys)
+    for key in keys:
+        if key not in stamps:
+            cache.add(key, time.time(), None)
+            stamps[key] = cache.get(key)
+    modified = dt.datetime.fromtimestamp(
+        max(stamps.values()), tz=dt.timezone.utc
+    )
+    return modified, tuple(generations)
+
+
+def changed_recently(models):
+    """Менялись ли модели за время, пока реплики могут отставать."""
+    return bool(cache.get_many([
+        CHANGED_KEY.format(model._meta.label_lower) for model in models
+    ]))
+
+
+def get_request_role(request):
+    """Роль пользователя, от которой может зависеть содержимое ответа."""
+    user = request.user
+    if not user or not user.is_authenticated:
+        return 'anon'
+    if user.is_admin:
+        return 'admin'
+    return user.role
+
+
+class CachedResponseMixin:
+    """Кэширует ответы list и retrieve до изменения зависимых моделей.
+
+    Ключ состоит из пути с параметрами запроса, роли пользователя и
+    поколений моделей из ``cache_dependencies``. Запись в любую из них
+    увеличивает поколение (см. ``api.signals``), и старые ответы больше
+    не находятся. Ответы анонимным клиентам может кэшировать и nginx
+    (см. ``api.proxy_cache``).
+    """
+
+    cache_dependencies = ()
+    cached_headers = ('ETag', 'Last-Modified')
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_response_cache_key(self, request):
+        path = hashlib.md5(
+            request.get_full_path().encode()
+        ).hexdigest()
+        generations = get_generations(self.cache_dependencies)
+        return RESPONSE_KEY.format(
+            view=self.basename,
+            action=self.action,
+            role=get_request_role(request),
+            path=path,
+            generations='.'.join(map(str, generations)),
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            data, headers = cached
+            # Валидаторы сохранены вместе с ответом, поэтому условный
+            # запрос к закэшированному ресурсу не обращается к базе.
+            if headers.get('ETag'):
+                not_modified = get_not_modified_response(
+                    request, headers['ETag'], headers.get('Last-Modified')
+                )
+                if not_modified is not None:
+                    return allow_proxy_cache(
+                        request, not_modified, self.cache_dependencies
+                    )
+            return allow_proxy_cache(
+                request, Response(data, headers=headers),
+                self.cache_dependencies
+            )
+        response = handler(request, *args, **kwargs)
+        # Ответ, прочитанный с реплики сразу после записи, мог не застать
+        # изменений и остался бы в кэше под новым поколением.
+        if response.status_code == 200 and not (
+            get_read_database()
+            and changed_recently(self.cache_dependencies)
+        ):
+            headers = {
+                header: response[header]
+                for header in self.cached_headers if header in response
+            }
+            cache.set(
+                key, (response.data, headers),
+                settings.RESPONSE_CACHE_TIMEOUT
+            )
+            allow_proxy_cache(request, response, self.cache_dependencies)
+        return response
@@ -0,0 +1,67 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+
+def get_not_modified_response(request, etag, last_modified):
+    """Ответ 304, если у клиента актуальная версия ресурса, иначе None."""
+    timestamp = last_modified and parse_http_date_safe(last_modified)
+    return get_conditional_response(
+        request._request, etag=etag, last_modified=timestamp
+    )
+
+
+class ConditionalGetMixin:
+    """Поддержка ETag и Last-Modified для list и retrieve.
+
+    Версия ресурса берётся из ``get_resource_state`` — одного агрегирующего
+    запроса по отметкам изменения строк или поколений моделей в кэше. Если
+    она совпадает с той, что прислал клиент, возвращается 304 без выборки
+    и сериализации данных.
+    """
+
+    def get_resource_state(self):
+        """Возвращает ``(last_modified, version)`` или None.
+
+        None означает, что ресурса нет, и ответ формируется как обычно.
+        """
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_validators(self, request):
+        state = self.get_resource_state()
+        if state is None:
+            return None, None
+        last_modified, version = state
+        digest = hashlib.md5(
+            f'{request.get_full_path()}:{version!r}'.encode()
+        ).hexdigest()
+        return (
+            f'"{digest}"',
+            last_modified and http_date(last_modified.timestamp()),
+        )
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        if etag is not None:
+            not_modified = get_not_modified_response(
+                request, etag, last_modified
+            )
+            if not_modified is not None:
+                return not_modified
+        response = handler(request, *args, **kwargs)
+        if etag is not None and response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = last_modified
+        return response
@@ -0,0 +1,132 @@
+import csv
+from itertools import islice
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+from reviews.models import GenreTitle
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+EXPORT_FIELDS = (
+    'id', 'name', 'year', 'description', 'rating_sum', 'rating_count',
+    'updated_at', 'category__name', 'category__slug',
+)
+CSV_HEADER = (
+    'id', 'name', 'year', 'description', 'category', 'genre', 'rating',
+    'updated_at',
+)
+
+
+class Echo:
+    """Файлоподобный объект, который возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def iter_titles(queryset, chunk_size=None):
+    """Произведения с категорией, жанрами и рейтингом в виде словарей.
+
+    Строки читаются курсором порциями по ``chunk_size``, жанры
+    догружаются одним запросом на порцию, поэтому в памяти не бывает
+    больше одной порции, каким бы большим ни был каталог.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    rows = queryset.order_by('id').values(*EXPORT_FIELDS).iterator(
+        chunk_size=chunk_size
+    )
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        genres = {}
+        links = GenreTitle.objects.using(queryset.db).filter(
+            title_id__in=[row['id'] for row in chunk]
+        ).order_by('id').values_list(
+            'title_id', 'genre_id__name', 'genre_id__slug'
+        )
+        for title_id, name, slug in links:
+            genres.setdefault(title_id, []).append(
+                {'name': name, 'slug': slug}
+            )
+        for row in chunk:
+            yield make_record(row, genres.get(row['id'], []))
+
+
+def make_record(row, genres):
+    category = None
+    if row['category__slug'] is not None:
+        category = {
+            'name': row['category__name'],
+            'slug': row['category__slug'],
+        }
+    # Рейтинг округляется так же, как в TitleListSerializer.
+    rating = None
+    if row['rating_count']:
+        rating = int(row['rating_sum'] / row['rating_count'])
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'year': row['year'],
+        'description': row['description'],
+        'category': category,
+        'genre': genres,
+        'rating': rating,
+        'updated_at': row['updated_at'],
+    }
+
+
+def iter_ndjson(records):
+    encoder = JSONEncoder(ensure_ascii=False)
+    for record in records:
+        yield encoder.encode(record) + '\n'
+
+
+def iter_csv(records):
+    encoder = JSONEncoder()
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for record in records:
+        yield writer.writerow((
+            record['id'],
+            record['name'],
+            record['year'],
+            record['description'],
+            record['category'] and record['category']['slug'],
+            ','.join(genre['slug'] for genre in record['genre']),
+            record['rating'],
+            encoder.default(record['updated_at']),
+        ))
+
+
+def can_stream(request):
+    """Можно ли отдать запросу поток, который читает базу.
+
+    Под ASGI это умеет только обработчик из ``api_yamdb.asgi``:
+    стандартный обработчик Django 3.2 читает поток в цикле событий, где
+    запросы к базе запрещены.
+    """
+    return (not isinstance(request, ASGIRequest)
+            or getattr(request, 'streams_in_thread', False))
+
+
+def export_response(queryset, output):
+    """Потоковый ответ с выгрузкой произведений в формате ``output``.
+
+    Поток читается уже после выхода из вьюхи, поэтому отдавать его можно
+    только там, где это позволяет ``can_stream``.
+    """
+    records = iter_titles(queryset)
+    content = iter_csv(records) if output == 'csv' else iter_ndjson(records)
+    response = StreamingHttpResponse(
+        content, content_type=f'{EXPORT_FORMATS[output]}; charset=utf-8'
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="titles.{output}"'
+    )
+    return response
@@ -0,0 +1,51 @@
+from rest_framework import serializers
+
+
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """``SlugRelatedField``, который ищет объект среди заранее загруженных.
+
+    Массовое создание (см. ``api.bulk``) загружает объекты для всех slug
+    пакета одним запросом и кладёт их в ``preloaded``; без этого поле
+    работает как обычное.
+    """
+
+    preloaded = None
+
+    def to_internal_value(self, data):
+        if self.preloaded is None:
+            return super().to_internal_value(data)
+        try:
+            return self.preloaded[str(data)]
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=str(data))
+
+
+class SlugManyRelatedField(serializers.ManyRelatedField):
+    """Список slug, который разрешается в объекты одним запросом.
+
+    Стандартный ``SlugRelatedField(many=True)`` выполняет отдельный запрос
+    на каждый элемент списка.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        slug_field = self.child_relation.slug_field
+        slugs = [str(slug) for slug in data]
+        objects = getattr(self.child_relation, 'preloaded', None)
+        if objects is None:
+            objects = {
+                getattr(obj, slug_field): obj
+                for obj in self.child_relation.get_queryset().filter(
+                    **{f'{slug_field}__in': slugs}
+                )
+            }
+        for slug in slugs:
+            if slug not in objects:
+                self.child_relation.fail(
+                    'does_not_exist', slug_name=slug_field, value=slug
+                )
+        return [objects[slug] for slug in slugs]
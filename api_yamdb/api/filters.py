@@ -1,20 +1,109 @@
 import django_filters
+from django.db.models import Count
 
-from reviews.models import Title
+from reviews import ranking
+from reviews.models import Category, Genre, GenreTitle, Title
+
+GENRE_MODE_ANY = 'or'
+GENRE_MODE_ALL = 'and'
+GENRE_MODES = (
+    (GENRE_MODE_ANY, 'Любой из жанров'),
+    (GENRE_MODE_ALL, 'Все жанры'),
+)
+ORDERINGS = (
+    ('rank', 'По байесовскому рейтингу'),
+    ('trending', 'По популярности за последнее время'),
+)
 
 
 class TitleFilter(django_filters.FilterSet):
-    """Класс, фильтрующий различные поля модели."""
+    """Класс, фильтрующий различные поля модели.
+
+    Все условия, кроме поиска по подстроке в названии, сравнивают значения
+    целиком, чтобы запрос мог использовать индексы по году и slug.
+    """
 
-    category = django_filters.CharFilter(field_name='category__slug',
-                                         lookup_expr='contains')
-    genre = django_filters.CharFilter(field_name='genre__slug',
-                                      lookup_expr='contains')
+    category = django_filters.CharFilter(field_name='category__slug')
+    genre = django_filters.CharFilter(method='filter_genre')
+    genre_mode = django_filters.ChoiceFilter(
+        choices=GENRE_MODES, method='filter_genre_mode'
+    )
     name = django_filters.CharFilter(field_name='name',
                                      lookup_expr='contains')
-    year = django_filters.NumberFilter(field_name='year',
-                                       lookup_expr='contains')
+    year = django_filters.NumberFilter(field_name='year')
+    year_min = django_filters.NumberFilter(field_name='year',
+                                           lookup_expr='gte')
+    year_max = django_filters.NumberFilter(field_name='year',
+                                           lookup_expr='lte')
+    search = django_filters.CharFilter(method='filter_search')
+    prefix = django_filters.CharFilter(method='filter_prefix')
+    # Порядок применяется последним и заменяет порядок поиска.
+    ordering = django_filters.ChoiceFilter(
+        choices=ORDERINGS, method='filter_ordering'
+    )
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year')
+        fields = ('category', 'genre', 'genre_mode', 'name', 'year',
+                  'year_min', 'year_max', 'search', 'prefix', 'ordering')
+
+    def get_genre_slugs(self):
+        """Slug жанров из повторяющихся параметров или через запятую."""
+        getlist = getattr(self.data, 'getlist', None)
+        values = getlist('genre') if getlist else [self.data.get('genre')]
+        return list(dict.fromkeys(
+            slug.strip()
+            for value in values if value
+            for slug in value.split(',') if slug.strip()
+        ))
+
+    def filter_genre(self, queryset, name, value):
+        """Жанры по точному slug: ``genre_mode=or`` — любой, ``and`` — все."""
+        slugs = self.get_genre_slugs()
+        if not slugs:
+            return queryset
+        links = GenreTitle.objects.filter(genre_id__slug__in=slugs)
+        mode = self.form.cleaned_data.get('genre_mode') or GENRE_MODE_ANY
+        if mode == GENRE_MODE_ALL:
+            # Подзапрос идёт от индекса slug жанров и оставляет произведения,
+            # у которых нашлись все запрошенные жанры.
+            links = links.values('title_id').annotate(
+                matched=Count('genre_id', distinct=True)
+            ).filter(matched=len(slugs))
+        return queryset.filter(pk__in=links.values('title_id'))
+
+    def filter_genre_mode(self, queryset, name, value):
+        # Режим только уточняет фильтр genre.
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск с сортировкой по релевантности."""
+        return queryset.search(value)
+
+    def filter_prefix(self, queryset, name, value):
+        """Подсказки по началу названия."""
+        return queryset.typeahead(value)
+
+    def get_ranking_scope(self):
+        """Самая узкая область рейтинга, заданная фильтрами.
+
+        Остальные условия проверяются по ходу обхода индекса области, а
+        область нужна лишь для того, чтобы обходить меньше строк.
+        """
+        category = self.form.cleaned_data.get('category')
+        if category:
+            pk = Category.objects.filter(slug=category).values_list(
+                'pk', flat=True
+            ).first()
+            return ranking.category_scope(pk)
+        slugs = self.get_genre_slugs()
+        if len(slugs) == 1:
+            pk = Genre.objects.filter(slug=slugs[0]).values_list(
+                'pk', flat=True
+            ).first()
+            return ranking.genre_scope(pk)
+        return ranking.SCOPE_ALL
+
+    def filter_ordering(self, queryset, name, value):
+        """Порядок по заранее посчитанному рейтингу без сортировки."""
+        return ranking.ranked(queryset, self.get_ranking_scope(), value)
@@ -0,0 +1,223 @@
+from operator import itemgetter
+
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+
+from api_yamdb.metrics import serializer_timing
+from reviews.models import GenreTitle
+
+# Даты выводятся тем же полем, что и в сериализаторах моделей.
+_datetime_field = serializers.DateTimeField()
+
+
+class LeanSerializer:
+    """Представление объектов для чтения по строкам ``.values()``.
+
+    Повторяет вывод сериализатора модели без механизма полей DRF: из
+    базы выбираются только колонки запрошенных полей, и строки
+    переводятся в словари напрямую. ``fields`` сопоставляет полю вывода
+    нужные ему колонки; значение поля даёт метод ``get_<поле>``, а без
+    него — первая колонка. Связанные данные догружаются в ``prepare``
+    одним запросом на страницу.
+    """
+
+    fields = {}
+    # Колонки, которые выбираются всегда, например ключ пагинации.
+    key_columns = ('id',)
+
+    def __init__(self, context=None, fields=None):
+        self.context = context or {}
+        self.using = None
+        self.selected = tuple(self.fields if fields is None else fields)
+        self.getters = [
+            (name, getattr(self, f'get_{name}', None)
+             or itemgetter(self.fields[name][0]))
+            for name in self.selected
+        ]
+
+    @property
+    def columns(self):
+        return tuple(dict.fromkeys(
+            self.key_columns
+            + tuple(column for name in self.selected
+                    for column in self.fields[name])
+        ))
+
+    def rows(self, queryset):
+        """Выборка нужных колонок вместо объектов модели."""
+        self.using = queryset.db
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def serialize(self, rows):
+        with serializer_timing():
+            rows = list(rows)
+            self.prepare(rows)
+            return [self.to_representation(row) for row in rows]
+
+    def prepare(self, rows):
+        """Догружает связанные данные для всех строк сразу."""
+
+    def to_representation(self, row):
+        return {name: getter(row) for name, getter in self.getters}
+
+
+class CategoryLeanSerializer(LeanSerializer):
+    """Вывод ``CategorySerializer``."""
+
+    fields = {'name': ('name',), 'slug': ('slug',)}
+    key_columns = ()
+
+
+class GenreLeanSerializer(LeanSerializer):
+    """Вывод ``GenreSerializer``."""
+
+    fields = {'name': ('name',), 'slug': ('slug',)}
+    key_columns = ()
+
+
+class TitleLeanSerializer(LeanSerializer):
+    """Вывод ``TitleListSerializer``; жанры — одним запросом на страницу."""
+
+    fields = {
+        'id': ('id',),
+        'genre': (),
+        'category': ('category_id', 'category__name', 'category__slug'),
+        'rating': ('rating_sum', 'rating_count'),
+        'name': ('name',),
+        'year': ('year',),
+        'description': ('description',),
+    }
+
+    def prepare(self, rows):
+        self.genres = {}
+        if not rows or 'genre' not in self.selected:
+            return
+        # Порядок жанров тот же, что у prefetch_related: по Genre.Meta.
+        links = GenreTitle.objects.using(self.using).filter(
+            title_id__in=[row['id'] for row in rows],
+            genre_id__isnull=False,
+        ).order_by('genre_id__name').values_list(
+            'title_id', 'genre_id__name', 'genre_id__slug'
+        )
+        for title_id, name, slug in links:
+            self.genres.setdefault(title_id, []).append(
+                {'name': name, 'slug': slug}
+            )
+
+    def get_genre(self, row):
+        return self.genres.get(row['id'], [])
+
+    def get_category(self, row):
+        if row['category_id'] is None:
+            return None
+        return {'name': row['category__name'], 'slug': row['category__slug']}
+
+    def get_rating(self, row):
+        count = row['rating_count']
+        return int(row['rating_sum'] / count) if count else None
+
+
+class ReviewLeanSerializer(LeanSerializer):
+    """Вывод ``ReviewSerializer``."""
+
+    fields = {
+        'id': ('id',),
+        'title': ('title_id',),
+        'author': ('author__username',),
+        'score': ('score',),
+        'text': ('text',),
+        'pub_date': ('pub_date',),
+    }
+    key_columns = ('id', 'pub_date')
+
+    def get_pub_date(self, row):
+        return _datetime_field.to_representation(row['pub_date'])
+
+
+class CommentLeanSerializer(LeanSerializer):
+    """Вывод ``CommentSerializer``."""
+
+    fields = {
+        'id': ('id',),
+        'author': ('author__username',),
+        'pub_date': ('pub_date',),
+        'text': ('text',),
+    }
+    key_columns = ('id', 'pub_date')
+
+    def get_pub_date(self, row):
+        return _datetime_field.to_representation(row['pub_date'])
+
+
+class LeanReadMixin:
+    """Отдаёт list и retrieve через ``lean_serializer_class``.
+
+    Параметры ``fields`` и ``omit`` (через запятую или повторами)
+    оставляют в ответе только перечисленные поля или убирают их; из базы
+    тогда выбираются только нужные им колонки, а связанные данные
+    неотобранных полей не загружаются. Запись по-прежнему идёт через
+    обычные сериализаторы и их проверки. Проверки прав на уровне объекта
+    для чтения получают строку-словарь, поэтому не должны обращаться к
+    атрибутам объекта при безопасных методах.
+    """
+
+    lean_serializer_class = None
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+
+    def get_query_names(self, param):
+        values = self.request.query_params.getlist(param)
+        return list(dict.fromkeys(
+            name.strip()
+            for value in values
+            for name in value.split(',') if name.strip()
+        ))
+
+    def get_lean_fields(self):
+        """Поля ответа по параметрам ``fields`` и ``omit``."""
+        available = self.lean_serializer_class.fields
+        requested = self.get_query_names(self.fields_query_param)
+        omitted = self.get_query_names(self.omit_query_param)
+        errors = {}
+        for param, names in ((self.fields_query_param, requested),
+                             (self.omit_query_param, omitted)):
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                errors[param] = [
+                    f'Неизвестные поля: {", ".join(unknown)}. '
+                    f'Доступны: {", ".join(available)}.'
+                ]
+        if errors:
+            raise ValidationError(errors)
+        if not requested and not omitted:
+            return None
+        return [
+            name for name in available
+            if (not requested or name in requested) and name not in omitted
+        ]
+
+    def get_lean_serializer(self):
+        return self.lean_serializer_class(
+            context=self.get_serializer_context(),
+            fields=self.get_lean_fields(),
+        )
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_lean_serializer()
+        rows = serializer.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_lean_serializer()
+        rows = serializer.rows(self.filter_queryset(self.get_queryset()))
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            rows, **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(request, row)
+        return Response(serializer.serialize([row])[0])
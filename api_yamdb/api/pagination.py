@@ -0,0 +1,162 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Курсорная пагинация по ключу ``(pub_date, id)`` без COUNT и OFFSET.
+
+    Записи отдаются от новых к старым. Курсор непрозрачен для клиента и
+    хранит ключ граничной записи и направление перехода.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.position, self.reverse = self.decode_cursor(request)
+        if self.reverse:
+            queryset = queryset.order_by('pub_date', 'id')
+            if self.position is not None:
+                pub_date, pk = self.position
+                queryset = queryset.filter(
+                    Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk)
+                )
+        else:
+            queryset = queryset.order_by('-pub_date', '-id')
+            if self.position is not None:
+                pub_date, pk = self.position
+                queryset = queryset.filter(
+                    Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+                )
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            return self.encode_cursor(self.page[-1], reverse=False)
+        return self.encode_cursor(None, reverse=False, position=self.position)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            return self.encode_cursor(self.page[0], reverse=True)
+        return self.encode_cursor(None, reverse=True, position=self.position)
+
+    def encode_cursor(self, instance, reverse, position=None):
+        if isinstance(instance, dict):
+            # Строка .values() из сериализаторов для чтения (api.lean).
+            position = (instance['pub_date'], instance['id'])
+        elif instance is not None:
+            position = (instance.pub_date, instance.pk)
+        pub_date, pk = position
+        payload = json.dumps({
+            'd': pub_date.isoformat(), 'i': pk, 'r': int(reverse)
+        })
+        cursor = urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, cursor
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padding = '=' * (-len(encoded) % 4)
+            payload = json.loads(urlsafe_b64decode(encoded + padding))
+            pub_date = parse_datetime(payload['d'])
+            pk = int(payload['i'])
+            reverse = bool(payload['r'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return (pub_date, pk), reverse
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.cursor_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Курсор страницы; пустое значение включает '
+                           'курсорную пагинацию с первой страницы.',
+            'schema': {'type': 'string'},
+        }]
+
+
+class TimelinePagination(BasePagination):
+    """Пагинация лент рецензий и комментариев.
+
+    По умолчанию работает постранично, как остальной API. Параметр
+    ``cursor`` в запросе (в том числе пустой) включает курсорный режим.
+    """
+
+    page_number_class = PageNumberPagination
+    keyset_class = KeysetPagination
+    paginator = None
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, 'display_page_controls', False)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if KeysetPagination.cursor_query_param in request.query_params:
+            self.paginator = self.keyset_class()
+        else:
+            self.paginator = self.page_number_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_results(self, data):
+        return data['results']
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            self.page_number_class().get_schema_operation_parameters(view)
+            + self.keyset_class().get_schema_operation_parameters(view)
+        )
@@ -0,0 +1,142 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+
+logger = logging.getLogger(__name__)
+
+PATHS_KEY = 'proxy-paths:{}'
+# Сколько последних адресов на модель обновляется после записи; более
+# старые записи nginx вытесняются сами через PROXY_CACHE_SECONDS.
+MAX_PATHS = 100
+REFRESH_TIMEOUT = 2
+
+_executor = None
+_executor_lock = threading.Lock()
+# Адреса, обновление которых уже стоит в очереди.
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def surrogate_key(model):
+    return model._meta.label_lower
+
+
+def paths_key(model):
+    return PATHS_KEY.format(surrogate_key(model))
+
+
+def allow_proxy_cache(request, response, models):
+    """Разрешает nginx кэшировать ответ анонимному клиенту.
+
+    Ответ получает ``Cache-Control: public`` и ``Surrogate-Key`` с
+    моделями, от которых он зависит, а его адрес запоминается, чтобы
+    обновить запись nginx после изменения этих моделей. Ответы
+    авторизованным пользователям помечаются как ``private``.
+    """
+    if settings.PROXY_CACHE_SECONDS <= 0:
+        return response
+    user = request.user
+    if (user and user.is_authenticated
+            or 'HTTP_AUTHORIZATION' in request.META):
+        patch_cache_control(response, private=True)
+        return response
+    patch_cache_control(
+        response, public=True, max_age=settings.PROXY_CACHE_SECONDS
+    )
+    response['Surrogate-Key'] = ' '.join(
+        surrogate_key(model) for model in models
+    )
+    if settings.PROXY_CACHE_REFRESH_URL:
+        # gunicorn передаёт адрес запроса в исходном виде, как его видит
+        # nginx в ключе кэша.
+        remember_path(
+            request.META.get('RAW_URI') or request.get_full_path(), models
+        )
+    return response
+
+
+def remember_path(path, models):
+    """Запоминает адрес ответа, закэшированного nginx, по моделям.
+
+    Параллельные запросы могут потерять адреса друг друга; такие записи
+    nginx просто доживают до конца PROXY_CACHE_SECONDS.
+    """
+    now = time.time()
+    expires = now + settings.PROXY_CACHE_SECONDS
+    keys = [paths_key(model) for model in models]
+    stored = cache.get_many(keys)
+    updated = {}
+    for key in keys:
+        paths = {
+            known: until for known, until in stored.get(key, {}).items()
+            if until > now and known != path
+        }
+        paths[path] = expires
+        updated[key] = dict(list(paths.items())[-MAX_PATHS:])
+    cache.set_many(updated, settings.PROXY_CACHE_SECONDS)
+
+
+def get_refresh_executor():
+    """Пул потоков процесса для запросов обновления к nginx."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix='proxy-refresh',
+            )
+        return _executor
+
+
+def purge_proxy_cache(*models):
+    """Обновляет в nginx закэшированные ответы, зависящие от моделей.
+
+    Открытый nginx не умеет удалять записи по ключу, поэтому ответы
+    запрашиваются заново через внутренний адрес PROXY_CACHE_REFRESH_URL,
+    который обходит кэш и сохраняет в него свежий ответ. Запросы идут в
+    фоне, запись их не ждёт.
+    """
+    if not settings.PROXY_CACHE_REFRESH_URL:
+        return
+    stored = cache.get_many([paths_key(model) for model in models])
+    if not stored:
+        return
+    cache.delete_many(list(stored))
+    now = time.time()
+    paths = {
+        path
+        for known in stored.values()
+        for path, until in known.items() if until > now
+    }
+    with _pending_lock:
+        paths -= _pending
+        _pending.update(paths)
+    executor = get_refresh_executor()
+    for path in paths:
+        executor.submit(refresh_path, path)
+
+
+def refresh_path(path):
+    # Адрес снимается с очереди до запроса: запись, случившаяся во время
+    # обновления, поставит его в очередь ещё раз.
+    with _pending_lock:
+        _pending.discard(path)
+    request = Request(
+        settings.PROXY_CACHE_REFRESH_URL.rstrip('/') + path,
+        headers={'Accept': 'application/json'},
+    )
+    try:
+        with urlopen(request, timeout=REFRESH_TIMEOUT) as response:
+            response.read()
+    except HTTPError as error:
+        # Ответ с ошибкой, например 404 удалённого объекта, nginx тоже
+        # сохраняет вместо старой записи.
+        error.close()
+    except (OSError, ValueError) as error:
+        logger.warning('Не удалось обновить %s в кэше nginx: %s', path, error)
@@ -1,36 +1,47 @@
 import datetime as dt
 
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.shortcuts import get_object_or_404
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 from rest_framework.serializers import ValidationError
 from django.contrib.auth import get_user_model
 from django.contrib.auth.validators import UnicodeUsernameValidator
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from api.bulk import BulkListSerializer
+from api.fields import PreloadedSlugRelatedField, SlugManyRelatedField
+from api_yamdb.metrics import SerializerTimingMixin
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleStatistics)
+from reviews.ranking import add_titles
+from reviews.statistics import velocity
 from users.validators import username_validator
 
 
 User = get_user_model()
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SerializerTimingMixin,
+                         serializers.ModelSerializer):
     """Класс сериализатор категории."""
 
     class Meta:
         fields = ('name', 'slug',)
         model = Category
+        list_serializer_class = BulkListSerializer
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SerializerTimingMixin,
+                      serializers.ModelSerializer):
     """Класс сериализатор жанра."""
 
     class Meta:
         fields = ('name', 'slug')
         model = Genre
+        list_serializer_class = BulkListSerializer
 
 
-class TitleListSerializer(serializers.ModelSerializer):
+class TitleListSerializer(SerializerTimingMixin,
+                          serializers.ModelSerializer):
     """Класс сериализатор получения списка произведений."""
 
     genre = GenreSerializer(many=True, read_only=True)
@@ -39,12 +50,13 @@ class TitleListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = Title.SERVICE_FIELDS + ('updated_at',)
         read_only_fields = ('id', 'name',
                             'year', 'description')
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SerializerTimingMixin,
+                        serializers.ModelSerializer):
     """Сериалайзер комментариев."""
 
     author = serializers.SlugRelatedField(
@@ -58,24 +70,50 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'pub_date')
 
 
-class TitleCreateSerializer(serializers.ModelSerializer):
+class TitleBulkListSerializer(BulkListSerializer):
+    """Класс сериализатор массового создания произведений."""
+
+    def bulk_created(self, instances):
+        Title.objects.filter(
+            pk__in=[instance.pk for instance in instances]
+        ).update_search_vector()
+
+    def links_created(self, instances, links, using):
+        # Связи с жанрами вставляются без сигналов, поэтому строки
+        # рейтинга заводятся здесь.
+        add_titles(instances, {
+            instance.pk: [genre.pk for genre in dict.fromkeys(
+                many_to_many.get('genre', ())
+            )]
+            for instance, many_to_many in zip(instances, links)
+        }, using)
+
+    def to_representation(self, data):
+        prefetch_related_objects(data, 'genre')
+        return super().to_representation(data)
+
+
+class TitleCreateSerializer(SerializerTimingMixin,
+                            serializers.ModelSerializer):
     """Класс сериализатор создания произведений."""
 
-    category = serializers.SlugRelatedField(
+    category = PreloadedSlugRelatedField(
         slug_field='slug',
         many=False,
         queryset=Category.objects.all()
     )
-    genre = serializers.SlugRelatedField(
-        slug_field='slug',
-        many=True,
-        required=False,
-        queryset=Genre.objects.all()
+    genre = SlugManyRelatedField(
+        child_relation=PreloadedSlugRelatedField(
+            slug_field='slug',
+            queryset=Genre.objects.all()
+        ),
+        required=False
     )
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = Title.SERVICE_FIELDS + ('updated_at',)
+        list_serializer_class = TitleBulkListSerializer
 
     def year_validate(self, value):
         current_year = dt.date.today().year
@@ -89,7 +127,35 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         return TitleListSerializer(instance, context=self.context).data
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TitleStatisticsSerializer(SerializerTimingMixin,
+                                serializers.ModelSerializer):
+    """Сериализатор статистики рецензий произведения."""
+
+    title = serializers.IntegerField(source='title_id', read_only=True)
+    scores = serializers.SerializerMethodField()
+    average = serializers.SerializerMethodField()
+    velocity = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TitleStatistics
+        fields = ('title', 'review_count', 'scores', 'average', 'velocity')
+
+    def get_scores(self, obj):
+        return {str(score): count for score, count in obj.scores.items()}
+
+    def get_average(self, obj):
+        if not obj.review_count:
+            return None
+        total = sum(score * count for score, count in obj.scores.items())
+        return round(total / obj.review_count, 2)
+
+    def get_velocity(self, obj):
+        """Рецензий в сутки с учётом затухания."""
+        return round(velocity(obj), 3)
+
+
+class ReviewSerializer(SerializerTimingMixin,
+                       serializers.ModelSerializer):
     """Сериализатор модели User."""
 
     title = serializers.PrimaryKeyRelatedField(
@@ -109,18 +175,7 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = '__all__'
-
-    def validate(self, data):
-        if self.context['request'].method == 'POST':
-            title_id = self.context.get('view').kwargs.get('title_id')
-            title = get_object_or_404(Title, id=title_id)
-            request = self.context['request']
-            author = request.user
-            if Review.objects.filter(title=title, author=author).exists():
-                raise serializers.ValidationError('Вы уже оставили свой отзыв'
-                                                  'к этому произведению!')
-        return data
+        exclude = ('updated_at',)
 
 
 class SignUpSerializer(serializers.Serializer):
@@ -165,7 +220,8 @@ class TokenSerializer(serializers.Serializer):
     username = serializers.CharField(max_length=150)
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SerializerTimingMixin,
+                     serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('username', 'email',
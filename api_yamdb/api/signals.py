@@ -0,0 +1,29 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from api.cache import bump_generation
+from reviews.models import Category, Genre, GenreTitle, Review, Title
+
+CATALOG_MODELS = (Genre, Category, Title, GenreTitle, Review)
+
+
+def invalidate_cached_responses(sender, using=None, **kwargs):
+    """Сдвигает поколение модели после фиксации транзакции.
+
+    Если сдвинуть его раньше, параллельный запрос мог бы сохранить в кэш
+    ещё старые данные уже под новым поколением.
+    """
+    transaction.on_commit(partial(bump_generation, sender), using=using)
+
+
+def invalidate_genre_links(sender, action, using=None, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_cached_responses(GenreTitle, using=using)
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(invalidate_cached_responses, sender=model)
+    post_delete.connect(invalidate_cached_responses, sender=model)
+m2m_changed.connect(invalidate_genre_links, sender=Title.genre.through)
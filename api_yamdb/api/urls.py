@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from api.async_views import async_read_urls
 from api.views import SignUpView, TokenView, UsersViewSet
 from api.views import (GenreViewSet, CategoryViewSet, TitleViewSet,
                        CommentViewSet, ReviewViewSet)
@@ -17,8 +19,12 @@ router_v1.register(
     CommentViewSet, basename='comments')
 router_v1.register('users', UsersViewSet, basename='users')
 
+v1_patterns = router_v1.urls
+if settings.ASYNC_READ_THREADS > 0:
+    v1_patterns = async_read_urls(v1_patterns)
+
 urlpatterns = [
-    path('v1/', include(router_v1.urls)),
+    path('v1/', include(v1_patterns)),
     path('v1/auth/signup/', SignUpView.as_view(), name='sign_up'),
-    path('v1/auth/token/', TokenView.as_view()),
+    path('v1/auth/token/', TokenView.as_view(), name='token'),
 ]
@@ -1,21 +1,37 @@
 from rest_framework import viewsets, filters, mixins, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.filters import SearchFilter
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from django.core.mail import send_mail
+from rest_framework.serializers import ValidationError
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
-from django.db.models import Avg
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.db.models import Count, Max
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth.tokens import default_token_generator
-from rest_framework_simplejwt.tokens import RefreshToken
 
-from reviews.models import Genre, Category, Title, Review, Comment
+from reviews.models import (Genre, GenreTitle, Category, Title, Review,
+                            Comment, TitleStatistics)
+from api.authentication import UserClaimsRefreshToken
+from api.bulk import BulkCreateMixin
+from api.cache import (CachedResponseMixin, changed_recently,
+                       get_modification_state)
+from api.conditional import ConditionalGetMixin
+from api.export import EXPORT_FORMATS, can_stream, export_response
 from api.filters import TitleFilter
+from api.lean import (CategoryLeanSerializer, CommentLeanSerializer,
+                      GenreLeanSerializer, LeanReadMixin,
+                      ReviewLeanSerializer, TitleLeanSerializer)
+from api.pagination import TimelinePagination
 from api.serializers import (GenreSerializer, CategorySerializer,
                              ReviewSerializer,
                              TitleCreateSerializer, TitleListSerializer,
+                             TitleStatisticsSerializer,
                              CommentSerializer,
                              TokenSerializer,
                              UserSerializer,
@@ -23,7 +39,10 @@ from api.serializers import (GenreSerializer, CategorySerializer,
                              UserRestrictedSerializer)
 from api.permissions import (IsAdminOrReadOnly, IsAdmin,
                              IsAuthorModeratorAdminOrReadOnly)
+from api_yamdb.replicas import get_read_database
+from reviews.statistics import compute_statistics
 from users.models import User
+from users.outbox import enqueue_email
 
 
 class CreateDestroyListViewSet(mixins.CreateModelMixin,
@@ -33,74 +52,232 @@ class CreateDestroyListViewSet(mixins.CreateModelMixin,
     pass
 
 
-class GenreViewSet(CreateDestroyListViewSet):
+class GenreViewSet(BulkCreateMixin, CachedResponseMixin, LeanReadMixin,
+                   CreateDestroyListViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    lean_serializer_class = GenreLeanSerializer
     permission_classes = (IsAdminOrReadOnly,)
     lookup_field = 'slug'
     search_fields = ['name']
     filter_backends = [filters.SearchFilter]
+    cache_dependencies = (Genre,)
 
 
-class CategoryViewSet(CreateDestroyListViewSet):
+class CategoryViewSet(BulkCreateMixin, CachedResponseMixin, LeanReadMixin,
+                      CreateDestroyListViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    lean_serializer_class = CategoryLeanSerializer
     permission_classes = (IsAdminOrReadOnly,)
     lookup_field = 'slug'
     search_fields = ['name']
     filter_backends = [filters.SearchFilter]
+    cache_dependencies = (Category,)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, LeanReadMixin,
+                    viewsets.ModelViewSet):
     """Просмотр и редактирование рецензий."""
 
     serializer_class = ReviewSerializer
+    lean_serializer_class = ReviewLeanSerializer
     permission_classes = [IsAuthorModeratorAdminOrReadOnly, ]
+    pagination_class = TimelinePagination
 
     def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+        """Произведение из адреса, загружается один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, pk=self.kwargs.get('title_id')
+            )
+        return self._title
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        if self.action == 'list':
+            reviews = self.get_title().reviews.all()
+        else:
+            # Отдельная рецензия ищется вместе с произведением одним
+            # запросом: если произведения нет, не найдётся и она.
+            reviews = Review.objects.filter(
+                title_id=self.kwargs.get('title_id')
+            )
+        return reviews.select_related('author')
+
+    def get_resource_state(self):
+        if self.action != 'list':
+            return None
+        state = Title.objects.filter(pk=self.kwargs.get('title_id')).aggregate(
+            found=Count('id', distinct=True),
+            count=Count('reviews'),
+            modified=Max('reviews__updated_at'),
+        )
+        if not state['found']:
+            return None
+        return state['modified'], (state['count'], state['modified'])
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
-
-
-class CommentViewSet(viewsets.ModelViewSet):
+        author, title = self.request.user, self.get_title()
+        try:
+            serializer.save(author=author, title=title)
+        except IntegrityError:
+            # Повторную рецензию отсекает ограничение unique_review, а не
+            # отдельная проверка перед вставкой. Другие нарушения
+            # ограничений за повторную рецензию не выдаются.
+            if not Review.objects.filter(author=author, title=title).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Вы уже оставили свой отзыв к этому произведению!'
+                ]
+            })
+
+
+class CommentViewSet(ConditionalGetMixin, LeanReadMixin,
+                     viewsets.ModelViewSet):
     """Просмотр и редактирование комментариев."""
 
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    lean_serializer_class = CommentLeanSerializer
     permission_classes = [IsAuthorModeratorAdminOrReadOnly, ]
+    pagination_class = TimelinePagination
 
     def get_review(self):
-        return get_object_or_404(Review, title_id=self.kwargs.get('title_id'),
-                                 id=self.kwargs.get('review_id'))
+        """Рецензия из адреса, загружается один раз за запрос."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review, title_id=self.kwargs.get('title_id'),
+                id=self.kwargs.get('review_id'),
+            )
+        return self._review
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        if self.action == 'list':
+            comments = self.get_review().comments.all()
+        else:
+            comments = Comment.objects.filter(
+                review_id=self.kwargs.get('review_id'),
+                review__title_id=self.kwargs.get('title_id'),
+            )
+        return comments.select_related('author')
+
+    def get_resource_state(self):
+        if self.action != 'list':
+            return None
+        state = Review.objects.filter(
+            title_id=self.kwargs.get('title_id'),
+            id=self.kwargs.get('review_id'),
+        ).aggregate(
+            found=Count('id', distinct=True),
+            count=Count('comments'),
+            modified=Max('comments__updated_at'),
+        )
+        if not state['found']:
+            return None
+        return state['modified'], (state['count'], state['modified'])
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(BulkCreateMixin, CachedResponseMixin, ConditionalGetMixin,
+                   LeanReadMixin, viewsets.ModelViewSet):
     """Класс произведения, доступно только админу."""
 
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).all()
+    queryset = Title.objects.select_related('category').order_by('id')
     serializer_class = TitleCreateSerializer
+    lean_serializer_class = TitleLeanSerializer
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     filterset_fields = ('genre__slug',)
+    cache_dependencies = (Title, Genre, Category, GenreTitle, Review)
+
+    def get_resource_state(self):
+        if self.action != 'retrieve':
+            # Агрегат по всему отфильтрованному каталогу стоил бы O(размер
+            # каталога) на каждый запрос списка; версия списка — поколения
+            # моделей в кэше. Прочитанное с отстающей реплики сразу после
+            # записи не получает валидаторов нового поколения.
+            if (get_read_database()
+                    and changed_recently(self.cache_dependencies)):
+                return None
+            return get_modification_state(self.cache_dependencies)
+        try:
+            queryset = Title.objects.filter(pk=self.kwargs.get('pk'))
+        except (TypeError, ValueError):
+            return None
+        state = queryset.order_by().aggregate(
+            count=Count('id', distinct=True),
+            links=Count('genre'),
+            title=Max('updated_at'),
+            genre=Max('genre__updated_at'),
+            category=Max('category__updated_at'),
+        )
+        if not state['count']:
+            return None
+        modified = max(
+            (state[key] for key in ('title', 'genre', 'category')
+             if state[key] is not None),
+            default=None,
+        )
+        return modified, tuple(sorted(state.items()))
 
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
             return TitleListSerializer
         return TitleCreateSerializer
 
+    @action(
+        methods=('get',),
+        detail=False,
+        permission_classes=[IsAdmin]
+    )
+    def export(self, request):
+        """Потоковая выгрузка всего каталога для партнёров."""
+        if not can_stream(request._request):
+            return Response(
+                {'detail': 'Выгрузка под ASGI работает только через '
+                           'api_yamdb.asgi.'},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            raise ValidationError(
+                {'output': f'Допустимые форматы: {", ".join(EXPORT_FORMATS)}.'}
+            )
+        queryset = self.filter_queryset(Title.objects.all())
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = parse_datetime(since)
+            except ValueError:
+                since = None
+            if since is None:
+                raise ValidationError(
+                    {'since': 'Ожидается дата и время в формате ISO 8601.'}
+                )
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            queryset = queryset.filter(updated_at__gte=since)
+        return export_response(queryset, output)
+
+    @action(methods=('get',), detail=True)
+    def stats(self, request, pk=None):
+        """Распределение оценок и скорость появления рецензий."""
+        try:
+            title_id = int(pk)
+        except ValueError:
+            raise NotFound
+        statistics = TitleStatistics.objects.filter(pk=title_id).first()
+        if statistics is None:
+            # Строка появляется с первой рецензией после включения
+            # статистики; до тех пор она считается по рецензиям.
+            get_object_or_404(Title, pk=title_id)
+            statistics = compute_statistics([title_id])[title_id]
+        return Response(TitleStatisticsSerializer(statistics).data)
+
 
 class NewViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
@@ -117,19 +294,20 @@ class SignUpView(APIView):
         serializer.is_valid(raise_exception=True)
         username = serializer.data.get('username')
         email = serializer.data.get('email')
-        user, _ = User.objects.get_or_create(
-            username=username,
-            email=email,
-        )
-        user.confirmation_code = default_token_generator.make_token(user)
-        user.save()
-        send_mail(
-            'Your personal token',
-            user.confirmation_code,
-            'aaaaaaa@boba.com',
-            [email],
-            fail_silently=False,
-        )
+        with transaction.atomic():
+            user, _ = User.objects.get_or_create(
+                username=username,
+                email=email,
+            )
+            user.confirmation_code = default_token_generator.make_token(user)
+            user.save()
+            # Письмо отправит фоновый обработчик send_outbox.
+            enqueue_email(
+                'Your personal token',
+                user.confirmation_code,
+                'aaaaaaa@boba.com',
+                email,
+            )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -178,7 +356,7 @@ class TokenView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            refresh = RefreshToken.for_user(user)
+            refresh = UserClaimsRefreshToken.for_user(user)
             access_token = str(refresh.access_token)
             return Response({"token": f"{access_token}"})
         return Response(
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class AdminModelsConfig(AppConfig):
+    """Модели админки без самой админки для профиля API_ONLY.
+
+    Журнал админки ссылается на пользователей, и без его модели удаление
+    пользователя с записями в журнале падает на внешнем ключе. Проверки
+    настроек и поиск admin.py, как у AdminConfig, здесь не нужны.
+    """
+    default_auto_field = 'django.db.models.AutoField'
+    name = 'django.contrib.admin'
+    verbose_name = 'Administration'
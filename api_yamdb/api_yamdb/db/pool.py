@@ -0,0 +1,193 @@
+import os
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """Свободное соединение не появилось за отведённое время."""
+
+
+class PoolEntry:
+    """Соединение пула и отметки времени для его проверок."""
+
+    __slots__ = ('connection', 'created_at', 'checked_at')
+
+    def __init__(self, connection, now):
+        self.connection = connection
+        self.created_at = now
+        self.checked_at = now
+
+
+class ConnectionPool:
+    """Потокобезопасный пул соединений с базой.
+
+    ``connect`` открывает новое соединение, ``reset`` возвращает
+    соединение в исходное состояние перед возвратом в пул, ``ping``
+    проверяет, что оно живо. Соединение старше ``max_lifetime`` секунд
+    закрывается и заменяется новым; простаивавшее дольше
+    ``check_interval`` секунд перед выдачей проверяется ``ping``.
+    Сетевые операции выполняются вне блокировки, поэтому пул работает и
+    с потоками, и с гринлетами gevent (после monkey-patching). После
+    fork унаследованные соединения не используются: их сокеты остаются
+    у родительского процесса.
+    """
+
+    def __init__(self, connect, max_size, *, reset=None, ping=None,
+                 max_lifetime=None, check_interval=30.0, timeout=10.0,
+                 clock=time.monotonic):
+        if max_size < 1:
+            raise ValueError('Размер пула должен быть положительным.')
+        self._connect = connect
+        self._reset = reset
+        self._ping = ping
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.check_interval = check_interval
+        self.timeout = timeout
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._idle = deque()
+        self._in_use = {}
+        self._opening = 0
+        self._waiting = 0
+        self._pid = os.getpid()
+        self.created = 0
+        self.recycled = 0
+
+    def acquire(self):
+        """Выдаёт соединение, при необходимости ожидая освобождения."""
+        deadline = self._clock() + self.timeout
+        while True:
+            entry = self._reserve(deadline)
+            if entry is None:
+                return self._open()
+            if self._is_healthy(entry):
+                return entry.connection
+            self._discard(entry)
+
+    def release(self, connection):
+        """Возвращает соединение в пул или закрывает его."""
+        with self._condition:
+            self._check_fork()
+            entry = self._in_use.pop(id(connection), None)
+            if entry is None:
+                # Соединение открыто до fork или не из этого пула.
+                self._close(connection)
+                return
+            self._condition.notify()
+        try:
+            if self._reset is not None:
+                self._reset(connection)
+        except Exception:
+            self._discard(entry, reserved=False)
+            return
+        if self._is_expired(entry):
+            self._discard(entry, reserved=False)
+            return
+        entry.checked_at = self._clock()
+        with self._condition:
+            self._idle.append(entry)
+            self._condition.notify()
+
+    def close_idle(self):
+        """Закрывает все свободные соединения."""
+        with self._condition:
+            entries = list(self._idle)
+            self._idle.clear()
+        for entry in entries:
+            self._close(entry.connection)
+
+    def stats(self):
+        with self._condition:
+            return {
+                'size': self.max_size,
+                'in_use': len(self._in_use) + self._opening,
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'created': self.created,
+                'recycled': self.recycled,
+            }
+
+    def _reserve(self, deadline):
+        """Свободная запись пула или None, если можно открыть новую."""
+        with self._condition:
+            self._check_fork()
+            while True:
+                if self._idle:
+                    # LIFO: чаще выдаются недавно работавшие соединения.
+                    entry = self._idle.pop()
+                    self._in_use[id(entry.connection)] = entry
+                    return entry
+                if len(self._in_use) + self._opening < self.max_size:
+                    self._opening += 1
+                    return None
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    raise PoolTimeout(
+                        f'Все {self.max_size} соединений пула заняты.'
+                    )
+                self._waiting += 1
+                try:
+                    self._condition.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+    def _open(self):
+        try:
+            connection = self._connect()
+        except BaseException:
+            with self._condition:
+                self._opening -= 1
+                self._condition.notify()
+            raise
+        entry = PoolEntry(connection, self._clock())
+        with self._condition:
+            self._opening -= 1
+            self._in_use[id(connection)] = entry
+            self.created += 1
+        return connection
+
+    def _is_expired(self, entry):
+        return (
+            self.max_lifetime is not None
+            and self._clock() - entry.created_at >= self.max_lifetime
+        )
+
+    def _is_healthy(self, entry):
+        if self._is_expired(entry):
+            return False
+        if getattr(entry.connection, 'closed', False):
+            return False
+        now = self._clock()
+        if self._ping is not None and now - entry.checked_at >= (
+            self.check_interval
+        ):
+            try:
+                self._ping(entry.connection)
+            except Exception:
+                return False
+            entry.checked_at = now
+        return True
+
+    def _discard(self, entry, reserved=True):
+        with self._condition:
+            if reserved:
+                self._in_use.pop(id(entry.connection), None)
+            self.recycled += 1
+            self._condition.notify()
+        self._close(entry.connection)
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _check_fork(self):
+        pid = os.getpid()
+        if pid != self._pid:
+            self._pid = pid
+            self._idle.clear()
+            self._in_use.clear()
+            self._opening = 0
@@ -0,0 +1,80 @@
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from api_yamdb.db.pool import ConnectionPool, PoolTimeout
+
+Database = base.Database
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool_stats():
+    """Статистика всех пулов процесса по псевдонимам баз."""
+    with _pools_lock:
+        pools = list(_pools.items())
+    stats = {}
+    for (alias, _), pool in pools:
+        for name, value in pool.stats().items():
+            stats.setdefault(alias, {})
+            stats[alias][name] = stats[alias].get(name, 0) + value
+    return stats
+
+
+def reset_connection(connection):
+    """Откатывает незавершённую транзакцию перед возвратом в пул."""
+    status = connection.get_transaction_status()
+    if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+        raise Database.InterfaceError('Соединение с базой потеряно.')
+    if status != extensions.TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+
+
+def ping_connection(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    reset_connection(connection)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Postgres с пулом соединений на процесс.
+
+    Django по-прежнему «закрывает» соединение в конце запроса, но оно
+    возвращается в пул и выдаётся следующему потоку без нового
+    подключения. Параметры пула задаются в ``POOL`` настроек базы.
+    """
+
+    def get_pool(self, conn_params):
+        # Параметры входят в ключ: тестовая база подключается к другому
+        # имени под тем же псевдонимом.
+        key = (self.alias, repr(sorted(conn_params.items())))
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                options = self.settings_dict.get('POOL', {})
+                pool = _pools[key] = ConnectionPool(
+                    lambda: super(DatabaseWrapper, self).get_new_connection(
+                        conn_params
+                    ),
+                    options.get('SIZE', 10),
+                    reset=reset_connection,
+                    ping=ping_connection,
+                    max_lifetime=options.get('MAX_LIFETIME'),
+                    check_interval=options.get('CHECK_INTERVAL', 30),
+                    timeout=options.get('TIMEOUT', 10),
+                )
+        return pool
+
+    def get_new_connection(self, conn_params):
+        self.connection_pool = self.get_pool(conn_params)
+        try:
+            return self.connection_pool.acquire()
+        except PoolTimeout as error:
+            raise Database.OperationalError(str(error)) from error
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.connection_pool.release(self.connection)
@@ -0,0 +1,83 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connections
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """ASGI-обработчик, который читает потоковые ответы вне цикла событий.
+
+    Django 3.2 перебирает ``StreamingHttpResponse`` прямо в цикле
+    событий, и генератор с запросами к базе (выгрузка каталога) падает
+    с ``SynchronousOnlyOperation`` уже после отправки заголовков. Здесь
+    каждый потоковый ответ читается в собственном потоке: курсор
+    ``iterator()`` привязан к соединению потока, поэтому все порции
+    должны читаться в одном и том же.
+    """
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.streams_in_thread = True
+        return request, error_response
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': response_headers(response),
+        })
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='asgi-stream',
+        )
+        parts = iter(response)
+        try:
+            while True:
+                part = await loop.run_in_executor(executor, next, parts, None)
+                if part is None:
+                    break
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+            await send({'type': 'http.response.body'})
+        finally:
+            await loop.run_in_executor(executor, close_stream, response)
+            executor.shutdown(wait=False)
+
+
+def response_headers(response):
+    """Заголовки ответа в виде ASGI, как в ASGIHandler.send_response."""
+    headers = []
+    for header, value in response.items():
+        if isinstance(header, str):
+            header = header.encode('ascii')
+        if isinstance(value, str):
+            value = value.encode('latin1')
+        headers.append((bytes(header), bytes(value)))
+    for cookie in response.cookies.values():
+        headers.append(
+            (b'Set-Cookie', cookie.output(header='').encode('ascii').strip())
+        )
+    return headers
+
+
+def close_stream(response):
+    # Поток живёт один ответ: его соединения с базой закрываются сразу.
+    try:
+        response.close()
+    finally:
+        connections.close_all()
+
+
+def get_asgi_application():
+    """Как django.core.asgi.get_asgi_application, с потоковыми ответами."""
+    django.setup(set_prefix=False)
+    return StreamingASGIHandler()
@@ -0,0 +1,452 @@
+import asyncio
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+HELP = {
+    'yamdb_http_requests_total': (
+        'counter', 'Обработанные запросы.'
+    ),
+    'yamdb_http_request_duration_seconds': (
+        'histogram', 'Время обработки запроса.'
+    ),
+    'yamdb_db_queries': (
+        'histogram', 'Число SQL-запросов на запрос к API.'
+    ),
+    'yamdb_db_duration_seconds_total': (
+        'counter', 'Время выполнения SQL-запросов.'
+    ),
+    'yamdb_serializer_duration_seconds_total': (
+        'counter', 'Время сериализации ответов.'
+    ),
+    'yamdb_db_pool_size': (
+        'gauge', 'Наибольшее число соединений в пулах.'
+    ),
+    'yamdb_db_pool_in_use': (
+        'gauge', 'Соединения пулов, выданные запросам.'
+    ),
+    'yamdb_db_pool_idle': (
+        'gauge', 'Свободные соединения в пулах.'
+    ),
+    'yamdb_db_pool_waiting': (
+        'gauge', 'Потоки, ждущие соединения из пула.'
+    ),
+    'yamdb_db_pool_created_total': (
+        'counter', 'Соединения, открытые пулами.'
+    ),
+    'yamdb_db_pool_recycled_total': (
+        'counter', 'Соединения, закрытые пулами по сроку жизни или проверке.'
+    ),
+}
+# Значения статистики пула соединений и соответствующие им метрики.
+POOL_GAUGES = {
+    'size': 'yamdb_db_pool_size',
+    'in_use': 'yamdb_db_pool_in_use',
+    'idle': 'yamdb_db_pool_idle',
+    'waiting': 'yamdb_db_pool_waiting',
+}
+POOL_COUNTERS = {
+    'created': 'yamdb_db_pool_created_total',
+    'recycled': 'yamdb_db_pool_recycled_total',
+}
+POOL_BACKEND = 'api_yamdb.db.postgresql.base'
+UNRESOLVED_VIEW = '<unresolved>'
+HTTP_METHODS = frozenset((
+    'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS',
+))
+FILE_PREFIX = 'metrics-'
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Замеры одного запроса: SQL и сериализация."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += time.perf_counter() - started
+
+    def server_timing(self, duration):
+        return (
+            f'db;dur={self.sql_time * 1000:.2f};'
+            f'desc="{self.queries} queries", '
+            f'serializer;dur={self.serializer_time * 1000:.2f}, '
+            f'total;dur={duration * 1000:.2f}'
+        )
+
+
+def count_queries(execute, sql, params, many, context):
+    """Обёртка соединений: учитывает SQL-запрос в замерах текущего запроса.
+
+    Запрос берётся из контекста, поэтому учёт работает в любом потоке,
+    куда контекст передан: в пуле асинхронного чтения и в потоках
+    ``sync_to_async`` под ASGI, в том числе при параллельных запросах.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def instrument_connection(connection):
+    # В начало списка: execute_wrapper() снимает свою обёртку с конца.
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_queries)
+
+
+@receiver(connection_created)
+def instrument_new_connection(sender, connection, **kwargs):
+    instrument_connection(connection)
+
+
+def instrument_queries():
+    """Подключает учёт SQL-запросов к соединениям текущего потока.
+
+    Новые соединения получают его сами; вызов нужен для открытых до
+    загрузки модуля.
+    """
+    for alias in connections:
+        instrument_connection(connections[alias])
+
+
+@contextmanager
+def serializer_timing():
+    """Учитывает время блока как время сериализации текущего запроса.
+
+    Вложенные блоки входят во время внешнего и отдельно не считаются.
+    """
+    metrics = _current.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializing = False
+        metrics.serializer_time += time.perf_counter() - started
+
+
+class SerializerTimingMixin:
+    """Учитывает время сериализации в замерах запроса."""
+
+    def to_representation(self, instance):
+        with serializer_timing():
+            return super().to_representation(instance)
+
+
+def get_pool_stats():
+    """Статистика пулов соединений процесса, если бэкенд с пулом загружен."""
+    backend = sys.modules.get(POOL_BACKEND)
+    return backend.get_pool_stats() if backend else {}
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Процесс есть, но принадлежит другому пользователю.
+        return True
+    return True
+
+
+class Registry:
+    """Счётчики и гистограммы процесса.
+
+    Воркеры gunicorn не делят память, поэтому каждый процесс не чаще
+    раза в ``METRICS_FLUSH_INTERVAL`` секунд сохраняет свои значения в
+    отдельный файл ``METRICS_DIR``, а ``/metrics`` суммирует файлы всех
+    процессов, в том числе завершившихся: счётчики не уменьшаются при
+    перезапуске воркера.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.flushed_at = 0.0
+
+    def increment(self, name, labels, value=1):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, labels, value, buckets):
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = {
+                'buckets': list(buckets),
+                'counts': [0] * len(buckets),
+                'sum': 0,
+                'count': 0,
+            }
+        index = bisect.bisect_left(buckets, value)
+        if index < len(buckets):
+            histogram['counts'][index] += 1
+        histogram['sum'] += value
+        histogram['count'] += 1
+
+    def record(self, view, method, status, duration, metrics):
+        with self._lock:
+            self.increment(
+                'yamdb_http_requests_total',
+                (('view', view), ('method', method), ('status', status)),
+            )
+            self.observe(
+                'yamdb_http_request_duration_seconds',
+                (('view', view), ('method', method)),
+                duration, DURATION_BUCKETS,
+            )
+            labels = (('view', view),)
+            self.observe(
+                'yamdb_db_queries', labels, metrics.queries, QUERY_BUCKETS
+            )
+            self.increment(
+                'yamdb_db_duration_seconds_total', labels, metrics.sql_time
+            )
+            self.increment(
+                'yamdb_serializer_duration_seconds_total', labels,
+                metrics.serializer_time,
+            )
+
+    def snapshot(self):
+        """Значения процесса; состояние пулов соединений — на этот момент."""
+        gauges = []
+        pool_counters = []
+        for alias, stats in get_pool_stats().items():
+            labels = (('database', alias),)
+            gauges.extend(
+                [name, labels, stats[key]]
+                for key, name in POOL_GAUGES.items()
+            )
+            pool_counters.extend(
+                [name, labels, stats[key]]
+                for key, name in POOL_COUNTERS.items()
+            )
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'counters': [
+                    [name, labels, value]
+                    for (name, labels), value in self.counters.items()
+                ] + pool_counters,
+                'histograms': [
+                    [name, labels, dict(histogram,
+                                        counts=list(histogram['counts']))]
+                    for (name, labels), histogram in self.histograms.items()
+                ],
+                'gauges': gauges,
+            }
+
+    def flush(self, directory, force=False):
+        """Сохраняет значения процесса в ``directory``."""
+        now = time.monotonic()
+        if not force and now - self.flushed_at < (
+            settings.METRICS_FLUSH_INTERVAL
+        ):
+            return
+        self.flushed_at = now
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{FILE_PREFIX}{os.getpid()}.json')
+        temporary = f'{path}.{threading.get_ident()}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(self.snapshot(), file)
+        os.replace(temporary, path)
+
+
+registry = Registry()
+
+
+def load_snapshots(directory):
+    """Сохранённые значения всех процессов."""
+    snapshots = []
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith(FILE_PREFIX) and name.endswith('.json')):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as file:
+                snapshots.append(json.load(file))
+        except (OSError, ValueError):
+            # Файл процесса мог быть удалён во время чтения.
+            continue
+    return snapshots
+
+
+def merge(snapshots):
+    """Суммы значений процессов.
+
+    Счётчики и гистограммы суммируются по всем файлам, в том числе
+    завершившихся воркеров, а текущие значения (``gauges``) — только по
+    работающим процессам.
+    """
+    counters = {}
+    histograms = {}
+    gauges = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        pid = snapshot.get('pid')
+        if pid is None or pid == os.getpid() or process_alive(pid):
+            for name, labels, value in snapshot.get('gauges', ()):
+                key = (name, tuple(map(tuple, labels)))
+                gauges[key] = gauges.get(key, 0) + value
+        for name, labels, histogram in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            total = histograms.setdefault(key, {
+                'buckets': histogram['buckets'],
+                'counts': [0] * len(histogram['buckets']),
+                'sum': 0,
+                'count': 0,
+            })
+            for index, count in enumerate(histogram['counts']):
+                total['counts'][index] += count
+            total['sum'] += histogram['sum']
+            total['count'] += histogram['count']
+    return counters, histograms, gauges
+
+
+def format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def render(counters, histograms, gauges=None):
+    """Метрики в текстовом формате Prometheus."""
+    series = {}
+    for (name, labels), value in [*counters.items(),
+                                  *(gauges or {}).items()]:
+        series.setdefault(name, []).append(
+            f'{name}{format_labels(labels)} {value}'
+        )
+    for (name, labels), histogram in histograms.items():
+        lines = series.setdefault(name, [])
+        cumulative = 0
+        for bound, count in zip(histogram['buckets'], histogram['counts']):
+            cumulative += count
+            bucket_labels = format_labels(labels, [('le', float(bound))])
+            lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+        inf_labels = format_labels(labels, [('le', '+Inf')])
+        lines.append(f'{name}_bucket{inf_labels} {histogram["count"]}')
+        lines.append(f'{name}_sum{format_labels(labels)} {histogram["sum"]}')
+        lines.append(
+            f'{name}_count{format_labels(labels)} {histogram["count"]}'
+        )
+    output = []
+    for name in sorted(series):
+        kind, description = HELP[name]
+        output.append(f'# HELP {name} {description}')
+        output.append(f'# TYPE {name} {kind}')
+        output.extend(sorted(series[name]))
+    return '\n'.join(output) + '\n'
+
+
+def metrics_view(request):
+    """Метрики всех воркеров для Prometheus."""
+    directory = settings.METRICS_DIR
+    if directory:
+        registry.flush(directory, force=True)
+        snapshots = load_snapshots(directory)
+    else:
+        snapshots = [registry.snapshot()]
+    return HttpResponse(
+        render(*merge(snapshots)),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+class MetricsMiddleware:
+    """Время, SQL-запросы и сериализация каждого запроса.
+
+    Значения уходят в заголовок ``Server-Timing`` и в метрики с меткой
+    имени маршрута, а не пути, чтобы число рядов не зависело от
+    идентификаторов в адресах.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Как у MiddlewareMixin: предыдущий middleware должен видеть,
+            # что этот вызывается асинхронно.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            instrument_queries()
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, metrics, started)
+        if settings.METRICS_DIR:
+            registry.flush(settings.METRICS_DIR)
+        return response
+
+    async def __acall__(self, request):
+        """Асинхронный путь под ASGI: запросы не ждут общего потока."""
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, metrics, started)
+        if settings.METRICS_DIR:
+            await sync_to_async(registry.flush, thread_sensitive=False)(
+                settings.METRICS_DIR
+            )
+        return response
+
+    def finish(self, request, response, metrics, started):
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        registry.record(
+            match.view_name if match else UNRESOLVED_VIEW,
+            request.method if request.method in HTTP_METHODS else 'OTHER',
+            str(response.status_code), duration, metrics,
+        )
+        response['Server-Timing'] = metrics.server_timing(duration)
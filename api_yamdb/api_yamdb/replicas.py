@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.viewsets import ViewSetMixin
+
+PRIMARY_PIN_KEY = 'primary-pin:{}'
+
+_read_database = ContextVar('read_database', default=None)
+
+
+def get_read_database():
+    """Реплика, выбранная для чтения в текущем запросе, или None."""
+    return _read_database.get()
+
+
+def get_client_key(request):
+    """Кого закреплять за основной базой: владельца токена или адрес."""
+    client = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.META.get('REMOTE_ADDR', '')
+    )
+    return PRIMARY_PIN_KEY.format(
+        hashlib.md5(client.encode()).hexdigest()
+    )
+
+
+class ReplicaRouter:
+    """Отправляет чтение на реплики, если его разрешил ReplicaMiddleware.
+
+    Вне запросов к API (команды, админка, фоновые задачи) и при любой
+    записи используется основная база; явный ``using`` по-прежнему
+    работает.
+    """
+
+    def db_for_read(self, model, **hints):
+        if 'instance' in hints:
+            # Связанные объекты читаются из той же базы, что и исходный.
+            return None
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        instance = hints.get('instance')
+        if (instance is not None
+                and instance._state.db in settings.DATABASE_REPLICAS):
+            # Объект, прочитанный с реплики, сохраняется в основную базу.
+            return 'default'
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {'default', *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+
+class ReplicaMiddleware:
+    """Направляет безопасные запросы к вьюсетам API на реплики.
+
+    Аутентифицированный клиент, который только что изменил данные, на
+    ``REPLICA_PIN_SECONDS`` секунд закрепляется за основной базой, чтобы
+    сразу видеть свои изменения, несмотря на отставание реплик.
+    Пользователя выставляет в запрос Django аутентификация DRF.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Как у MiddlewareMixin: предыдущий middleware должен видеть,
+            # что этот вызывается асинхронно.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+            # Обработчик Django берёт process_view у экземпляра; под ASGI
+            # выбор реплики не должен ждать поток для синхронного кода.
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = _read_database.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_database.reset(token)
+        if self.should_pin(request, response):
+            cache.set(
+                get_client_key(request), True, settings.REPLICA_PIN_SECONDS
+            )
+        return response
+
+    async def __acall__(self, request):
+        token = _read_database.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_database.reset(token)
+        if self.should_pin(request, response):
+            await sync_to_async(cache.set, thread_sensitive=False)(
+                get_client_key(request), True, settings.REPLICA_PIN_SECONDS
+            )
+        return response
+
+    def should_pin(self, request, response):
+        # Анонимные записи (регистрация, получение токена) не меняют
+        # каталог, а за адресом nginx стоят все анонимные клиенты сразу.
+        user = getattr(request, 'user', None)
+        return (request.method not in SAFE_METHODS
+                and settings.REPLICA_PIN_SECONDS > 0
+                and response.status_code < 400
+                and user is not None and user.is_authenticated)
+
+    def can_use_replica(self, request, view_func):
+        view_class = getattr(view_func, 'cls', None)
+        return (settings.DATABASE_REPLICAS
+                and request.method in SAFE_METHODS
+                and view_class and issubclass(view_class, ViewSetMixin))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (self.can_use_replica(request, view_func)
+                and not cache.get(get_client_key(request))):
+            _read_database.set(random.choice(settings.DATABASE_REPLICAS))
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args,
+                            view_kwargs):
+        if not self.can_use_replica(request, view_func):
+            return None
+        pinned = await sync_to_async(cache.get, thread_sensitive=False)(
+            get_client_key(request)
+        )
+        if not pinned:
+            _read_database.set(random.choice(settings.DATABASE_REPLICAS))
+        return None
@@ -33,6 +33,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api_yamdb.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -40,10 +41,40 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api_yamdb.replicas.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
 
+# Профиль только для API (API_ONLY=1): процесс обслуживает /api/ без
+# админки, import_export, сессий и сообщений и с минимальным набором
+# middleware. Админку и /redoc/ отдаёт отдельный процесс с полным
+# профилем (сервис admin в docker-compose).
+API_ONLY = os.getenv('API_ONLY', default='0') == '1'
+
+if API_ONLY:
+    # Модели админки остаются, чтобы удаление пользователя удаляло и его
+    # записи в журнале админки.
+    INSTALLED_APPS = [
+        'api_yamdb.apps.AdminModelsConfig'
+        if app == 'django.contrib.admin' else app
+        for app in INSTALLED_APPS
+        if app not in (
+            'django.contrib.sessions',
+            'django.contrib.messages',
+            'import_export',
+        )
+    ]
+    # API аутентифицирует запросы токеном в DRF, поэтому сессии, CSRF,
+    # сообщения и AuthenticationMiddleware ему не нужны.
+    MIDDLEWARE = [
+        'api_yamdb.metrics.MetricsMiddleware',
+        'django.middleware.security.SecurityMiddleware',
+        'django.middleware.common.CommonMiddleware',
+        'api_yamdb.replicas.ReplicaMiddleware',
+    ]
+    ROOT_URLCONF = 'api_yamdb.urls_api'
+
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
 TEMPLATES = [
     {
@@ -77,6 +108,93 @@ DATABASES = {
     }
 }
 
+# Пул соединений с Postgres на процесс: DB_POOL_SIZE > 0 включает его.
+# Без пула каждый запрос открывает новое соединение.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', default=0))
+if DB_POOL_SIZE > 0 and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default']['ENGINE'] = 'api_yamdb.db.postgresql'
+    DATABASES['default']['POOL'] = {
+        'SIZE': DB_POOL_SIZE,
+        # Соединение старше стольких секунд закрывается и открывается заново.
+        'MAX_LIFETIME': int(os.getenv('DB_POOL_MAX_LIFETIME', default=1800)),
+        # Простаивавшее дольше стольких секунд проверяется перед выдачей.
+        'CHECK_INTERVAL': int(os.getenv('DB_POOL_CHECK_INTERVAL', default=30)),
+        # Сколько секунд ждать свободного соединения.
+        'TIMEOUT': int(os.getenv('DB_POOL_TIMEOUT', default=10)),
+    }
+
+# Реплики для чтения: DB_REPLICA_HOSTS=host1,host2:5433. Остальные
+# параметры подключения те же, что у основной базы.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(
+    filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(',')), 1
+):
+    host, _, port = replica.strip().partition(':')
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api_yamdb.replicas.ReplicaRouter']
+
+# Сколько секунд после записи клиент читает только из основной базы.
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', default=5))
+
+# Cache
+# Для нескольких воркеров gunicorn нужен общий бэкенд, например
+# CACHE_BACKEND=django.core.cache.backends.memcached.PyMemcacheCache
+# и CACHE_LOCATION=memcached:11211.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
+    }
+}
+
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', default=300))
+
+# Сколько секунд nginx может отдавать анонимным клиентам ответы жанров,
+# категорий и произведений из своего кэша; 0 — не кэшировать.
+PROXY_CACHE_SECONDS = int(os.getenv('PROXY_CACHE_SECONDS', default=30))
+
+# Внутренний адрес nginx, через который после записи обновляются
+# закэшированные им ответы, например http://nginx:8080; пустой — ответы
+# устаревают только через PROXY_CACHE_SECONDS.
+PROXY_CACHE_REFRESH_URL = os.getenv('PROXY_CACHE_REFRESH_URL', default='')
+
+# Наибольшее число объектов в одном запросе массового создания.
+BULK_CREATE_MAX_ITEMS = int(os.getenv('BULK_CREATE_MAX_ITEMS', default=1000))
+
+# Сколько произведений выгрузка читает из базы за раз.
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', default=2000))
+
+# Потоки для асинхронного чтения каталога под ASGI (uvicorn); 0 — все
+# вьюхи синхронные, как под WSGI.
+ASYNC_READ_THREADS = int(os.getenv('ASYNC_READ_THREADS', default=0))
+
+# Каталог, через который воркеры gunicorn сводят метрики для /metrics;
+# пустой — /metrics показывает метрики только ответившего процесса.
+METRICS_DIR = os.getenv('METRICS_DIR', default='')
+
+# Как часто (в секундах) воркер сохраняет свои метрики в METRICS_DIR.
+METRICS_FLUSH_INTERVAL = int(os.getenv('METRICS_FLUSH_INTERVAL', default=5))
+
+# За сколько секунд вес рецензии в скорости появления рецензий убывает
+# вдвое (по умолчанию неделя).
+REVIEW_VELOCITY_HALF_LIFE = int(
+    os.getenv('REVIEW_VELOCITY_HALF_LIFE', default=7 * 24 * 3600)
+)
+
+# Байесовский рейтинг: средняя оценка, к которой тянется рейтинг
+# произведения с малым числом рецензий, и вес этой оценки в рецензиях.
+RANKING_PRIOR_MEAN = float(os.getenv('RANKING_PRIOR_MEAN', default=6.0))
+RANKING_PRIOR_WEIGHT = int(os.getenv('RANKING_PRIOR_WEIGHT', default=10))
+
 AUTH_USER_MODEL = 'users.User'
 # Password validation
 
@@ -122,14 +240,27 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
+if API_ONLY:
+    # Браузерному API нужны шаблоны и сессии; отвечаем только JSON.
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = (
+        'api.renderers.FastJSONRenderer',
+    )
+
 MA_NUM = 15
 
+# Конфигурация полнотекстового поиска Postgres для произведений.
+TITLE_SEARCH_CONFIG = 'russian'
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -162,6 +293,12 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Сколько секунд версия токенов пользователя живёт в кэше. С общим
+# кэшем отзыв токенов мгновенный, с локальным — в пределах этого срока.
+TOKEN_VERSION_CACHE_TIMEOUT = int(
+    os.getenv('TOKEN_VERSION_CACHE_TIMEOUT', default=60)
+)
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
@@ -1,8 +1,10 @@
-from django.urls import include, path
+from django.urls import path
 
 from django.contrib import admin
 from django.views.generic import TemplateView
 
+from api_yamdb.urls_api import urlpatterns as api_urlpatterns
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path(
@@ -10,5 +12,4 @@ urlpatterns = [
         TemplateView.as_view(template_name='redoc.html'),
         name='redoc'
     ),
-    path('api/', include('api.urls')),
-]
+] + api_urlpatterns
@@ -0,0 +1,10 @@
+from django.urls import include, path
+
+from api_yamdb.metrics import metrics_view
+
+# Маршруты профиля API_ONLY: без админки и /redoc/, чтобы воркер не
+# импортировал их при старте.
+urlpatterns = [
+    path('api/', include('api.urls')),
+    path('metrics', metrics_view, name='metrics'),
+]
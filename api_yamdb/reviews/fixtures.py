@@ -0,0 +1,182 @@
+import json
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer
+from django.db import connections, transaction
+
+from reviews.loading import keep_timestamps
+
+DEFAULT_CHUNK_SIZE = 2000
+READ_BLOCK_SIZE = 1 << 16
+
+
+class FixtureError(Exception):
+    """Файл фикстур повреждён или не может быть загружен."""
+
+
+class JSONArrayReader:
+    """Объекты верхнего уровня JSON-массива по одному.
+
+    Файл читается блоками, так что в памяти держится только текущий
+    объект, а не весь документ.
+    """
+
+    def __init__(self, stream, block_size=READ_BLOCK_SIZE):
+        self.stream = stream
+        self.block_size = block_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+
+    def __iter__(self):
+        if self.next_char() != '[':
+            raise FixtureError('Фикстуры должны быть JSON-массивом.')
+        self.position += 1
+        while self.next_char(',') != ']':
+            obj = self.decode()
+            if not isinstance(obj, dict):
+                raise FixtureError('Элементы фикстур должны быть объектами.')
+            yield obj
+
+    def read_more(self, error='Неожиданный конец файла фикстур.'):
+        block = self.stream.read(self.block_size)
+        if not block:
+            raise FixtureError(error)
+        self.buffer = self.buffer[self.position:] + block
+        self.position = 0
+
+    def next_char(self, separators=''):
+        """Первый значимый символ после пробелов и разделителей."""
+        while True:
+            while self.position < len(self.buffer) and (
+                self.buffer[self.position].isspace()
+                or self.buffer[self.position] in separators
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            self.read_more()
+
+    def decode(self):
+        while True:
+            try:
+                obj, self.position = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+                return obj
+            except json.JSONDecodeError as error:
+                # Объект может быть обрезан границей блока.
+                self.read_more(f'Некорректный JSON: {error}')
+
+
+def models_in_dependency_order():
+    return serializers.sort_dependencies(
+        [(app_config, None) for app_config in apps.get_app_configs()],
+        allow_cycles=True,
+    )
+
+
+class FixtureLoader:
+    """Загрузка фикстур пакетами через ``bulk_create``.
+
+    Объекты группируются по моделям; пакет модели вставляется, когда
+    наберётся ``chunk_size`` объектов, остатки — в порядке зависимостей
+    моделей. Проверка внешних ключей откладывается до конца загрузки,
+    как в ``loaddata``, поэтому порядок объектов в файле не важен.
+    Объекты с уже существующими ключами обновляются, связи many-to-many
+    заменяются. Сигналы моделей не отправляются.
+    """
+
+    def __init__(self, using, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.using = using
+        self.connection = connections[using]
+        self.chunk_size = chunk_size
+        self.pending = {}
+        self.counts = {}
+
+    def load(self, stream):
+        """Загружает фикстуры из потока; возвращает число объектов."""
+        objects = Deserializer(JSONArrayReader(stream), using=self.using)
+        with transaction.atomic(using=self.using):
+            with self.connection.constraint_checks_disabled():
+                for deserialized in objects:
+                    model = type(deserialized.object)
+                    pending = self.pending.setdefault(model, {})
+                    key = deserialized.object.pk
+                    pending[id(deserialized) if key is None else key] = (
+                        deserialized
+                    )
+                    if len(pending) >= self.chunk_size:
+                        self.flush(model)
+                for model in models_in_dependency_order():
+                    if self.pending.get(model):
+                        self.flush(model)
+            tables = [model._meta.db_table for model in self.counts]
+            self.connection.check_constraints(table_names=tables)
+            self.reset_sequences()
+        return sum(self.counts.values())
+
+    def flush(self, model):
+        batch = list(self.pending.pop(model).values())
+        objs = [deserialized.object for deserialized in batch]
+        manager = model._base_manager.db_manager(self.using)
+        keys = [obj.pk for obj in objs if obj.pk is not None]
+        existing = set(
+            manager.filter(pk__in=keys).values_list('pk', flat=True)
+        ) if keys else set()
+        created = [obj for obj in objs if obj.pk not in existing]
+        updated = [obj for obj in objs if obj.pk in existing]
+        # Даты берутся из фикстур, как при raw-сохранении в loaddata.
+        with keep_timestamps(model):
+            if created:
+                manager.bulk_create(created)
+            if updated:
+                manager.bulk_update(updated, [
+                    field.attname for field in model._meta.concrete_fields
+                    if not field.primary_key
+                ])
+        self.set_many_to_many(model, batch, existing)
+        self.counts[model] = self.counts.get(model, 0) + len(batch)
+
+    def set_many_to_many(self, model, batch, existing):
+        """Заменяет связи many-to-many, как ``loaddata`` через ``set()``."""
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            source = through._meta.get_field(field.m2m_field_name()).attname
+            target = through._meta.get_field(
+                field.m2m_reverse_field_name()
+            ).attname
+            rows = []
+            replaced = []
+            for deserialized in batch:
+                if field.name not in (deserialized.m2m_data or {}):
+                    continue
+                obj = deserialized.object
+                if obj.pk is None:
+                    raise FixtureError(
+                        f'{model._meta.label}: для связей {field.name} '
+                        'у объекта должен быть pk.'
+                    )
+                if obj.pk in existing:
+                    replaced.append(obj.pk)
+                rows.extend(
+                    through(**{source: obj.pk, target: key})
+                    for key in dict.fromkeys(deserialized.m2m_data[field.name])
+                )
+            manager = through._base_manager.db_manager(self.using)
+            if replaced:
+                manager.filter(**{f'{source}__in': replaced}).delete()
+            if rows:
+                manager.bulk_create(rows)
+                self.counts.setdefault(through, 0)
+
+    def reset_sequences(self):
+        statements = self.connection.ops.sequence_reset_sql(
+            no_style(), list(self.counts)
+        )
+        if statements:
+            with self.connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
@@ -0,0 +1,353 @@
+import csv
+import datetime as dt
+import io
+import json
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.utils import timezone
+
+from users.admin import (CategoryResource, CommentResource, GenreResource,
+                         GenreTitleResource, ReviewResource, TitleResource,
+                         UserResource)
+
+# Раскладки колонок совпадают с ресурсами импорта в админке. Порядок
+# словаря — порядок загрузки: таблицы раньше ссылающихся на них.
+LAYOUTS = {
+    'users': UserResource,
+    'categories': CategoryResource,
+    'genres': GenreResource,
+    'titles': TitleResource,
+    'genre_title': GenreTitleResource,
+    'reviews': ReviewResource,
+    'comments': CommentResource,
+}
+FORMATS = ('csv', 'ndjson')
+DEFAULT_CHUNK_SIZE = 5000
+# Ключи связанной таблицы не больше этого размера держатся в памяти;
+# для больших таблиц внешние ключи проверяются одним запросом на пакет.
+KEY_MAP_LIMIT = 1000000
+
+
+class RowError(Exception):
+    """Строку входных данных нельзя загрузить."""
+
+    def __init__(self, line, message):
+        super().__init__(f'строка {line}: {message}')
+        self.line = line
+
+
+class LoadResult:
+    """Итог загрузки одного файла."""
+
+    def __init__(self, rows=0, skipped=0, seconds=0.0):
+        self.rows = rows
+        self.skipped = skipped
+        self.seconds = seconds
+
+    @property
+    def rate(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def read_rows(path, file_format):
+    """Построчно читает CSV с заголовком или NDJSON."""
+    with open(path, newline='', encoding='utf-8') as source:
+        if file_format == 'csv':
+            reader = csv.DictReader(source)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line, text in enumerate(source, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError as error:
+                raise RowError(line, f'некорректный JSON: {error}')
+            if not isinstance(row, dict):
+                raise RowError(line, 'ожидается JSON-объект')
+            yield line, row
+
+
+def parse_keys(value):
+    """Список ключей many-to-many: JSON-список или строка через запятую."""
+    if value in (None, ''):
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    elif not isinstance(value, (list, tuple)):
+        value = [value]
+    return [int(key) for key in value if str(key).strip()]
+
+
+def convert(field, raw):
+    """Значение поля модели из CSV-строки или значения JSON."""
+    if raw is None or raw == '':
+        if (field.empty_strings_allowed and not field.null
+                and not field.is_relation):
+            return ''
+        return None
+    if field.is_relation:
+        return field.target_field.to_python(raw)
+    value = field.to_python(raw)
+    field.run_validators(value)
+    if isinstance(value, dt.datetime) and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def copy_value(value):
+    """Значение в формате CSV для COPY: пустое без кавычек — NULL."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (int, float)):
+        return str(value)
+    return '"{}"'.format(str(value).replace('"', '""'))
+
+
+@contextmanager
+def keep_timestamps(model):
+    """Сохраняет даты из входных данных при пакетной вставке.
+
+    Иначе ``auto_now_add`` заменил бы их текущим временем. Возвращает
+    поля ``auto_now_add``.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield fields
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class RelatedKeys:
+    """Ключи связанной таблицы для проверки внешних ключей без запросов
+    на каждую строку."""
+
+    def __init__(self, model, using):
+        self.queryset = model._default_manager.using(using)
+        self.keys = None
+        if self.queryset.count() <= KEY_MAP_LIMIT:
+            self.keys = set(
+                self.queryset.values_list('pk', flat=True).iterator()
+            )
+
+    def add(self, keys):
+        if self.keys is None:
+            return
+        if None in keys:
+            # Ключи вставленных строк неизвестны: дальше проверяем запросом.
+            self.keys = None
+            return
+        self.keys.update(keys)
+
+    def missing(self, keys):
+        keys = set(keys)
+        if self.keys is not None:
+            return keys - self.keys
+        return keys - set(
+            self.queryset.filter(pk__in=keys).values_list('pk', flat=True)
+        )
+
+
+class BulkLoader:
+    """Потоковая загрузка пакетами через COPY или ``bulk_create``.
+
+    В памяти одновременно держится только текущий пакет и множества
+    ключей небольших связанных таблиц, поэтому расход памяти не зависит
+    от размера входного файла. Каждый пакет сохраняется в своей
+    транзакции.
+    """
+
+    def __init__(self, using, chunk_size=DEFAULT_CHUNK_SIZE, use_copy=True,
+                 skip_invalid=False):
+        self.using = using
+        self.connection = connections[using]
+        self.chunk_size = chunk_size
+        self.use_copy = use_copy and self.connection.vendor == 'postgresql'
+        self.skip_invalid = skip_invalid
+        self.related = {}
+        self.loaded_models = set()
+        self.now = timezone.now()
+
+    def related_keys(self, model):
+        if model not in self.related:
+            self.related[model] = RelatedKeys(model, self.using)
+        return self.related[model]
+
+    def load(self, name, path, file_format, progress=None):
+        resource = LAYOUTS[name]
+        model = resource._meta.model
+        fields = [
+            model._meta.get_field(field_name)
+            for field_name in resource._meta.fields
+        ]
+        self.loaded_models.add(model)
+        result = LoadResult()
+        started = time.monotonic()
+        chunk = []
+        with keep_timestamps(model) as timestamps:
+            for line, row in read_rows(path, file_format):
+                try:
+                    chunk.append(
+                        (line, *self.build(model, fields, timestamps, row))
+                    )
+                except (RowError, ValidationError, ValueError,
+                        TypeError) as error:
+                    self.reject(line, error, result)
+                if len(chunk) >= self.chunk_size:
+                    self.flush(model, fields, chunk, result)
+                    chunk = []
+                    if progress:
+                        result.seconds = time.monotonic() - started
+                        progress(result)
+            if chunk:
+                self.flush(model, fields, chunk, result)
+        result.seconds = time.monotonic() - started
+        return result
+
+    def reject(self, line, error, result):
+        if not isinstance(error, RowError):
+            if isinstance(error, ValidationError):
+                error = '; '.join(error.messages)
+            error = RowError(line, error)
+        if not self.skip_invalid:
+            raise error
+        result.skipped += 1
+
+    def build(self, model, fields, timestamps, row):
+        """Объект модели и ключи many-to-many из строки входных данных."""
+        values = {}
+        links = {}
+        for field in fields:
+            if field.name not in row:
+                continue
+            if field.many_to_many:
+                links[field] = parse_keys(row[field.name])
+            else:
+                values[field.attname] = convert(field, row[field.name])
+        for field in timestamps:
+            if values.get(field.attname) is None:
+                values[field.attname] = self.now
+        if hasattr(model, 'set_unusable_password'):
+            values.setdefault('password', make_password(None))
+        return model(**values), links
+
+    def flush(self, model, fields, chunk, result):
+        chunk = self.check_foreign_keys(fields, chunk, result)
+        if not chunk:
+            return
+        objs = [obj for _, obj, _ in chunk]
+        with transaction.atomic(using=self.using):
+            self.insert(model, objs)
+            self.insert_links(chunk)
+        if model in self.related:
+            self.related[model].add([obj.pk for obj in objs])
+        result.rows += len(objs)
+
+    def check_foreign_keys(self, fields, chunk, result):
+        """Отбрасывает или отвергает строки со ссылками в никуда."""
+        bad_lines = {}
+        for field in fields:
+            if not field.is_relation:
+                continue
+            related = self.related_keys(field.related_model)
+            if field.many_to_many:
+                keys = {
+                    key for _, _, links in chunk
+                    for key in links.get(field, ())
+                }
+            else:
+                keys = {
+                    getattr(obj, field.attname) for _, obj, _ in chunk
+                } - {None}
+            missing = related.missing(keys)
+            if not missing:
+                continue
+            for line, obj, links in chunk:
+                if field.many_to_many:
+                    broken = set(links.get(field, ())) & missing
+                else:
+                    broken = {getattr(obj, field.attname)} & missing
+                if broken:
+                    bad_lines.setdefault(line, RowError(
+                        line, f'{field.name}: нет объектов с ключами '
+                        + ', '.join(map(str, sorted(broken)))
+                    ))
+        for line in sorted(bad_lines):
+            self.reject(line, bad_lines[line], result)
+        return [item for item in chunk if item[0] not in bad_lines]
+
+    def insert(self, model, objs):
+        if self.use_copy:
+            self.copy(model, objs)
+        else:
+            model._default_manager.db_manager(self.using).bulk_create(objs)
+
+    def copy(self, model, objs):
+        """Вставка через ``COPY ... FROM STDIN`` в формате CSV."""
+        columns = [
+            field for field in model._meta.concrete_fields
+            if not (field.primary_key and objs[0].pk is None)
+        ]
+        buffer = io.StringIO()
+        for obj in objs:
+            buffer.write(','.join(
+                copy_value(field.get_db_prep_save(
+                    field.pre_save(obj, True), self.connection
+                ))
+                for field in columns
+            ))
+            buffer.write('\n')
+        buffer.seek(0)
+        quote = self.connection.ops.quote_name
+        sql = 'COPY {} ({}) FROM STDIN WITH (FORMAT csv)'.format(
+            quote(model._meta.db_table),
+            ', '.join(quote(field.column) for field in columns),
+        )
+        with self.connection.cursor() as cursor:
+            cursor.copy_expert(sql, buffer)
+
+    def insert_links(self, chunk):
+        """Строки промежуточных таблиц для колонок many-to-many."""
+        rows = {}
+        for line, obj, links in chunk:
+            for field, keys in links.items():
+                if keys and obj.pk is None:
+                    raise RowError(
+                        line, f'для колонки {field.name} нужен id'
+                    )
+                through = field.remote_field.through
+                source = through._meta.get_field(field.m2m_field_name())
+                target = through._meta.get_field(
+                    field.m2m_reverse_field_name()
+                )
+                rows.setdefault(through, []).extend(
+                    through(**{source.attname: obj.pk, target.attname: key})
+                    for key in dict.fromkeys(keys)
+                )
+        for through, objs in rows.items():
+            self.insert(through, objs)
+            self.loaded_models.add(through)
+
+    def reset_sequences(self):
+        """Сдвигает последовательности ключей за загруженные id."""
+        statements = self.connection.ops.sequence_reset_sql(
+            no_style(), list(self.loaded_models)
+        )
+        if statements:
+            with self.connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
@@ -0,0 +1,132 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+
+from api.cache import bump_generation
+from reviews.loading import (DEFAULT_CHUNK_SIZE, FORMATS, LAYOUTS,
+                             BulkLoader, RowError)
+from reviews.models import GenreTitle, Review, Title
+from reviews.ranking import rebuild_rankings
+from reviews.ratings import rebuild_ratings
+from reviews.statistics import rebuild_statistics
+
+
+class Command(BaseCommand):
+    help = ('Потоково загружает пользователей, произведения, рецензии и '
+            'комментарии из CSV или NDJSON в раскладке ресурсов импорта.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'inputs', nargs='+', metavar='таблица=файл',
+            help='Таблица ({}) и путь к файлу; таблицы загружаются '
+                 'в порядке зависимостей.'.format(', '.join(LAYOUTS))
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат файлов; по умолчанию определяется по расширению.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Сколько строк вставлять за раз.'
+        )
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Не использовать COPY даже на Postgres.'
+        )
+        parser.add_argument(
+            '--skip-invalid', action='store_true',
+            help='Пропускать некорректные строки вместо остановки.'
+        )
+        parser.add_argument(
+            '--no-ratings', action='store_true',
+            help='Не пересчитывать рейтинги после загрузки.'
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='База данных, в которую загружаются данные.'
+        )
+
+    def parse_inputs(self, inputs, file_format):
+        parsed = {}
+        for item in inputs:
+            name, sep, path = item.partition('=')
+            if not sep or name not in LAYOUTS:
+                raise CommandError(
+                    f'Ожидается таблица=файл, таблица одна из: '
+                    f'{", ".join(LAYOUTS)}; получено {item!r}.'
+                )
+            if not os.path.isfile(path):
+                raise CommandError(f'Файл не найден: {path}')
+            extension = os.path.splitext(path)[1].lstrip('.').lower()
+            if extension == 'jsonl':
+                extension = 'ndjson'
+            parsed[name] = (path, file_format or extension)
+            if parsed[name][1] not in FORMATS:
+                raise CommandError(
+                    f'Не удалось определить формат {path}; укажите --format.'
+                )
+        return [(name, *parsed[name]) for name in LAYOUTS if name in parsed]
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть положительным.')
+        self.verbosity = options['verbosity']
+        using = options['database']
+        loader = BulkLoader(
+            using,
+            chunk_size=options['chunk_size'],
+            use_copy=not options['no_copy'],
+            skip_invalid=options['skip_invalid'],
+        )
+        method = 'COPY' if loader.use_copy else 'bulk_create'
+        for name, path, file_format in self.parse_inputs(
+            options['inputs'], options['format']
+        ):
+            self.stdout.write(f'{name}: {path} ({file_format}, {method})')
+            try:
+                result = loader.load(
+                    name, path, file_format, progress=self.report_progress
+                )
+            except RowError as error:
+                raise CommandError(f'{path}, {error}')
+            except IntegrityError as error:
+                raise CommandError(
+                    f'{path}: пакет нарушает ограничения базы: {error}'
+                )
+            finally:
+                loader.reset_sequences()
+            self.stdout.write(
+                f'  загружено строк: {result.rows}, пропущено: '
+                f'{result.skipped}, {result.seconds:.1f} с, '
+                f'{result.rate:.0f} строк/с'
+            )
+        self.finish(loader, using, rebuild=not options['no_ratings'])
+        self.stdout.write(self.style.SUCCESS('Загрузка завершена.'))
+
+    def report_progress(self, result):
+        if self.verbosity >= 2:
+            self.stdout.write(
+                f'  ... {result.rows} строк, {result.rate:.0f} строк/с'
+            )
+
+    def finish(self, loader, using, rebuild):
+        """Пересчитывает то, что не обновляется при массовой вставке."""
+        loaded = loader.loaded_models
+        if Title in loaded:
+            Title.objects.using(using).filter(
+                search_vector__isnull=True
+            ).update_search_vector()
+        if Review in loaded and rebuild:
+            with transaction.atomic(using=using):
+                fixed = rebuild_ratings(using)
+                rebuilt = rebuild_statistics(using)
+            self.stdout.write(f'Пересчитано рейтингов: {fixed}')
+            self.stdout.write(f'Пересчитано статистик: {rebuilt}')
+        if loaded & {Title, GenreTitle, Review} and rebuild:
+            with transaction.atomic(using=using):
+                ranked = rebuild_rankings(using)
+            self.stdout.write(f'Пересчитано строк рейтинга: {ranked}')
+        # Вставка идёт в обход сигналов, поэтому кэш ответов сбрасывается
+        # явно.
+        bump_generation(*loaded)
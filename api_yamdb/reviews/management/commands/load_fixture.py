@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, transaction
+
+from api.cache import bump_generation
+from reviews.fixtures import DEFAULT_CHUNK_SIZE, FixtureError, FixtureLoader
+from reviews.models import GenreTitle, Review, Title
+from reviews.ranking import rebuild_rankings
+from reviews.ratings import rebuild_ratings
+from reviews.statistics import rebuild_statistics
+
+
+class Command(BaseCommand):
+    help = ('Быстро загружает JSON-фикстуры в формате dumpdata: файл '
+            'читается потоком, объекты вставляются пакетами.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'fixtures', nargs='+', metavar='файл',
+            help='Пути к JSON-файлам фикстур.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Сколько объектов одной модели вставлять за раз.'
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='База данных, в которую загружаются фикстуры.'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть положительным.')
+        using = options['database']
+        started = time.monotonic()
+        loaded = set()
+        total = 0
+        for path in options['fixtures']:
+            loader = FixtureLoader(using, chunk_size=options['chunk_size'])
+            try:
+                with open(path, encoding='utf-8') as stream:
+                    total += loader.load(stream)
+            except OSError as error:
+                raise CommandError(f'Не удалось открыть {path}: {error}')
+            except (FixtureError, DeserializationError,
+                    DatabaseError) as error:
+                raise CommandError(f'Ошибка загрузки {path}: {error}')
+            loaded.update(loader.counts)
+        if Title in loaded:
+            Title.objects.using(using).update_search_vector()
+        if Review in loaded:
+            with transaction.atomic(using=using):
+                rebuild_ratings(using)
+                rebuild_statistics(using)
+        if loaded & {Title, GenreTitle, Review}:
+            with transaction.atomic(using=using):
+                rebuild_rankings(using)
+        # Вставка идёт в обход сигналов, поэтому кэш ответов сбрасывается
+        # явно.
+        bump_generation(*loaded)
+        self.stdout.write(
+            f'Установлено объектов: {total} из {len(options["fixtures"])} '
+            f'файлов за {time.monotonic() - started:.1f} с.'
+        )
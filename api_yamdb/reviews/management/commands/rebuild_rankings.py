@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from reviews.ranking import iter_ranking_mismatches, rebuild_rankings
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает рейтинги произведений и проверяет, что они '
+            'совпадают с данными.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только проверить рейтинги, ничего не изменяя.'
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='База данных, в которой пересчитываются рейтинги.'
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not options['check']:
+            with transaction.atomic(using=using):
+                fixed = rebuild_rankings(using)
+            self.stdout.write(f'Исправлено строк рейтинга: {fixed}')
+        mismatches = sorted({
+            (actual or stored).title_id
+            for stored, actual in iter_ranking_mismatches(using)
+        })
+        if mismatches:
+            raise CommandError(
+                'Рейтинги расходятся с данными у произведений: '
+                + ', '.join(map(str, mismatches))
+            )
+        self.stdout.write(self.style.SUCCESS('Все рейтинги согласованы.'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from reviews.ratings import iter_rating_mismatches, rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает сохранённые рейтинги произведений по рецензиям '
+            'и проверяет, что агрегаты совпадают с данными.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только проверить агрегаты, ничего не изменяя.'
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='База данных, в которой пересчитываются рейтинги.'
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not options['check']:
+            with transaction.atomic(using=using):
+                fixed = rebuild_ratings(using)
+            self.stdout.write(f'Исправлено агрегатов: {fixed}')
+        mismatches = [
+            title.pk for title, _, _ in iter_rating_mismatches(using)
+        ]
+        if mismatches:
+            raise CommandError(
+                'Агрегаты расходятся с рецензиями у произведений: '
+                + ', '.join(map(str, mismatches))
+            )
+        self.stdout.write(self.style.SUCCESS('Все рейтинги согласованы.'))
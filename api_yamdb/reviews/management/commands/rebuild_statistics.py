@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from reviews.statistics import iter_statistics_mismatches, rebuild_statistics
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает статистику рецензий произведений и проверяет, '
+            'что она совпадает с данными.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только проверить статистику, ничего не изменяя.'
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='База данных, в которой пересчитывается статистика.'
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not options['check']:
+            with transaction.atomic(using=using):
+                fixed = rebuild_statistics(using)
+            self.stdout.write(f'Исправлено статистик: {fixed}')
+        mismatches = [
+            actual.title_id
+            for _, actual in iter_statistics_mismatches(using)
+        ]
+        if mismatches:
+            raise CommandError(
+                'Статистика расходится с рецензиями у произведений: '
+                + ', '.join(map(str, mismatches))
+            )
+        self.stdout.write(self.style.SUCCESS('Вся статистика согласована.'))
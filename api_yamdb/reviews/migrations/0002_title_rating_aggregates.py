@@ -0,0 +1,41 @@
+# Generated by Django 3.2 on 2026-10-18 19:01
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_rating_aggregates(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    using = schema_editor.connection.alias
+    titles = Title.objects.using(using).annotate(
+        actual_sum=Coalesce(Sum('reviews__score'), 0),
+        actual_count=Count('reviews'),
+    ).filter(actual_count__gt=0)
+    for title in titles.iterator():
+        title.rating_sum = title.actual_sum
+        title.rating_count = title.actual_count
+        title.save(update_fields=('rating_sum', 'rating_count'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(
+            fill_rating_aggregates, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 3.2 on 2026-10-18 19:04
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+POSTGRES_FORWARD_SQL = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS reviews_title_search_vector_idx '
+    'ON reviews_title USING gin (search_vector)',
+    # Django сравнивает istartswith как UPPER("name"::text) LIKE UPPER(...),
+    # поэтому триграммный индекс строится по тому же выражению.
+    'CREATE INDEX IF NOT EXISTS reviews_title_name_trgm_idx '
+    'ON reviews_title USING gin (UPPER("name"::text) gin_trgm_ops)',
+)
+POSTGRES_BACKWARD_SQL = (
+    'DROP INDEX IF EXISTS reviews_title_name_trgm_idx',
+    'DROP INDEX IF EXISTS reviews_title_search_vector_idx',
+)
+
+
+def create_search_indexes(apps, schema_editor):
+    """Индексы GIN есть только в Postgres, на других базах шаг пропускается."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in POSTGRES_FORWARD_SQL:
+        schema_editor.execute(sql)
+    Title = apps.get_model('reviews', 'Title')
+    config = settings.TITLE_SEARCH_CONFIG
+    Title.objects.using(schema_editor.connection.alias).update(
+        search_vector=(
+            SearchVector('name', weight='A', config=config)
+            + SearchVector('description', weight='B', config=config)
+        )
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in POSTGRES_BACKWARD_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_timeline_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
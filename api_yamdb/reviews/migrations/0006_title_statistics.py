@@ -0,0 +1,37 @@
+# Generated by Django 3.2 on 2026-10-18 19:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_modification_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStatistics',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='reviews.title', verbose_name='Произведение')),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Рецензий')),
+                ('score_1', models.PositiveIntegerField(default=0, verbose_name='Оценок 1')),
+                ('score_2', models.PositiveIntegerField(default=0, verbose_name='Оценок 2')),
+                ('score_3', models.PositiveIntegerField(default=0, verbose_name='Оценок 3')),
+                ('score_4', models.PositiveIntegerField(default=0, verbose_name='Оценок 4')),
+                ('score_5', models.PositiveIntegerField(default=0, verbose_name='Оценок 5')),
+                ('score_6', models.PositiveIntegerField(default=0, verbose_name='Оценок 6')),
+                ('score_7', models.PositiveIntegerField(default=0, verbose_name='Оценок 7')),
+                ('score_8', models.PositiveIntegerField(default=0, verbose_name='Оценок 8')),
+                ('score_9', models.PositiveIntegerField(default=0, verbose_name='Оценок 9')),
+                ('score_10', models.PositiveIntegerField(default=0, verbose_name='Оценок 10')),
+                ('recent_reviews', models.FloatField(default=0, verbose_name='Недавние рецензии')),
+                ('recent_at', models.FloatField(default=0, verbose_name='Момент пересчёта недавних')),
+            ],
+            options={
+                'verbose_name': 'Статистика произведения',
+                'verbose_name_plural': 'Статистика произведений',
+            },
+        ),
+    ]
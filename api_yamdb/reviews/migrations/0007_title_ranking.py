@@ -0,0 +1,92 @@
+# Generated by Django 3.2 on 2026-10-18 19:49
+
+import math
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_rankings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    TitleRanking = apps.get_model('reviews', 'TitleRanking')
+    using = schema_editor.connection.alias
+    weight = settings.RANKING_PRIOR_WEIGHT
+    half_life = settings.REVIEW_VELOCITY_HALF_LIFE
+    exponents = {}
+    for title_id, pub_date in Review.objects.using(using).values_list(
+        'title_id', 'pub_date'
+    ).iterator():
+        exponents.setdefault(title_id, []).append(
+            pub_date.timestamp() / half_life
+        )
+    genres = {}
+    for title_id, genre_id in GenreTitle.objects.using(using).filter(
+        title_id__isnull=False, genre_id__isnull=False
+    ).values_list('title_id', 'genre_id').distinct():
+        genres.setdefault(title_id, []).append(genre_id)
+    rankings = []
+    for title in Title.objects.using(using).iterator():
+        rank_score = (
+            (weight * settings.RANKING_PRIOR_MEAN + title.rating_sum)
+            / (weight + title.rating_count)
+            if weight + title.rating_count else settings.RANKING_PRIOR_MEAN
+        )
+        # log2 суммы 2 ** (t / T) без переполнения.
+        values = exponents.get(title.pk)
+        trending = 0.0
+        if values:
+            top = max(values)
+            trending = top + math.log2(
+                sum(2 ** (value - top) for value in values)
+            )
+        scopes = ['all'] + [
+            f'genre:{genre_id}' for genre_id in genres.get(title.pk, ())
+        ]
+        if title.category_id is not None:
+            scopes.append(f'category:{title.category_id}')
+        rankings.extend(
+            TitleRanking(title_id=title.pk, scope=scope,
+                         rank_score=rank_score, trending_score=trending)
+            for scope in scopes
+        )
+    TitleRanking.objects.using(using).bulk_create(rankings, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_statistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=32, verbose_name='Область')),
+                ('rank_score', models.FloatField(verbose_name='Байесовский рейтинг')),
+                ('trending_score', models.FloatField(verbose_name='Популярность')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг произведения',
+                'verbose_name_plural': 'Рейтинги произведений',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['scope', '-rank_score', 'title'], name='ranking_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['scope', '-trending_score', 'title'], name='ranking_trending_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='titleranking',
+            constraint=models.UniqueConstraint(fields=('scope', 'title'), name='unique_title_ranking'),
+        ),
+        migrations.RunPython(fill_rankings, migrations.RunPython.noop),
+    ]
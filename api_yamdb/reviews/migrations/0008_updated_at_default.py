@@ -0,0 +1,39 @@
+# Generated by Django 3.2 on 2026-10-18 20:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_ranking'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Дата изменения'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Дата изменения'),
+        ),
+        migrations.AlterField(
+            model_name='genre',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Дата изменения'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Дата изменения'),
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Дата изменения'),
+        ),
+    ]
@@ -1,9 +1,12 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.utils import timezone
 
 from django.contrib.auth import get_user_model
 
+from reviews.search import TitleQuerySet
 from users.models import Common
 
 User = get_user_model()
@@ -28,6 +31,9 @@ class Genre(Common):
 class Title(models.Model):
     """Модель заголовков."""
 
+    RATING_FIELDS = ('rating_sum', 'rating_count')
+    SERVICE_FIELDS = RATING_FIELDS + ('search_vector',)
+
     name = models.CharField(
         'Название',
         max_length=100,
@@ -52,6 +58,26 @@ class Title(models.Model):
         null=True,
         blank=True
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0,
+        editable=False
+    )
+    search_vector = SearchVectorField(
+        'Поисковый вектор',
+        null=True,
+        editable=False
+    )
+    updated_at = models.DateTimeField(
+        'Дата изменения', default=timezone.now, editable=False
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
@@ -60,6 +86,38 @@ class Title(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Агрегаты оценок меняются только атомарными UPDATE из сигналов
+        # рецензий, а поисковый вектор — выражением в базе, поэтому обычное
+        # сохранение их не перезаписывает.
+        if (not self._state.adding and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.SERVICE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+        type(self).objects.using(self._state.db).filter(
+            pk=self.pk
+        ).update_search_vector()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Категория на момент загрузки нужна, чтобы перенести
+        # произведение между рейтингами категорий при её изменении.
+        if 'category_id' in instance.__dict__:
+            instance._loaded_category_id = instance.category_id
+        return instance
+
+    @property
+    def rating(self):
+        """Средняя оценка по сохранённым агрегатам."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
 
 class Review(models.Model):
     """Модель рецензии на произведение."""
@@ -86,6 +144,9 @@ class Review(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации обзора'
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения', default=timezone.now, editable=False
+    )
 
     class Meta:
         ordering = ('-pub_date',)
@@ -95,10 +156,114 @@ class Review(models.Model):
             models.UniqueConstraint(fields=['title_id', 'author'],
                                     name='unique_review')
         ]
+        indexes = [
+            # Ключ курсорной пагинации ленты рецензий произведения.
+            models.Index(fields=['title', '-pub_date', '-id'],
+                         name='review_title_pub_date_idx'),
+        ]
 
     def __str__(self):
         return f'{self.text[settings.MA_NUM]}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Оценка и произведение на момент загрузки нужны, чтобы пересчитать
+        # агрегаты при их изменении.
+        instance._loaded_score = instance.__dict__.get('score')
+        instance._loaded_title_id = instance.__dict__.get('title_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Агрегаты произведения обновляются в post_save в той же транзакции.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+class TitleStatistics(models.Model):
+    """Статистика рецензий произведения.
+
+    Обновляется из сигналов рецензий, поэтому читается одним запросом по
+    первичному ключу. ``recent_reviews`` — число рецензий с весом,
+    убывающим вдвое каждые ``REVIEW_VELOCITY_HALF_LIFE`` секунд,
+    приведённое к моменту ``recent_at`` (Unix-время).
+    """
+
+    SCORE_FIELDS = tuple(f'score_{score}' for score in range(1, 11))
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='statistics',
+        verbose_name='Произведение'
+    )
+    review_count = models.PositiveIntegerField('Рецензий', default=0)
+    score_1 = models.PositiveIntegerField('Оценок 1', default=0)
+    score_2 = models.PositiveIntegerField('Оценок 2', default=0)
+    score_3 = models.PositiveIntegerField('Оценок 3', default=0)
+    score_4 = models.PositiveIntegerField('Оценок 4', default=0)
+    score_5 = models.PositiveIntegerField('Оценок 5', default=0)
+    score_6 = models.PositiveIntegerField('Оценок 6', default=0)
+    score_7 = models.PositiveIntegerField('Оценок 7', default=0)
+    score_8 = models.PositiveIntegerField('Оценок 8', default=0)
+    score_9 = models.PositiveIntegerField('Оценок 9', default=0)
+    score_10 = models.PositiveIntegerField('Оценок 10', default=0)
+    recent_reviews = models.FloatField('Недавние рецензии', default=0)
+    recent_at = models.FloatField('Момент пересчёта недавних', default=0)
+
+    class Meta:
+        verbose_name = 'Статистика произведения'
+        verbose_name_plural = 'Статистика произведений'
+
+    def __str__(self):
+        return f'{self.title_id}: {self.review_count}'
+
+    @property
+    def scores(self):
+        """Число оценок по значениям от 1 до 10."""
+        return {
+            score: getattr(self, field)
+            for score, field in enumerate(self.SCORE_FIELDS, start=1)
+        }
+
+
+class TitleRanking(models.Model):
+    """Место произведения в рейтингах.
+
+    Строка есть для каждой области, в которую входит произведение:
+    ``all``, ``category:<id>`` и ``genre:<id>``. Индексы по области и
+    оценке позволяют отдавать произведения по рейтингу без сортировки
+    при запросе.
+    """
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+        verbose_name='Произведение'
+    )
+    scope = models.CharField('Область', max_length=32)
+    rank_score = models.FloatField('Байесовский рейтинг')
+    trending_score = models.FloatField('Популярность')
+
+    class Meta:
+        verbose_name = 'Рейтинг произведения'
+        verbose_name_plural = 'Рейтинги произведений'
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'title'],
+                                    name='unique_title_ranking')
+        ]
+        indexes = [
+            models.Index(fields=['scope', '-rank_score', 'title'],
+                         name='ranking_rank_idx'),
+            models.Index(fields=['scope', '-trending_score', 'title'],
+                         name='ranking_trending_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.scope}: {self.title_id}'
+
 
 class Comment(models.Model):
     """Модель комментария к рецензии."""
@@ -116,11 +281,19 @@ class Comment(models.Model):
         related_name='comments'
     )
     pub_date = models.DateTimeField('Дата комментария', auto_now_add=True)
+    updated_at = models.DateTimeField(
+        'Дата изменения', default=timezone.now, editable=False
+    )
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            # Ключ курсорной пагинации ленты комментариев к рецензии.
+            models.Index(fields=['review', '-pub_date', '-id'],
+                         name='comment_review_pub_date_idx'),
+        ]
 
     def __str__(self):
         return f'{self.text[settings.MA_NUM]}'
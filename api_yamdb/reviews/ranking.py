@@ -0,0 +1,268 @@
+import math
+from itertools import islice
+
+from django.conf import settings
+
+from reviews.models import GenreTitle, Title, TitleRanking
+
+REBUILD_BATCH_SIZE = 1000
+SCOPE_ALL = 'all'
+# Параметр ordering и поле оценки, по которому идёт порядок.
+ORDERINGS = {
+    'rank': 'rank_score',
+    'trending': 'trending_score',
+}
+SCORE_TOLERANCE = 1e-9
+
+
+def category_scope(category_id):
+    return f'category:{category_id}'
+
+
+def genre_scope(genre_id):
+    return f'genre:{genre_id}'
+
+
+def bayesian_rating(rating_sum, rating_count):
+    """Средняя оценка, стянутая к ``RANKING_PRIOR_MEAN``.
+
+    Априорная оценка входит с весом ``RANKING_PRIOR_WEIGHT`` рецензий,
+    поэтому произведение с одной десяткой не обгоняет произведение с
+    сотней девяток.
+    """
+    weight = settings.RANKING_PRIOR_WEIGHT
+    if not weight + rating_count:
+        return settings.RANKING_PRIOR_MEAN
+    return (
+        (weight * settings.RANKING_PRIOR_MEAN + rating_sum)
+        / (weight + rating_count)
+    )
+
+
+def trending_score(review_count, recent_reviews, recent_at):
+    """Популярность: ``log2`` суммы ``2 ** (t / T)`` по рецензиям.
+
+    ``t`` — время публикации рецензии, ``T`` — период полураспада
+    ``REVIEW_VELOCITY_HALF_LIFE``. Недавние рецензии в любой момент
+    равны ``2 ** (score - now / T)``, поэтому порядок по сохранённой
+    оценке совпадает с порядком по недавним рецензиям и не требует
+    пересчёта всех строк по мере старения рецензий. Логарифм не даёт
+    степени переполниться.
+    """
+    if not review_count or recent_reviews <= 0:
+        return 0.0
+    return (
+        math.log2(recent_reviews)
+        + recent_at / settings.REVIEW_VELOCITY_HALF_LIFE
+    )
+
+
+def title_scores(title_ids, using=None):
+    """Оценки произведений по агрегатам рейтинга и статистике."""
+    rows = Title.objects.using(using).filter(pk__in=title_ids).values_list(
+        'pk', 'rating_sum', 'rating_count', 'statistics__review_count',
+        'statistics__recent_reviews', 'statistics__recent_at',
+    )
+    return {
+        pk: (
+            bayesian_rating(rating_sum, rating_count),
+            trending_score(review_count or 0, recent_reviews or 0.0,
+                           recent_at or 0.0),
+        )
+        for (pk, rating_sum, rating_count, review_count, recent_reviews,
+             recent_at) in rows
+    }
+
+
+def title_scopes(title_ids, using=None):
+    """Области, в которые входят произведения."""
+    titles = Title.objects.using(using).filter(pk__in=title_ids)
+    scopes = {}
+    for pk, category_id in titles.values_list('pk', 'category_id'):
+        scopes[pk] = [SCOPE_ALL]
+        if category_id is not None:
+            scopes[pk].append(category_scope(category_id))
+    links = GenreTitle.objects.using(using).filter(
+        title_id__in=list(scopes), genre_id__isnull=False
+    ).values_list('title_id', 'genre_id').distinct()
+    for title_id, genre_id in links:
+        scopes[title_id].append(genre_scope(genre_id))
+    return scopes
+
+
+def title_rankings(title, genre_ids=()):
+    """Строки рейтинга нового произведения, у которого нет рецензий."""
+    scopes = [SCOPE_ALL]
+    if title.category_id is not None:
+        scopes.append(category_scope(title.category_id))
+    scopes.extend(genre_scope(genre_id) for genre_id in genre_ids)
+    rank_score = bayesian_rating(title.rating_sum, title.rating_count)
+    return [
+        TitleRanking(title_id=title.pk, scope=scope, rank_score=rank_score,
+                     trending_score=0.0)
+        for scope in scopes
+    ]
+
+
+def add_titles(titles, genre_ids=None, using=None):
+    """Добавляет новые произведения в рейтинги без чтения из базы.
+
+    ``genre_ids`` — жанры по ключам произведений, если связи с ними уже
+    созданы. Уже существующие строки пропускаются.
+    """
+    genre_ids = genre_ids or {}
+    TitleRanking.objects.using(using).bulk_create([
+        ranking
+        for title in titles
+        for ranking in title_rankings(title, genre_ids.get(title.pk, ()))
+    ], ignore_conflicts=True)
+
+
+def add_scopes(pairs, using=None):
+    """Добавляет произведения в области по парам ``(title_id, scope)``."""
+    pairs = list(pairs)
+    if not pairs:
+        return
+    scores = title_scores({title_id for title_id, _ in pairs}, using)
+    TitleRanking.objects.using(using).bulk_create([
+        TitleRanking(title_id=title_id, scope=scope,
+                     rank_score=scores[title_id][0],
+                     trending_score=scores[title_id][1])
+        for title_id, scope in pairs if title_id in scores
+    ], ignore_conflicts=True)
+
+
+def remove_scope(title_id, scope, using=None):
+    TitleRanking.objects.using(using).filter(
+        title_id=title_id, scope=scope
+    ).delete()
+
+
+def sync_title_scopes(title_ids, using=None):
+    """Приводит набор строк рейтинга произведений к их областям."""
+    wanted = title_scopes(title_ids, using)
+    rankings = TitleRanking.objects.using(using)
+    stale = []
+    existing = set()
+    for pk, title_id, scope in rankings.filter(
+        title_id__in=list(wanted)
+    ).values_list('pk', 'title_id', 'scope'):
+        if scope in wanted[title_id]:
+            existing.add((title_id, scope))
+        else:
+            stale.append(pk)
+    if stale:
+        rankings.filter(pk__in=stale).delete()
+    missing = [
+        (title_id, scope)
+        for title_id, scopes in wanted.items()
+        for scope in scopes if (title_id, scope) not in existing
+    ]
+    add_scopes(missing, using)
+
+
+def refresh_title_ranking(title_id, using=None, create=True):
+    """Пересчитывает оценки произведения во всех его областях.
+
+    Вызывается после обновления агрегатов рейтинга и статистики. Строк
+    нет у произведений, загруженных в обход сигналов: они создаются,
+    кроме случая удаления рецензии — произведение само может удаляться
+    каскадом.
+    """
+    scores = title_scores([title_id], using).get(title_id)
+    if scores is None:
+        return
+    rank_score, trending = scores
+    updated = TitleRanking.objects.using(using).filter(
+        title_id=title_id
+    ).update(rank_score=rank_score, trending_score=trending)
+    if not updated and create:
+        sync_title_scopes([title_id], using)
+
+
+def drop_scope(scope, using=None):
+    """Убирает область удалённой категории или жанра."""
+    TitleRanking.objects.using(using).filter(scope=scope).delete()
+
+
+def ranked(queryset, scope, ordering):
+    """Произведения области в порядке индекса рейтинга."""
+    field = ORDERINGS[ordering]
+    return queryset.filter(rankings__scope=scope).order_by(
+        f'-rankings__{field}', 'rankings__title'
+    )
+
+
+def compute_rankings(title_ids, using=None):
+    """Строки рейтинга произведений по данным, без сохранения."""
+    scores = title_scores(title_ids, using)
+    return {
+        (title_id, scope): TitleRanking(
+            title_id=title_id, scope=scope,
+            rank_score=scores[title_id][0],
+            trending_score=scores[title_id][1],
+        )
+        for title_id, scopes in title_scopes(title_ids, using).items()
+        for scope in scopes
+    }
+
+
+def differs(stored, actual):
+    return any(
+        not math.isclose(getattr(stored, name), getattr(actual, name),
+                         rel_tol=SCORE_TOLERANCE, abs_tol=SCORE_TOLERANCE)
+        for name in ('rank_score', 'trending_score')
+    )
+
+
+def iter_ranking_mismatches(using=None):
+    """Отдаёт ``(stored, actual)`` для расходящихся строк рейтинга.
+
+    ``stored`` — None для недостающей строки, ``actual`` — None для
+    строки области, в которую произведение уже не входит.
+    """
+    title_ids = Title.objects.using(using).order_by('pk').values_list(
+        'pk', flat=True
+    ).iterator(chunk_size=REBUILD_BATCH_SIZE)
+    while True:
+        chunk = list(islice(title_ids, REBUILD_BATCH_SIZE))
+        if not chunk:
+            return
+        stored = {
+            (ranking.title_id, ranking.scope): ranking
+            for ranking in TitleRanking.objects.using(using).filter(
+                title_id__in=chunk
+            )
+        }
+        for key, actual in compute_rankings(chunk, using).items():
+            current = stored.pop(key, None)
+            if current is None or differs(current, actual):
+                yield current, actual
+        for current in stored.values():
+            yield current, None
+
+
+def rebuild_rankings(using=None):
+    """Пересчитывает рейтинги с нуля, возвращает число исправлений."""
+    fixed = 0
+    created, updated, stale = [], [], []
+    for stored, actual in iter_ranking_mismatches(using):
+        if actual is None:
+            stale.append(stored.pk)
+        elif stored is None:
+            created.append(actual)
+        else:
+            actual.pk = stored.pk
+            updated.append(actual)
+        if len(created) + len(updated) + len(stale) >= REBUILD_BATCH_SIZE:
+            fixed += _save_rankings(created, updated, stale, using)
+            created, updated, stale = [], [], []
+    return fixed + _save_rankings(created, updated, stale, using)
+
+
+def _save_rankings(created, updated, stale, using):
+    manager = TitleRanking.objects.using(using)
+    manager.filter(pk__in=stale).delete()
+    manager.bulk_create(created)
+    manager.bulk_update(updated, ('rank_score', 'trending_score'))
+    return len(created) + len(updated) + len(stale)
@@ -0,0 +1,55 @@
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, Now
+
+from reviews.models import Title
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def apply_rating_delta(title_id, score_delta, count_delta, using=None):
+    """Атомарно сдвигает сохранённые агрегаты оценок произведения.
+
+    Рейтинг входит в представление произведения, поэтому вместе с ним
+    обновляется и отметка изменения строки.
+    """
+    Title.objects.using(using).filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + score_delta,
+        rating_count=F('rating_count') + count_delta,
+        updated_at=Now(),
+    )
+
+
+def iter_rating_mismatches(using=None):
+    """Отдаёт произведения, чьи агрегаты расходятся с рецензиями.
+
+    Каждый элемент — кортеж ``(title, actual_sum, actual_count)``.
+    """
+    titles = Title.objects.using(using).annotate(
+        actual_sum=Coalesce(Sum('reviews__score'), 0),
+        actual_count=Count('reviews'),
+    ).order_by('pk')
+    for title in titles.iterator(chunk_size=REBUILD_BATCH_SIZE):
+        if (title.rating_sum != title.actual_sum
+                or title.rating_count != title.actual_count):
+            yield title, title.actual_sum, title.actual_count
+
+
+def rebuild_ratings(using=None):
+    """Пересчитывает агрегаты оценок с нуля, возвращает число исправлений."""
+    fixed = 0
+    batch = []
+    for title, actual_sum, actual_count in iter_rating_mismatches(using):
+        title.rating_sum = actual_sum
+        title.rating_count = actual_count
+        batch.append(title)
+        if len(batch) >= REBUILD_BATCH_SIZE:
+            fixed += _save_ratings(batch, using)
+            batch = []
+    return fixed + _save_ratings(batch, using)
+
+
+def _save_ratings(titles, using):
+    Title.objects.using(using).bulk_update(
+        titles, ('rating_sum', 'rating_count')
+    )
+    return len(titles)
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector)
+from django.db import connections, models
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+
+def search_vector():
+    """Выражение поискового вектора: название весомее описания."""
+    config = settings.TITLE_SEARCH_CONFIG
+    return (
+        SearchVector('name', weight='A', config=config)
+        + SearchVector('description', weight='B', config=config)
+    )
+
+
+class TitleQuerySet(models.QuerySet):
+    """Поиск по произведениям.
+
+    На Postgres используется ``tsvector`` с GIN-индексом и триграммный
+    индекс для поиска по началу названия, на остальных базах — простая
+    замена на ``LIKE`` с тем же порядком выдачи.
+    """
+
+    def _is_postgresql(self):
+        return connections[self.db].vendor == 'postgresql'
+
+    def update_search_vector(self):
+        """Пересчитывает поисковый вектор; вне Postgres ничего не делает."""
+        if not self._is_postgresql():
+            return 0
+        return self.update(search_vector=search_vector())
+
+    def search(self, text):
+        """Полнотекстовый поиск с сортировкой по релевантности."""
+        if self._is_postgresql():
+            query = SearchQuery(
+                text, config=settings.TITLE_SEARCH_CONFIG,
+                search_type='websearch'
+            )
+            return self.filter(search_vector=query).annotate(
+                search_rank=SearchRank(F('search_vector'), query)
+            ).order_by('-search_rank', 'id')
+        return self._fallback_search(text.split())
+
+    def _fallback_search(self, terms):
+        if not terms:
+            return self.none()
+        matches = Q()
+        rank = Value(0, output_field=IntegerField())
+        for term in terms:
+            matches |= Q(name__icontains=term) | Q(description__icontains=term)
+            rank = rank + Case(
+                When(name__icontains=term, then=Value(2)),
+                When(description__icontains=term, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        return self.filter(matches).annotate(
+            search_rank=rank
+        ).order_by('-search_rank', 'id')
+
+    def typeahead(self, prefix):
+        """Поиск по началу названия для подсказок при вводе.
+
+        На Postgres условие обслуживается триграммным индексом
+        ``reviews_title_name_trgm_idx``.
+        """
+        return self.filter(name__istartswith=prefix).order_by('name', 'id')
@@ -0,0 +1,166 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews import ranking, statistics
+from reviews.ratings import apply_rating_delta
+
+
+def touch_updated_at(sender, instance, raw=False, update_fields=None,
+                     **kwargs):
+    """Ставит дату изменения при сохранении, как ``auto_now``.
+
+    ``auto_now`` не допускает значения по умолчанию, без которого
+    фикстуры без ``updated_at`` не загружаются. Как и ``auto_now``, дата
+    не меняется при загрузке фикстур и при сохранении других полей через
+    ``update_fields``.
+    """
+    if raw or (update_fields is not None
+               and 'updated_at' not in update_fields):
+        return
+    instance.updated_at = timezone.now()
+
+
+for model in (Category, Genre, Title, Review, Comment):
+    pre_save.connect(touch_updated_at, sender=model)
+
+
+@receiver(pre_save, sender=Review)
+def remember_loaded_score(sender, instance, using, raw=False, **kwargs):
+    """Подгружает прежнюю оценку, если объект собран не из базы."""
+    if raw or instance.pk is None or hasattr(instance, '_loaded_score'):
+        return
+    previous = Review.objects.using(using).filter(
+        pk=instance.pk
+    ).values_list('score', 'title_id').first()
+    instance._loaded_score, instance._loaded_title_id = (
+        previous or (None, None)
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, using, raw=False,
+                          **kwargs):
+    """Учитывает новую рецензию или изменение оценки в агрегатах.
+
+    Вместе с рейтингом обновляются статистика и место произведения в
+    рейтингах. При загрузке фикстур (``raw``) агрегаты берутся из самих
+    фикстур.
+    """
+    if raw:
+        return
+    old_score = getattr(instance, '_loaded_score', None)
+    old_title_id = getattr(instance, '_loaded_title_id', None)
+    if created or old_score is None:
+        apply_rating_delta(instance.title_id, instance.score, 1, using)
+        statistics.add_review(
+            instance.title_id, instance.score, instance.pub_date, using
+        )
+        ranking.refresh_title_ranking(instance.title_id, using)
+    elif old_title_id != instance.title_id:
+        apply_rating_delta(old_title_id, -old_score, -1, using)
+        apply_rating_delta(instance.title_id, instance.score, 1, using)
+        statistics.remove_review(
+            old_title_id, old_score, instance.pub_date, using
+        )
+        statistics.add_review(
+            instance.title_id, instance.score, instance.pub_date, using
+        )
+        ranking.refresh_title_ranking(old_title_id, using)
+        ranking.refresh_title_ranking(instance.title_id, using)
+    elif old_score != instance.score:
+        apply_rating_delta(
+            instance.title_id, instance.score - old_score, 0, using
+        )
+        statistics.change_score(
+            instance.title_id, old_score, instance.score, using
+        )
+        ranking.refresh_title_ranking(instance.title_id, using)
+    instance._loaded_score = instance.score
+    instance._loaded_title_id = instance.title_id
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, using, **kwargs):
+    """Убирает удалённую рецензию из агрегатов, в том числе при каскаде."""
+    score = getattr(instance, '_loaded_score', None)
+    if score is None:
+        score = instance.score
+    title_id = getattr(instance, '_loaded_title_id', None) or instance.title_id
+    apply_rating_delta(title_id, -score, -1, using)
+    statistics.remove_review(title_id, score, instance.pub_date, using)
+    ranking.refresh_title_ranking(title_id, using, create=False)
+
+
+@receiver(post_save, sender=Title)
+def update_ranking_scopes(sender, instance, created, using, raw=False,
+                          **kwargs):
+    """Заводит строки рейтинга нового произведения и следит за категорией."""
+    if raw:
+        return
+    if created:
+        ranking.add_titles([instance], using=using)
+    elif not hasattr(instance, '_loaded_category_id'):
+        ranking.sync_title_scopes([instance.pk], using)
+    elif instance._loaded_category_id != instance.category_id:
+        if instance._loaded_category_id is not None:
+            ranking.remove_scope(
+                instance.pk,
+                ranking.category_scope(instance._loaded_category_id), using
+            )
+        if instance.category_id is not None:
+            ranking.add_scopes(
+                [(instance.pk, ranking.category_scope(instance.category_id))],
+                using
+            )
+    instance._loaded_category_id = instance.category_id
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def add_genre_ranking_scopes(sender, instance, action, reverse, pk_set,
+                             using, **kwargs):
+    """Добавляет произведения в области новых жанров.
+
+    Связи удаляются запросом с сигналами ``post_delete``, поэтому
+    удаление обрабатывает ``remove_genre_ranking_scope``.
+    """
+    if action != 'post_add':
+        return
+    if reverse:
+        scope = ranking.genre_scope(instance.pk)
+        pairs = [(title_id, scope) for title_id in pk_set]
+    else:
+        pairs = [(instance.pk, ranking.genre_scope(genre_id))
+                 for genre_id in pk_set]
+    ranking.add_scopes(pairs, using)
+
+
+@receiver(post_save, sender=GenreTitle)
+def update_ranking_scopes_on_link(sender, instance, using, raw=False,
+                                  **kwargs):
+    """Связь, сохранённая напрямую, например в админке."""
+    if raw or instance.title_id_id is None:
+        return
+    ranking.sync_title_scopes([instance.title_id_id], using)
+
+
+@receiver(post_delete, sender=GenreTitle)
+def remove_genre_ranking_scope(sender, instance, using, **kwargs):
+    if instance.title_id_id is None or instance.genre_id_id is None:
+        return
+    ranking.remove_scope(
+        instance.title_id_id, ranking.genre_scope(instance.genre_id_id),
+        using
+    )
+
+
+@receiver(post_delete, sender=Category)
+def drop_category_ranking(sender, instance, using, **kwargs):
+    ranking.drop_scope(ranking.category_scope(instance.pk), using)
+
+
+@receiver(post_delete, sender=Genre)
+def drop_genre_ranking(sender, instance, using, **kwargs):
+    ranking.drop_scope(ranking.genre_scope(instance.pk), using)
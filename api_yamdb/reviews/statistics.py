@@ -0,0 +1,194 @@
+import math
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, FloatField, Value
+from django.db.models.functions import Greatest, Power
+
+from reviews.models import Review, Title, TitleStatistics
+
+REBUILD_BATCH_SIZE = 1000
+# Допустимое относительное расхождение недавних рецензий при проверке:
+# они накапливаются в числах с плавающей точкой.
+RECENT_TOLERANCE = 1e-6
+
+
+def review_weight(pub_date, now):
+    """Вес рецензии в недавних на момент ``now`` (Unix-время)."""
+    age = max(now - pub_date.timestamp(), 0)
+    return 0.5 ** (age / settings.REVIEW_VELOCITY_HALF_LIFE)
+
+
+def decay(recent_reviews, recent_at, now):
+    """Недавние рецензии, приведённые от ``recent_at`` к ``now``."""
+    age = max(now - recent_at, 0)
+    return recent_reviews * 0.5 ** (age / settings.REVIEW_VELOCITY_HALF_LIFE)
+
+
+def velocity(statistics, now=None):
+    """Скорость появления рецензий, рецензий в сутки.
+
+    При постоянном потоке ``r`` рецензий в секунду сумма убывающих весов
+    стремится к ``r * T / ln 2``, где ``T`` — период полураспада.
+    """
+    now = time.time() if now is None else now
+    recent = decay(statistics.recent_reviews, statistics.recent_at, now)
+    return recent * math.log(2) / settings.REVIEW_VELOCITY_HALF_LIFE * 86400
+
+
+def decayed_recent(now):
+    """Выражение недавних рецензий строки, приведённых к ``now``."""
+    age = Greatest(Value(now) - F('recent_at'), Value(0.0))
+    return F('recent_reviews') * Power(
+        Value(0.5), age / Value(float(settings.REVIEW_VELOCITY_HALF_LIFE)),
+        output_field=FloatField(),
+    )
+
+
+def decrement(field):
+    # Счётчики не уходят в минус, даже если строка отстала от рецензий,
+    # загруженных в обход сигналов; такую строку исправит пересчёт.
+    return Greatest(F(field) - 1, Value(0))
+
+
+def _update(title_id, using, changes, create=True):
+    """Атомарно применяет изменения к статистике произведения.
+
+    Если строки ещё нет (произведение без рецензий до включения
+    статистики или загруженное в обход сигналов), она считается заново
+    по рецензиям, в которых изменение уже учтено. При удалении строка
+    не создаётся: произведение само может удаляться каскадом.
+    """
+    updated = TitleStatistics.objects.using(using).filter(
+        pk=title_id
+    ).update(**changes)
+    if not updated and create:
+        refresh_title_statistics(title_id, using)
+
+
+def add_review(title_id, score, pub_date, using=None):
+    """Учитывает новую рецензию."""
+    now = time.time()
+    _update(title_id, using, {
+        'review_count': F('review_count') + 1,
+        f'score_{score}': F(f'score_{score}') + 1,
+        'recent_reviews': (
+            decayed_recent(now) + Value(review_weight(pub_date, now))
+        ),
+        'recent_at': now,
+    })
+
+
+def remove_review(title_id, score, pub_date, using=None):
+    """Убирает удалённую рецензию."""
+    now = time.time()
+    _update(title_id, using, {
+        'review_count': decrement('review_count'),
+        f'score_{score}': decrement(f'score_{score}'),
+        'recent_reviews': Greatest(
+            decayed_recent(now) - Value(review_weight(pub_date, now)),
+            Value(0.0),
+        ),
+        'recent_at': now,
+    }, create=False)
+
+
+def change_score(title_id, old_score, new_score, using=None):
+    """Переносит рецензию в корзину новой оценки."""
+    _update(title_id, using, {
+        f'score_{old_score}': decrement(f'score_{old_score}'),
+        f'score_{new_score}': F(f'score_{new_score}') + 1,
+    })
+
+
+def compute_statistics(title_ids, using=None, now=None):
+    """Статистика произведений по рецензиям, без сохранения."""
+    now = time.time() if now is None else now
+    result = {
+        title_id: TitleStatistics(title_id=title_id, recent_at=now)
+        for title_id in title_ids
+    }
+    reviews = Review.objects.using(using).filter(title_id__in=result)
+    buckets = reviews.order_by().values('title_id', 'score').annotate(
+        count=Count('id')
+    )
+    for row in buckets:
+        statistics = result[row['title_id']]
+        field = f'score_{row["score"]}'
+        setattr(statistics, field, getattr(statistics, field) + row['count'])
+        statistics.review_count += row['count']
+    dates = reviews.order_by().values_list('title_id', 'pub_date')
+    for title_id, pub_date in dates.iterator(chunk_size=REBUILD_BATCH_SIZE):
+        result[title_id].recent_reviews += review_weight(pub_date, now)
+    return result
+
+
+def refresh_title_statistics(title_id, using=None):
+    """Пересчитывает и сохраняет статистику одного произведения."""
+    statistics = compute_statistics([title_id], using)[title_id]
+    try:
+        with transaction.atomic(using=using):
+            statistics.save(using=using, force_insert=True)
+    except IntegrityError:
+        # Строку успел создать параллельный запрос.
+        statistics.save(using=using, force_update=True)
+    return statistics
+
+
+def differs(stored, actual):
+    fields = ('review_count',) + TitleStatistics.SCORE_FIELDS
+    if any(getattr(stored, name) != getattr(actual, name)
+           for name in fields):
+        return True
+    recent = decay(stored.recent_reviews, stored.recent_at, actual.recent_at)
+    return not math.isclose(
+        recent, actual.recent_reviews,
+        rel_tol=RECENT_TOLERANCE, abs_tol=RECENT_TOLERANCE,
+    )
+
+
+def iter_statistics_mismatches(using=None):
+    """Отдаёт ``(stored, actual)`` для расходящейся статистики.
+
+    ``stored`` — None, если у произведения с рецензиями нет строки
+    статистики.
+    """
+    title_ids = Title.objects.using(using).order_by('pk').values_list(
+        'pk', flat=True
+    ).iterator(chunk_size=REBUILD_BATCH_SIZE)
+    while True:
+        chunk = list(islice(title_ids, REBUILD_BATCH_SIZE))
+        if not chunk:
+            return
+        stored = TitleStatistics.objects.using(using).in_bulk(chunk)
+        for title_id, actual in compute_statistics(chunk, using).items():
+            current = stored.get(title_id)
+            if current is None and actual.review_count == 0:
+                continue
+            if current is None or differs(current, actual):
+                yield current, actual
+
+
+def rebuild_statistics(using=None):
+    """Пересчитывает статистику с нуля, возвращает число исправлений."""
+    fixed = 0
+    created = []
+    updated = []
+    for stored, actual in iter_statistics_mismatches(using):
+        (updated if stored else created).append(actual)
+        if len(created) + len(updated) >= REBUILD_BATCH_SIZE:
+            fixed += _save_statistics(created, updated, using)
+            created, updated = [], []
+    return fixed + _save_statistics(created, updated, using)
+
+
+def _save_statistics(created, updated, using):
+    manager = TitleStatistics.objects.using(using)
+    manager.bulk_create(created)
+    manager.bulk_update(updated, (
+        'review_count', 'recent_reviews', 'recent_at',
+        *TitleStatistics.SCORE_FIELDS,
+    ))
+    return len(created) + len(updated)
@@ -3,7 +3,7 @@ from django.contrib import admin
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 
-from users.models import User
+from users.models import OutboxEmail, User
 from reviews.models import Genre, Category, Title, Review, Comment, GenreTitle
 
 
@@ -175,3 +175,17 @@ class GenreTitleAdmin(ImportExportModelAdmin):
         'genre_id',
         'title_id',
     )
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'recipient',
+        'subject',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'sent_at',
+    )
+    list_filter = ('status',)
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users import outbox
+
+
+class Command(BaseCommand):
+    help = ('Отправляет письма из очереди исходящих пачками через одно '
+            'соединение с почтовым бэкендом.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Отправить готовые письма и завершиться.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза между проверками очереди, секунд.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=outbox.BATCH_SIZE,
+            help='Сколько писем забирать из очереди за раз.'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=outbox.MAX_ATTEMPTS,
+            help='После стольких неудач письмо помечается недоставленным.'
+        )
+        parser.add_argument(
+            '--backoff', type=float, default=outbox.BACKOFF_SECONDS,
+            help='Задержка перед первой повторной попыткой, секунд.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, retried, dead = outbox.drain(
+                    options['batch_size'],
+                    options['max_attempts'],
+                    options['backoff'],
+                )
+            except Exception as error:
+                if options['once']:
+                    raise
+                self.stderr.write(f'Почтовый бэкенд недоступен: {error!r}')
+            else:
+                if sent or retried or dead:
+                    self.stdout.write(
+                        f'Отправлено: {sent}, отложено: {retried}, '
+                        f'не доставлено: {dead}'
+                    )
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -1,8 +1,12 @@
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.utils import timezone
 
 from django.contrib.auth.models import AbstractUser
 
 
+TOKEN_VERSION_CACHE_KEY = 'token-version:{}'
+
 USER_ROLES = [
     ('user', 'Пользователь'),
     ('moderator', 'Модератор'),
@@ -10,7 +14,22 @@ USER_ROLES = [
 ]
 
 
+def forget_token_state(user_id, using=None):
+    """Сбрасывает закэшированные версию токенов и активность пользователя.
+
+    Ключ удаляется сразу и ещё раз после фиксации транзакции, чтобы
+    параллельный запрос не успел вернуть в кэш старое значение.
+    """
+    key = TOKEN_VERSION_CACHE_KEY.format(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key), using=using)
+
+
 class User(AbstractUser):
+    # Поля, копии которых лежат в токене доступа: их изменение отзывает
+    # выданные пользователю токены.
+    TOKEN_FIELDS = ('username', 'role', 'is_superuser', 'is_active')
+
     username = models.TextField(
         max_length=150,
         unique=True,
@@ -28,6 +47,38 @@ class User(AbstractUser):
         max_length=32,
         blank=True
     )
+    token_version = models.PositiveIntegerField(
+        'Версия токенов',
+        default=0,
+        editable=False
+    )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_token_fields = instance.get_token_fields()
+        return instance
+
+    def get_token_fields(self):
+        return tuple(self.__dict__.get(name) for name in self.TOKEN_FIELDS)
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_token_fields', None)
+        if loaded is not None and loaded != self.get_token_fields():
+            self.token_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+            forget_token_state(self.pk, using=kwargs.get('using'))
+        super().save(*args, **kwargs)
+        self._loaded_token_fields = self.get_token_fields()
+
+    def refresh_from_db(self, using=None, fields=None):
+        # Пользователь, собранный из токена, при первом обращении
+        # к недостающему полю догружает все остальные одним запросом.
+        if fields is not None and getattr(self, '_from_token', False):
+            fields = {*fields, *self.get_deferred_fields()}
+        super().refresh_from_db(using, fields)
 
     @property
     def is_admin(self):
@@ -40,6 +91,51 @@ class User(AbstractUser):
         return self.role == 'moderator'
 
 
+OUTBOX_PENDING = 'pending'
+OUTBOX_SENT = 'sent'
+OUTBOX_DEAD = 'dead'
+OUTBOX_STATUSES = [
+    (OUTBOX_PENDING, 'Ожидает отправки'),
+    (OUTBOX_SENT, 'Отправлено'),
+    (OUTBOX_DEAD, 'Не доставлено'),
+]
+
+
+class OutboxEmail(models.Model):
+    """Письмо, ожидающее отправки фоновым обработчиком."""
+
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель', max_length=254)
+    recipient = models.EmailField('Получатель', max_length=254)
+    status = models.CharField(
+        'Статус',
+        max_length=16,
+        choices=OUTBOX_STATUSES,
+        default=OUTBOX_PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        ordering = ('next_attempt_at', 'id')
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'],
+                         name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
+
+
 class Common(models.Model):
     name = models.TextField(
         verbose_name='Наименование',
@@ -50,6 +146,11 @@ class Common(models.Model):
         unique=True,
         db_index=True
     )
+    # Обновляется при сохранении сигналом из reviews.signals; значение по
+    # умолчанию нужно фикстурам без этого поля.
+    updated_at = models.DateTimeField(
+        'Дата изменения', default=timezone.now, editable=False
+    )
 
     class Meta:
         abstract = True
@@ -0,0 +1,121 @@
+import datetime as dt
+import logging
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection as db_connection
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import (OUTBOX_DEAD, OUTBOX_PENDING, OUTBOX_SENT,
+                          OutboxEmail)
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 30
+MAX_BACKOFF_SECONDS = 3600
+# Пока письмо отправляется, другие обработчики его не берут; если
+# обработчик упал, по истечении аренды письмо вернётся в очередь.
+LEASE_SECONDS = 300
+
+
+def enqueue_email(subject, body, from_email, recipient):
+    """Кладёт письмо в очередь в рамках текущей транзакции."""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        recipient=recipient,
+    )
+
+
+def retry_delay(attempts, backoff=BACKOFF_SECONDS):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return dt.timedelta(
+        seconds=min(backoff * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+    )
+
+
+def claim_batch(batch_size=BATCH_SIZE):
+    """Забирает готовые к отправке письма, продлевая их аренду."""
+    now = timezone.now()
+    with transaction.atomic():
+        due = OutboxEmail.objects.filter(
+            status=OUTBOX_PENDING, next_attempt_at__lte=now
+        )
+        if db_connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        batch = list(due[:batch_size])
+        OutboxEmail.objects.filter(
+            pk__in=[email.pk for email in batch]
+        ).update(next_attempt_at=now + dt.timedelta(seconds=LEASE_SECONDS))
+    return batch
+
+
+def reopen(connection):
+    """Открывает соединение заново после ошибки отправки.
+
+    Соединение могло оборваться. Если оставить его закрытым, SMTP-бэкенд
+    откроет отдельную сессию на каждое следующее письмо.
+    """
+    connection.close()
+    try:
+        connection.open()
+    except Exception as error:
+        logger.warning('Не удалось заново открыть соединение: %s', error)
+
+
+def deliver_batch(connection, batch_size=BATCH_SIZE,
+                  max_attempts=MAX_ATTEMPTS, backoff=BACKOFF_SECONDS):
+    """Отправляет одну пачку через открытое соединение с почтовым бэкендом.
+
+    Возвращает число отправленных, отложенных и окончательно
+    недоставленных писем.
+    """
+    sent = retried = dead = 0
+    for email in claim_batch(batch_size):
+        message = EmailMessage(
+            email.subject, email.body, email.from_email, [email.recipient],
+            connection=connection,
+        )
+        try:
+            message.send()
+        except Exception as error:
+            logger.warning('Не удалось отправить письмо %s: %s',
+                           email.pk, error)
+            reopen(connection)
+            email.attempts += 1
+            email.last_error = repr(error)
+            if email.attempts >= max_attempts:
+                email.status = OUTBOX_DEAD
+                dead += 1
+            else:
+                email.next_attempt_at = (
+                    timezone.now() + retry_delay(email.attempts, backoff)
+                )
+                retried += 1
+            email.save(update_fields=(
+                'attempts', 'last_error', 'status', 'next_attempt_at'
+            ))
+            continue
+        email.status = OUTBOX_SENT
+        email.sent_at = timezone.now()
+        email.attempts += 1
+        email.save(update_fields=('status', 'sent_at', 'attempts'))
+        sent += 1
+    return sent, retried, dead
+
+
+def drain(batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS,
+          backoff=BACKOFF_SECONDS):
+    """Отправляет все готовые письма через одно соединение."""
+    totals = [0, 0, 0]
+    with get_connection() as connection:
+        while True:
+            result = deliver_batch(
+                connection, batch_size, max_attempts, backoff
+            )
+            totals = [total + count for total, count in zip(totals, result)]
+            if not any(result):
+                return tuple(totals)
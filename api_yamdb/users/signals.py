@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from users.models import User, forget_token_state
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_on_delete(sender, instance, using, **kwargs):
+    """Токены удалённого пользователя перестают приниматься сразу."""
+    forget_token_state(instance.pk, using=using)
@@ -0,0 +1,164 @@
+"""Полный профиль Django против API_ONLY: старт, память и накладные расходы.
+
+Для каждого профиля в отдельных процессах (как воркер gunicorn)
+замеряются время старта (``django.setup()``, WSGI-приложение и все
+маршруты), число загруженных модулей, RSS процесса после прогрева и
+медиана времени запроса через WSGI-обработчик к спискам жанров и
+произведений. После прогрева они отдаются из кэша ответов, так что в
+замер входят почти одни middleware и DRF. База — временный SQLite с
+синтетическим каталогом.
+
+    python benchmarks/api_profile.py --runs 5 --requests 2000
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from catalog import SCALES, generate_catalog
+from connection_pool import PROJECT
+from endpoints import setup_django
+
+PROFILES = (('полный', '0'), ('API_ONLY', '1'))
+PATHS = ('/api/v1/genres/', '/api/v1/titles/')
+
+
+def rss_kib():
+    """Текущий RSS процесса в КиБ (Linux) или пиковый, если /proc нет."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def call(application, path):
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'REMOTE_ADDR': '127.0.0.1',
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+    }
+    statuses = []
+    body = b''.join(application(
+        environ, lambda status, headers: statuses.append(status)
+    ))
+    if not statuses[0].startswith('200'):
+        sys.exit(f'{path}: {statuses[0]} {body[:200]!r}')
+
+
+def measure_worker(requests):
+    """Замер внутри процесса с уже выставленным окружением."""
+    started = time.perf_counter()
+    sys.path.insert(0, PROJECT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import get_resolver
+
+    application = get_wsgi_application()
+    get_resolver().url_patterns
+    startup = time.perf_counter() - started
+    modules = len(sys.modules)
+    for path in PATHS:
+        for _ in range(20):
+            call(application, path)
+    rss = rss_kib()
+    timings = {}
+    for path in PATHS:
+        samples = []
+        gc.disable()
+        for _ in range(requests):
+            request_started = time.perf_counter()
+            call(application, path)
+            samples.append(time.perf_counter() - request_started)
+        gc.enable()
+        timings[path] = statistics.median(samples) * 1e6
+    return {
+        'startup_ms': startup * 1000, 'modules': modules, 'rss_kib': rss,
+        'request_us': timings,
+    }
+
+
+def run_worker(database, api_only, requests):
+    env = dict(
+        os.environ, DB_ENGINE='django.db.backends.sqlite3',
+        DB_NAME=database, DB_POOL_SIZE='0', DB_REPLICA_HOSTS='',
+        ASYNC_READ_THREADS='0', METRICS_DIR='', PROXY_CACHE_REFRESH_URL='',
+        API_ONLY=api_only,
+    )
+    output = subprocess.run(
+        [sys.executable, __file__, '--worker', '--requests', str(requests)],
+        env=env, check=True, stdout=subprocess.PIPE,
+    ).stdout
+    return json.loads(output)
+
+
+def summarize(samples):
+    return {
+        'startup_ms': statistics.median(s['startup_ms'] for s in samples),
+        'modules': samples[0]['modules'],
+        'rss_kib': statistics.median(s['rss_kib'] for s in samples),
+        'request_us': {
+            path: statistics.median(s['request_us'][path] for s in samples)
+            for path in PATHS
+        },
+    }
+
+
+def report(results):
+    full = results[PROFILES[0][0]]
+    for name, result in results.items():
+        print(f'{name:<9} старт {result["startup_ms"]:7.1f} мс  '
+              f'модулей {result["modules"]:5}  '
+              f'RSS {result["rss_kib"] / 1024:6.1f} МиБ')
+        for path in PATHS:
+            value = result['request_us'][path]
+            change = value / full['request_us'][path] - 1
+            print(f'          {path:<18}{value:8.0f} мкс на запрос '
+                  f'({change:+.0%})')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--runs', type=int, default=5,
+                        help='процессов на профиль')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--worker', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        print(json.dumps(measure_worker(args.requests)))
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, 'benchmark.sqlite3')
+        setup_django(database)
+        generate_catalog(**SCALES[args.scale])
+        results = {}
+        for name, api_only in PROFILES:
+            results[name] = summarize([
+                run_worker(database, api_only, args.requests)
+                for _ in range(args.runs)
+            ])
+        report(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Нагрузочный тест: чтение каталога под WSGI и под ASGI.
+
+Запускает проект дважды на одной и той же базе из переменных окружения
+— gunicorn с синхронными воркерами и gunicorn с воркерами uvicorn и
+асинхронным чтением (``ASYNC_READ_THREADS``), — и нагружает оба сервера
+одинаковыми параллельными запросами к произведениям, жанрам, категориям,
+отзывам и комментариям.
+
+    DB_HOST=localhost python benchmarks/asgi_reads.py --clients 64
+
+Данные заранее загружают, например, через ``load_fixture`` или
+``benchmarks/fixture_loading.py``.
+"""
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from connection_pool import PROJECT, report, run_threads
+
+SERVERS = (
+    ('WSGI', 'api_yamdb.wsgi:application', []),
+    ('ASGI', 'api_yamdb.asgi:application',
+     ['-k', 'uvicorn.workers.UvicornWorker']),
+)
+
+
+def get_json(url):
+    with urllib.request.urlopen(url) as response:
+        return json.loads(response.read())
+
+
+def wait_for(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return get_json(url)
+        except (urllib.error.URLError, ConnectionError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def catalog_urls(base):
+    """Адреса горячих маршрутов чтения для первого произведения."""
+    urls = [f'{base}/titles/', f'{base}/genres/', f'{base}/categories/']
+    titles = wait_for(f'{base}/titles/')['results']
+    if titles:
+        title_id = titles[0]['id']
+        urls.append(f'{base}/titles/{title_id}/')
+        reviews = get_json(f'{base}/titles/{title_id}/reviews/')['results']
+        urls.append(f'{base}/titles/{title_id}/reviews/')
+        if reviews:
+            urls.append(
+                f'{base}/titles/{title_id}/reviews/'
+                f'{reviews[0]["id"]}/comments/'
+            )
+    return urls
+
+
+def run_server(args, label, application, options):
+    base = f'http://127.0.0.1:{args.port}/api/v1'
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', application,
+         '--bind', f'127.0.0.1:{args.port}',
+         '--workers', str(args.workers), *options],
+        cwd=PROJECT,
+        env={**os.environ, 'ASYNC_READ_THREADS': str(args.read_threads)},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        urls = itertools.cycle(catalog_urls(base))
+
+        def request():
+            with urllib.request.urlopen(next(urls)) as response:
+                response.read()
+
+        report(label, *run_threads(args.clients, args.requests, request))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=64,
+                        help='Одновременных клиентов.')
+    parser.add_argument('--requests', type=int, default=100,
+                        help='Запросов на клиента.')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Воркеров gunicorn в обоих режимах.')
+    parser.add_argument('--read-threads', type=int, default=8,
+                        help='ASYNC_READ_THREADS для режима ASGI.')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+    for label, application, options in SERVERS:
+        run_server(args, label, application, options)
+
+
+if __name__ == '__main__':
+    main()
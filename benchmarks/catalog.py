@@ -0,0 +1,110 @@
+"""Синтетический каталог для нагрузочных тестов.
+
+Данные вставляются через ``bulk_create`` пакетами, поэтому даже большой
+каталог не собирается в памяти целиком. Генератор детерминирован: при
+одних и тех же параметрах получается один и тот же каталог. Django
+должен быть настроен до вызова ``generate_catalog``.
+"""
+import random
+from itertools import islice
+
+SCALES = {
+    'small': {
+        'titles': 200, 'genres_per_title': 2, 'reviews_per_title': 5,
+        'comments_per_review': 2, 'users': 50,
+    },
+    'medium': {
+        'titles': 2000, 'genres_per_title': 3, 'reviews_per_title': 20,
+        'comments_per_review': 3, 'users': 500,
+    },
+    'large': {
+        'titles': 20000, 'genres_per_title': 3, 'reviews_per_title': 50,
+        'comments_per_review': 5, 'users': 5000,
+    },
+}
+GENRES = 20
+CATEGORIES = 5
+BATCH_SIZE = 2000
+
+
+def insert(model, objects, batch_size=BATCH_SIZE):
+    """Вставляет объекты пакетами; возвращает ключи новых строк."""
+    manager = model._base_manager
+    last = manager.order_by('-pk').values_list('pk', flat=True).first()
+    objects = iter(objects)
+    while True:
+        batch = list(islice(objects, batch_size))
+        if not batch:
+            break
+        manager.bulk_create(batch)
+    # SQLite не возвращает ключи из bulk_create, поэтому они читаются
+    # из базы: новые строки идут после последней существовавшей.
+    return list(
+        manager.filter(pk__gt=last or 0).order_by('pk')
+        .values_list('pk', flat=True)
+    )
+
+
+def generate_catalog(titles, genres_per_title, reviews_per_title,
+                     comments_per_review, users, seed=0):
+    """Заполняет базу каталогом заданного размера.
+
+    Возвращает число созданных объектов по моделям.
+    """
+    from reviews.models import (Category, Comment, Genre, GenreTitle,
+                                Review, Title)
+    from reviews.ranking import rebuild_rankings
+    from reviews.ratings import rebuild_ratings
+    from reviews.statistics import rebuild_statistics
+    from users.models import User
+
+    if reviews_per_title > users:
+        raise ValueError(
+            'Рецензий на произведение не может быть больше пользователей.'
+        )
+    rng = random.Random(seed)
+    user_ids = insert(User, (
+        User(username=f'reader{number}', email=f'reader{number}@yamdb.fake',
+             password='!')
+        for number in range(users)
+    ))
+    category_ids = insert(Category, (
+        Category(name=f'Категория {number}', slug=f'category-{number}')
+        for number in range(CATEGORIES)
+    ))
+    genre_ids = insert(Genre, (
+        Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+        for number in range(max(GENRES, genres_per_title))
+    ))
+    title_ids = insert(Title, (
+        Title(name=f'Произведение {number}', year=1950 + number % 70,
+              description='Описание', category_id=rng.choice(category_ids))
+        for number in range(titles)
+    ))
+    insert(GenreTitle, (
+        GenreTitle(title_id_id=title_id, genre_id_id=genre_id)
+        for title_id in title_ids
+        for genre_id in rng.sample(genre_ids, genres_per_title)
+    ))
+    review_ids = insert(Review, (
+        Review(title_id=title_id, author_id=author_id, text='Рецензия',
+               score=rng.randint(1, 10))
+        for title_id in title_ids
+        for author_id in rng.sample(user_ids, reviews_per_title)
+    ))
+    comment_ids = insert(Comment, (
+        Comment(review_id=review_id, author_id=rng.choice(user_ids),
+                text='Комментарий')
+        for review_id in review_ids
+        for _ in range(comments_per_review)
+    ))
+    Title.objects.update_search_vector()
+    rebuild_ratings()
+    rebuild_statistics()
+    rebuild_rankings()
+    return {
+        'users': len(user_ids),
+        'titles': len(title_ids),
+        'reviews': len(review_ids),
+        'comments': len(comment_ids),
+    }
@@ -0,0 +1,137 @@
+"""Нагрузочный тест: задержка запросов с пулом соединений и без него.
+
+Режим ``direct`` (по умолчанию) в двух дочерних процессах повторяет
+жизненный цикл запроса Django — подключение, ``SELECT 1``, закрытие в
+конце запроса — с ``DB_POOL_SIZE=0`` и с пулом. Нужен Postgres из
+переменных окружения проекта.
+
+    DB_HOST=localhost python benchmarks/connection_pool.py --threads 8
+
+Режим ``http`` нагружает уже запущенный сервер; его запускают дважды,
+с пулом и без, и сравнивают результаты.
+
+    python benchmarks/connection_pool.py --mode http \\
+        --url http://localhost/api/v1/genres/ --threads 8
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT = os.path.join(ROOT, 'api_yamdb')
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_threads(threads, requests, request):
+    """Выполняет ``request`` в потоках; возвращает задержки и время."""
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            request()
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return latencies, time.perf_counter() - started
+
+
+def report(label, latencies, elapsed):
+    milliseconds = [latency * 1000 for latency in latencies]
+    print(
+        f'{label:>10}: {len(latencies) / elapsed:8.0f} запросов/с, '
+        f'p50 {statistics.median(milliseconds):6.2f} мс, '
+        f'p95 {percentile(milliseconds, 0.95):6.2f} мс, '
+        f'p99 {percentile(milliseconds, 0.99):6.2f} мс'
+    )
+
+
+def run_child(threads, requests):
+    sys.path.insert(0, PROJECT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+    from django.db import close_old_connections, connection
+
+    django.setup()
+
+    def request():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        # Так Django завершает запрос при CONN_MAX_AGE = 0.
+        close_old_connections()
+
+    request()
+    latencies, elapsed = run_threads(threads, requests, request)
+    print(json.dumps({'latencies': latencies, 'elapsed': elapsed}))
+
+
+def run_direct(args):
+    for label, pool_size in (('без пула', 0), ('с пулом', args.pool_size)):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child',
+             '--threads', str(args.threads),
+             '--requests', str(args.requests)],
+            env={**os.environ, 'DB_POOL_SIZE': str(pool_size)},
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        report(label, result['latencies'], result['elapsed'])
+
+
+def run_http(args):
+    headers = {}
+    if args.token:
+        headers['Authorization'] = f'Bearer {args.token}'
+
+    def request():
+        with urllib.request.urlopen(
+            urllib.request.Request(args.url, headers=headers)
+        ) as response:
+            response.read()
+
+    request()
+    report('http', *run_threads(args.threads, args.requests, request))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mode', choices=('direct', 'http'),
+                        default='direct')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=500,
+                        help='Запросов на поток.')
+    parser.add_argument('--pool-size', type=int, default=10)
+    parser.add_argument('--url', default='http://localhost/api/v1/genres/')
+    parser.add_argument('--token', help='JWT для защищённых адресов.')
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args.threads, args.requests)
+    elif args.mode == 'direct':
+        run_direct(args)
+    else:
+        run_http(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,410 @@
+"""Нагрузочный тест всех маршрутов API на синтетическом каталоге.
+
+Каталог заданного размера создаётся во временной базе SQLite, затем
+каждый маршрут из ``api/urls.py`` вызывается тестовым клиентом Django
+``--repeat`` раз; для каждого сохраняются p50/p95/p99 задержки (мс) и
+число SQL-запросов. Сеть и Postgres не нужны.
+
+Результаты сравниваются с ``benchmarks/baseline.json``: скрипт
+завершается с ошибкой, если число запросов выросло или p50/p95 выросли
+больше чем на ``--threshold`` (и больше чем на ``--min-delta-ms``).
+Задержки зависят от машины, поэтому baseline пересохраняют на той же
+машине, где проверяют:
+
+    python benchmarks/endpoints.py --scale small --save
+    python benchmarks/endpoints.py --scale small
+
+По умолчанию кэш ответов очищается перед каждым запросом, чтобы мерить
+работу с базой; ``--cached`` оставляет кэш.
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from catalog import SCALES, generate_catalog
+from connection_pool import PROJECT, percentile
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'baseline.json')
+LATENCY_CHECKS = ('p50', 'p95')
+
+
+class BenchmarkError(Exception):
+    """Маршрут ответил ошибкой или не покрыт тестом."""
+
+
+class Case:
+    """Запрос к маршруту ``route``.
+
+    ``prepare(iteration)`` возвращает путь и тело запроса и может
+    создавать нужные объекты; его время не замеряется.
+    """
+
+    def __init__(self, route, method, prepare, token=None):
+        self.route = route
+        self.method = method
+        self.prepare = prepare
+        self.token = token
+
+    @property
+    def name(self):
+        return f'{self.method} {self.route}'
+
+
+def setup_django(database):
+    """Настраивает проект на чистую базу SQLite ``database``."""
+    os.environ.update({
+        'DB_ENGINE': 'django.db.backends.sqlite3',
+        'DB_NAME': database,
+        'DB_POOL_SIZE': '0',
+        'DB_REPLICA_HOSTS': '',
+        'ASYNC_READ_THREADS': '0',
+        'METRICS_DIR': '',
+    })
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    sys.path.insert(0, PROJECT)
+    import django
+    from django.core.management import call_command
+    from django.test.utils import setup_test_environment
+
+    django.setup()
+    setup_test_environment()
+    call_command('migrate', verbosity=0, interactive=False)
+
+
+def api_route_names():
+    """Имена всех маршрутов из ``api/urls.py``."""
+    from django.urls import URLResolver
+
+    from api import urls
+
+    names = set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns)
+            elif pattern.name:
+                names.add(pattern.name)
+
+    walk(urls.urlpatterns)
+    return names
+
+
+def build_cases():
+    """Запросы ко всем маршрутам API на уже созданном каталоге."""
+    from django.urls import reverse
+
+    from api.authentication import UserClaimsRefreshToken
+    from reviews.models import Category, Comment, Genre, Review, Title
+    from users.models import User
+
+    admin = User.objects.create(
+        username='bench-admin', email='bench-admin@yamdb.fake', role='admin'
+    )
+    writer = User.objects.create(
+        username='bench-writer', email='bench-writer@yamdb.fake',
+        confirmation_code='bench-code',
+    )
+    reader = User.objects.exclude(pk__in=[admin.pk, writer.pk]).first()
+    admin_token = str(UserClaimsRefreshToken.for_user(admin).access_token)
+    writer_token = str(UserClaimsRefreshToken.for_user(writer).access_token)
+    title, other_title, spare_title = Title.objects.order_by('pk')[:3]
+    review = Review.objects.filter(title=title).order_by('pk').first()
+    comment = Comment.objects.filter(review=review).order_by('pk').first()
+    genre = Genre.objects.order_by('pk').first()
+    category = Category.objects.order_by('pk').first()
+    own_review = Review.objects.create(
+        title=other_title, author=writer, text='Своя', score=5
+    )
+    own_comment = Comment.objects.create(
+        review=review, author=writer, text='Свой'
+    )
+    titles = {'title_id': title.pk}
+    reviews = {'title_id': title.pk, 'review_id': review.pk}
+
+    def get(name, **kwargs):
+        return lambda iteration: (reverse(name, kwargs=kwargs or None), None)
+
+    def send(name, body, **kwargs):
+        return lambda iteration: (
+            reverse(name, kwargs=kwargs or None), body(iteration)
+        )
+
+    def delete(name, create):
+        return lambda iteration: (
+            reverse(name, kwargs=create(iteration)), None
+        )
+
+    def new_review(iteration):
+        Review.objects.filter(title=title, author=writer).delete()
+        return reverse('reviews-list', kwargs=titles), {
+            'text': f'Рецензия {iteration}', 'score': 7,
+        }
+
+    def review_to_delete(iteration):
+        Review.objects.filter(title=spare_title, author=writer).delete()
+        created = Review.objects.create(
+            title=spare_title, author=writer, text='Удалить', score=1
+        )
+        return {'title_id': spare_title.pk, 'pk': created.pk}
+
+    return [
+        Case('api-root', 'GET', get('api-root')),
+        Case('genres-list', 'GET', get('genres-list')),
+        Case('genres-list', 'POST', send('genres-list', lambda i: {
+            'name': f'Жанр {i}', 'slug': f'bench-genre-{i}',
+        }), admin_token),
+        Case('genres-detail', 'DELETE', delete(
+            'genres-detail', lambda i: {'slug': Genre.objects.create(
+                name='Удалить', slug=f'bench-deleted-genre-{i}'
+            ).slug}
+        ), admin_token),
+        Case('categories-list', 'GET', get('categories-list')),
+        Case('categories-list', 'POST', send('categories-list', lambda i: {
+            'name': f'Категория {i}', 'slug': f'bench-category-{i}',
+        }), admin_token),
+        Case('categories-detail', 'DELETE', delete(
+            'categories-detail', lambda i: {'slug': Category.objects.create(
+                name='Удалить', slug=f'bench-deleted-category-{i}'
+            ).slug}
+        ), admin_token),
+        Case('titles-list', 'GET', get('titles-list')),
+        Case('titles-list', 'POST', send('titles-list', lambda i: {
+            'name': f'Новое {i}', 'year': 2000, 'genre': [genre.slug],
+            'category': category.slug,
+        }), admin_token),
+        Case('titles-detail', 'GET', get('titles-detail', pk=title.pk)),
+        Case('titles-detail', 'PATCH', send(
+            'titles-detail', lambda i: {'description': f'Описание {i}'},
+            pk=title.pk,
+        ), admin_token),
+        Case('titles-detail', 'DELETE', delete(
+            'titles-detail', lambda i: {'pk': Title.objects.create(
+                name='Удалить', year=2000, category=category
+            ).pk}
+        ), admin_token),
+        Case('titles-export', 'GET', get('titles-export'), admin_token),
+        Case('titles-stats', 'GET', get('titles-stats', pk=title.pk)),
+        Case('reviews-list', 'GET', get('reviews-list', **titles)),
+        Case('reviews-list', 'POST', new_review, writer_token),
+        Case('reviews-detail', 'GET', get(
+            'reviews-detail', pk=review.pk, **titles
+        )),
+        Case('reviews-detail', 'PATCH', send(
+            'reviews-detail', lambda i: {'text': f'Правка {i}'},
+            title_id=other_title.pk, pk=own_review.pk,
+        ), writer_token),
+        Case('reviews-detail', 'DELETE', delete(
+            'reviews-detail', review_to_delete
+        ), writer_token),
+        Case('comments-list', 'GET', get('comments-list', **reviews)),
+        Case('comments-list', 'POST', send(
+            'comments-list', lambda i: {'text': f'Комментарий {i}'},
+            **reviews,
+        ), writer_token),
+        Case('comments-detail', 'GET', get(
+            'comments-detail', pk=comment.pk, **reviews
+        )),
+        Case('comments-detail', 'PATCH', send(
+            'comments-detail', lambda i: {'text': f'Правка {i}'},
+            pk=own_comment.pk, **reviews,
+        ), writer_token),
+        Case('comments-detail', 'DELETE', delete(
+            'comments-detail', lambda i: dict(reviews, pk=Comment.objects
+                                              .create(review=review,
+                                                      author=writer,
+                                                      text='Удалить').pk)
+        ), writer_token),
+        Case('users-list', 'GET', get('users-list'), admin_token),
+        Case('users-list', 'POST', send('users-list', lambda i: {
+            'username': f'bench-user-{i}',
+            'email': f'bench-user-{i}@yamdb.fake',
+        }), admin_token),
+        Case('users-detail', 'GET', get(
+            'users-detail', username=reader.username
+        ), admin_token),
+        Case('users-detail', 'PATCH', send(
+            'users-detail', lambda i: {'bio': f'Био {i}'},
+            username=reader.username,
+        ), admin_token),
+        Case('users-detail', 'DELETE', delete(
+            'users-detail', lambda i: {'username': User.objects.create(
+                username=f'bench-deleted-{i}',
+                email=f'bench-deleted-{i}@yamdb.fake',
+            ).username}
+        ), admin_token),
+        Case('users-self_account', 'GET', get('users-self_account'),
+             writer_token),
+        Case('users-self_account', 'PATCH', send(
+            'users-self_account', lambda i: {'bio': f'Био {i}'},
+        ), writer_token),
+        Case('sign_up', 'POST', send('sign_up', lambda i: {
+            'username': f'bench-signup-{i}',
+            'email': f'bench-signup-{i}@yamdb.fake',
+        })),
+        Case('token', 'POST', send('token', lambda i: {
+            'username': writer.username, 'confirmation_code': 'bench-code',
+        })),
+    ]
+
+
+def measure(client, case, repeat, warmup=1, cached=False):
+    """Задержки (мс) и наибольшее число SQL-запросов маршрута."""
+    from django.core.cache import cache
+    from django.db import connection
+
+    from api_yamdb.metrics import RequestMetrics
+
+    headers = {}
+    if case.token:
+        headers['HTTP_AUTHORIZATION'] = f'Bearer {case.token}'
+    latencies = []
+    queries = 0
+    for iteration in range(warmup + repeat):
+        path, body = case.prepare(iteration)
+        if not cached:
+            cache.clear()
+        counter = RequestMetrics()
+        # Сборка мусора посреди запроса даёт выбросы в p95/p99; она
+        # успеет пройти в prepare, время которого не замеряется.
+        gc.disable()
+        try:
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                response = client.generic(
+                    case.method, path,
+                    json.dumps(body) if body is not None else '',
+                    content_type='application/json', **headers,
+                )
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                elapsed = time.perf_counter() - started
+        finally:
+            gc.enable()
+        if response.status_code >= 400:
+            raise BenchmarkError(
+                f'{case.name}: ответ {response.status_code} '
+                f'{response.content[:200]!r}'
+            )
+        if iteration >= warmup:
+            latencies.append(elapsed * 1000)
+            queries = max(queries, counter.queries)
+    return {
+        'p50': round(statistics.median(latencies), 3),
+        'p95': round(percentile(latencies, 0.95), 3),
+        'p99': round(percentile(latencies, 0.99), 3),
+        'queries': queries,
+    }
+
+
+def run(repeat, warmup=1, cached=False):
+    """Замеры всех маршрутов API на текущей базе."""
+    from django.test import Client
+
+    cases = build_cases()
+    missing = api_route_names() - {case.route for case in cases}
+    if missing:
+        raise BenchmarkError(
+            f'Маршруты без замеров: {", ".join(sorted(missing))}.'
+        )
+    client = Client()
+    return {
+        case.name: measure(client, case, repeat, warmup, cached)
+        for case in cases
+    }
+
+
+def find_regressions(results, baseline, threshold, min_delta_ms):
+    """Описания ухудшений относительно baseline."""
+    regressions = []
+    for name, result in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result['queries'] > reference['queries']:
+            regressions.append(
+                f'{name}: SQL-запросов {reference["queries"]} -> '
+                f'{result["queries"]}'
+            )
+        for key in LATENCY_CHECKS:
+            before, after = reference[key], result[key]
+            if (after > before * (1 + threshold)
+                    and after - before > min_delta_ms):
+                regressions.append(
+                    f'{name}: {key} {before:.2f} -> {after:.2f} мс'
+                )
+    return regressions
+
+
+def report(results):
+    for name, result in sorted(results.items()):
+        print(
+            f'{name:32} p50 {result["p50"]:8.2f} мс  '
+            f'p95 {result["p95"]:8.2f} мс  p99 {result["p99"]:8.2f} мс  '
+            f'SQL {result["queries"]:3}'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    for name in SCALES['small']:
+        parser.add_argument(f'--{name.replace("_", "-")}', type=int,
+                            help='Переопределяет значение масштаба.')
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--cached', action='store_true',
+                        help='Не очищать кэш ответов между запросами.')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save', action='store_true',
+                        help='Сохранить результаты как новый baseline.')
+    parser.add_argument('--threshold', type=float, default=1.0,
+                        help='Допустимый относительный рост задержки.')
+    parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                        help='Рост задержки меньше этого не считается.')
+    args = parser.parse_args()
+    scale = {
+        name: getattr(args, name) or value
+        for name, value in SCALES[args.scale].items()
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, 'benchmark.sqlite3'))
+        started = time.perf_counter()
+        created = generate_catalog(**scale)
+        print(f'Каталог {created} создан за '
+              f'{time.perf_counter() - started:.1f} с')
+        results = run(args.repeat, args.warmup, args.cached)
+    report(results)
+    current = {'scale': scale, 'cached': args.cached, 'results': results}
+    if args.save:
+        with open(args.baseline, 'w', encoding='utf-8') as output:
+            json.dump(current, output, ensure_ascii=False, indent=2)
+            output.write('\n')
+        print(f'Baseline сохранён в {args.baseline}')
+        return
+    if not os.path.exists(args.baseline):
+        print('Baseline не найден, сравнивать не с чем.')
+        return
+    with open(args.baseline, encoding='utf-8') as source:
+        baseline = json.load(source)
+    if (baseline['scale'], baseline['cached']) != (scale, args.cached):
+        sys.exit('Baseline снят с другими параметрами; используйте --save.')
+    regressions = find_regressions(
+        results, baseline['results'], args.threshold, args.min_delta_ms
+    )
+    if regressions:
+        print('Ухудшения относительно baseline:')
+        for regression in regressions:
+            print(f'  {regression}')
+        sys.exit(1)
+    print('Ухудшений относительно baseline нет.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Сравнение ``loaddata`` и ``load_fixture`` на синтетических фикстурах.
+
+Каждая команда запускается в отдельном процессе на очищенной базе из
+переменных окружения проекта (``DB_ENGINE``, ``DB_NAME`` и т. д.);
+замеряются время и пиковый объём памяти процесса. Не запускайте на
+базе с нужными данными: перед каждым замером она очищается.
+
+    DB_ENGINE=django.db.backends.sqlite3 DB_NAME=/tmp/bench.db \\
+        python benchmarks/fixture_loading.py --titles 2000 --reviews 50000
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT = os.path.join(ROOT, 'api_yamdb')
+COMMANDS = ('loaddata', 'load_fixture')
+TIMESTAMP = '2023-01-01T00:00:00Z'
+
+
+def generate(path, users, titles, reviews, comments):
+    """Пишет фикстуру построчно, не собирая её в памяти."""
+    rng = random.Random(0)
+
+    def objects():
+        for pk in range(1, users + 1):
+            yield 'users.user', pk, {
+                'username': f'user{pk}', 'email': f'user{pk}@yamdb.fake',
+                'password': '!', 'role': 'user',
+                'date_joined': TIMESTAMP,
+            }
+        yield 'reviews.category', 1, {
+            'name': 'Кино', 'slug': 'movie', 'updated_at': TIMESTAMP,
+        }
+        for pk in range(1, 11):
+            yield 'reviews.genre', pk, {
+                'name': f'Жанр {pk}', 'slug': f'genre-{pk}',
+                'updated_at': TIMESTAMP,
+            }
+        for pk in range(1, titles + 1):
+            yield 'reviews.title', pk, {
+                'name': f'Произведение {pk}', 'year': 1950 + pk % 70,
+                'category': 1, 'description': 'Описание',
+                'updated_at': TIMESTAMP,
+            }
+            yield 'reviews.genretitle', pk, {
+                'title_id': pk, 'genre_id': 1 + pk % 10,
+            }
+        pairs = set()
+        while len(pairs) < reviews:
+            pairs.add((rng.randint(1, titles), rng.randint(1, users)))
+        for pk, (title, author) in enumerate(sorted(pairs), start=1):
+            yield 'reviews.review', pk, {
+                'title': title, 'author': author, 'text': 'Рецензия',
+                'score': rng.randint(1, 10), 'pub_date': TIMESTAMP,
+                'updated_at': TIMESTAMP,
+            }
+        for pk in range(1, comments + 1):
+            yield 'reviews.comment', pk, {
+                'review': rng.randint(1, reviews),
+                'author': rng.randint(1, users), 'text': 'Комментарий',
+                'pub_date': TIMESTAMP, 'updated_at': TIMESTAMP,
+            }
+
+    count = 0
+    with open(path, 'w', encoding='utf-8') as output:
+        output.write('[')
+        for model, pk, fields in objects():
+            output.write(',\n' if count else '\n')
+            output.write(json.dumps(
+                {'model': model, 'pk': pk, 'fields': fields},
+                ensure_ascii=False
+            ))
+            count += 1
+        output.write('\n]\n')
+    return count
+
+
+def run_child(command, path):
+    """Выполняется в дочернем процессе: очистка базы и один замер."""
+    sys.path.insert(0, PROJECT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+    call_command('flush', interactive=False, verbosity=0)
+    started = time.perf_counter()
+    call_command(command, path, verbosity=0)
+    seconds = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'seconds': seconds, 'max_rss_kb': peak}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--titles', type=int, default=1000)
+    parser.add_argument('--reviews', type=int, default=20000)
+    parser.add_argument('--comments', type=int, default=20000)
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(*args.child)
+        return
+    if args.reviews > args.users * args.titles:
+        parser.error('рецензий больше, чем пар пользователь-произведение')
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'fixture.json')
+        count = generate(
+            path, args.users, args.titles, args.reviews, args.comments
+        )
+        size = os.path.getsize(path) / 2 ** 20
+        print(f'Фикстура: {count} объектов, {size:.1f} МБ')
+        for command in COMMANDS:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__),
+                 '--child', command, path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f'{command:>13}: {result["seconds"]:7.2f} с, '
+                f'{count / result["seconds"]:8.0f} объектов/с, '
+                f'пик памяти {result["max_rss_kb"] / 1024:.0f} МБ'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Время сериализации списков: сериализаторы моделей против api.lean.
+
+На синтетическом каталоге во временной базе SQLite произведения,
+рецензии и комментарии выбираются и сериализуются двумя путями:
+сериализаторами моделей с ``JSONRenderer`` и сериализаторами для чтения
+по строкам ``.values()`` с ``FastJSONRenderer``. Перед замером вывод
+обоих путей сверяется побайтно; затем для каждого печатается медиана
+времени на 1000 объектов отдельно для выборки и построения словарей и
+для рендеринга JSON.
+
+    python benchmarks/serialization.py --scale medium --repeat 10
+"""
+import argparse
+import gc
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from catalog import SCALES, generate_catalog
+from endpoints import setup_django
+
+
+def cases():
+    """Пары путей сериализации по видам объектов."""
+    from api.lean import (CommentLeanSerializer, ReviewLeanSerializer,
+                          TitleLeanSerializer)
+    from api.serializers import (CommentSerializer, ReviewSerializer,
+                                 TitleListSerializer)
+    from reviews.models import Comment, Review, Title
+
+    return (
+        ('titles', TitleListSerializer, TitleLeanSerializer,
+         lambda: Title.objects.select_related('category').prefetch_related(
+             'genre').order_by('id')),
+        ('reviews', ReviewSerializer, ReviewLeanSerializer,
+         lambda: Review.objects.select_related('author').order_by('id')),
+        ('comments', CommentSerializer, CommentLeanSerializer,
+         lambda: Comment.objects.select_related('author').order_by('id')),
+    )
+
+
+def model_path(serializer_class, queryset):
+    return lambda: serializer_class(queryset(), many=True).data
+
+
+def lean_path(serializer_class, queryset):
+    def build():
+        serializer = serializer_class()
+        return serializer.serialize(serializer.rows(queryset()))
+    return build
+
+
+def timed(function, repeat):
+    """Медиана времени вызова и результат последнего вызова."""
+    timings = []
+    for _ in range(repeat):
+        gc.disable()
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+        gc.enable()
+    return statistics.median(timings), result
+
+
+def measure(repeat):
+    from rest_framework.renderers import JSONRenderer
+
+    from api.renderers import FastJSONRenderer
+
+    results = []
+    for name, serializer, lean, queryset in cases():
+        paths = (
+            ('ModelSerializer + JSONRenderer', model_path(serializer,
+                                                          queryset),
+             JSONRenderer()),
+            ('api.lean + FastJSONRenderer', lean_path(lean, queryset),
+             FastJSONRenderer()),
+        )
+        outputs = []
+        for label, build, renderer in paths:
+            build_time, data = timed(build, repeat)
+            render_time, output = timed(lambda: renderer.render(data), repeat)
+            outputs.append(output)
+            per_thousand = 1000 / max(len(data), 1) * 1000
+            results.append((
+                name, label, len(data), build_time * per_thousand,
+                render_time * per_thousand,
+            ))
+        if outputs[0] != outputs[1]:
+            sys.exit(f'Вывод путей для {name} различается.')
+    return results
+
+
+def report(results):
+    for name, label, count, build_ms, render_ms in results:
+        print(f'{name:<9}{label:<32}{count:>7} объектов  '
+              f'словари {build_ms:8.2f} мс  JSON {render_ms:7.2f} мс  '
+              f'всего {build_ms + render_ms:8.2f} мс на 1000')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, 'benchmark.sqlite3'))
+        generate_catalog(**SCALES[args.scale])
+        report(measure(args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+from django.urls import include, path
+
+from api.async_views import async_read_urls
+from api.urls import router_v1
+
+# Адреса API с асинхронным чтением каталога, как при ASYNC_READ_THREADS > 0.
+urlpatterns = [
+    path('api/v1/', include(async_read_urls(router_v1.urls))),
+]
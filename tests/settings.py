@@ -0,0 +1,17 @@
+from api_yamdb.settings import *  # noqa: F401,F403
+
+# Тесты с базой данных выполняются на SQLite, чтобы не зависеть от Postgres.
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+
+# Вторая база SQLite в памяти изображает реплику; чтение на неё включают
+# только тесты маршрутизации.
+DATABASES['replica'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': ':memory:',
+}
+DATABASE_REPLICAS = []
@@ -0,0 +1,93 @@
+import json
+import os
+import subprocess
+import sys
+
+from .conftest import root_dir
+
+SCRIPT = '''
+import json
+import sys
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.test import Client
+
+django.setup()
+call_command('migrate', verbosity=0, interactive=False)
+
+from django.contrib.admin.models import ADDITION, LogEntry
+
+from api.authentication import UserClaimsRefreshToken
+from users.models import User
+
+client = Client()
+admin = User.objects.create(username='boss', email='boss@yamdb.fake',
+                            role='admin')
+editor = User.objects.create(username='editor', email='editor@yamdb.fake')
+LogEntry.objects.log_action(editor.pk, None, None, 'Драма', ADDITION)
+token = UserClaimsRefreshToken.for_user(admin).access_token
+print(json.dumps({
+    'apps': settings.INSTALLED_APPS,
+    'middleware': settings.MIDDLEWARE,
+    'import_export': 'import_export' in sys.modules,
+    'genres': client.get('/api/v1/genres/').status_code,
+    'signup': client.post(
+        '/api/v1/auth/signup/', {'username': 'me', 'email': 'bad'}
+    ).status_code,
+    'admin': client.get('/admin/').status_code,
+    'redoc': client.get('/redoc/').status_code,
+    'delete_user': client.delete(
+        '/api/v1/users/editor/', HTTP_AUTHORIZATION=f'Bearer {token}'
+    ).status_code,
+}))
+'''
+
+
+def run_profile(tmp_path, api_only):
+    env = dict(
+        os.environ, API_ONLY=api_only,
+        DJANGO_SETTINGS_MODULE='api_yamdb.settings',
+        DB_ENGINE='django.db.backends.sqlite3',
+        DB_NAME=str(tmp_path / 'db.sqlite3'),
+        DB_REPLICA_HOSTS='', DB_POOL_SIZE='0', METRICS_DIR='',
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', SCRIPT], env=env, check=True,
+        cwd=os.path.join(root_dir, 'api_yamdb'), stdout=subprocess.PIPE,
+    ).stdout
+    return json.loads(output)
+
+
+class TestApiOnlyProfile:
+
+    def test_api_only(self, tmp_path):
+        result = run_profile(tmp_path, '1')
+        for app in ('django.contrib.sessions', 'django.contrib.messages',
+                    'import_export'):
+            assert app not in result['apps'], (
+                f'В профиле API_ONLY не должно быть приложения {app}'
+            )
+        assert not any(
+            'Session' in name or 'Csrf' in name or 'Message' in name
+            for name in result['middleware']
+        ), 'В профиле API_ONLY сессии, CSRF и сообщения не нужны'
+        assert not result['import_export']
+        assert (result['genres'], result['signup']) == (200, 400), (
+            'API должно работать без сессий и CSRF'
+        )
+        assert (result['admin'], result['redoc']) == (404, 404), (
+            'Админку и /redoc/ обслуживает отдельный процесс'
+        )
+        assert result['delete_user'] == 204, (
+            'Удаление пользователя должно удалять его записи в журнале '
+            'админки'
+        )
+
+    def test_full_profile(self, tmp_path):
+        result = run_profile(tmp_path, '0')
+        assert 'django.contrib.admin' in result['apps']
+        assert result['genres'] == 200
+        assert result['admin'] == 302, 'Полный профиль обслуживает админку'
+        assert result['delete_user'] == 204
@@ -0,0 +1,206 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient
+from django.urls import URLPattern
+from rest_framework.test import APIClient
+
+from api import async_views
+from api.async_views import ASYNC_READ_ROUTES, async_read_urls
+from api.authentication import UserClaimsRefreshToken
+from api.urls import router_v1
+from api_yamdb.handlers import StreamingASGIHandler
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def catalog(user):
+    category = Category.objects.create(name='Кино', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(name='Фильм', year=2000, category=category)
+    title.genre.add(genre)
+    review = Review.objects.create(
+        title=title, author=user, text='Отлично', score=9
+    )
+    Comment.objects.create(review=review, author=user, text='Согласен')
+    return title, review
+
+
+def async_get(url):
+    return async_to_sync(AsyncClient().get)(url)
+
+
+def asgi_get(application, path, query='', headers=()):
+    """GET через ASGI-приложение, как его вызывает uvicorn."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path,
+        'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'headers': list(headers),
+        'client': ('127.0.0.1', 10000), 'server': ('testserver', 80),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    async_to_sync(application)(scope, receive, send)
+    status = messages[0]['status']
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return status, body
+
+
+class TestAsyncReadUrls:
+
+    def test_only_catalog_reads_wrapped(self):
+        patterns = async_read_urls(router_v1.urls)
+        wrapped = {
+            pattern.name for pattern in patterns
+            if isinstance(pattern, URLPattern)
+            and asyncio.iscoroutinefunction(pattern.callback)
+        }
+        assert wrapped == set(ASYNC_READ_ROUTES), (
+            'Асинхронными должны стать только маршруты чтения каталога'
+        )
+
+    def test_wrapper_keeps_view_attributes(self):
+        for pattern in async_read_urls(router_v1.urls):
+            if pattern.name == 'titles-list':
+                assert pattern.callback.cls.__name__ == 'TitleViewSet', (
+                    'Обёртка должна сохранять атрибуты вьюхи DRF'
+                )
+                assert pattern.callback.csrf_exempt
+
+
+@pytest.mark.urls('tests.async_urls')
+@pytest.mark.django_db(transaction=True)
+class TestAsyncReads:
+
+    @pytest.fixture(autouse=True)
+    def read_threads(self, settings):
+        settings.ASYNC_READ_THREADS = 2
+
+    def test_responses_match_sync_views(self, catalog):
+        title, review = catalog
+        urls = [
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title.id}/',
+            '/api/v1/genres/',
+            '/api/v1/categories/',
+            f'/api/v1/titles/{title.id}/reviews/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+        ]
+        for url in urls:
+            response = async_get(url)
+            expected = APIClient().get(url)
+            assert response.status_code == 200, url
+            assert response.json() == expected.json(), (
+                f'Асинхронный ответ {url} должен совпадать с синхронным'
+            )
+
+    def test_reads_run_in_read_pool(self, catalog, monkeypatch):
+        threads = []
+        run_read_view = async_views.run_read_view
+
+        def spy(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return run_read_view(*args, **kwargs)
+
+        monkeypatch.setattr(async_views, 'run_read_view', spy)
+        assert async_get('/api/v1/genres/').status_code == 200
+        assert threads and threads[0].startswith('async-read'), (
+            'Чтение должно выполняться в пуле потоков для чтения'
+        )
+
+    def test_concurrent_reads_overlap(self, catalog, monkeypatch):
+        # Запросы идут через все middleware из settings.MIDDLEWARE.
+        executor = ThreadPoolExecutor(max_workers=4)
+        monkeypatch.setattr(async_views, '_executor', executor)
+        intervals = []
+        run_read_view = async_views.run_read_view
+
+        def slow(*args, **kwargs):
+            started = time.monotonic()
+            time.sleep(0.3)
+            response = run_read_view(*args, **kwargs)
+            intervals.append((started, time.monotonic()))
+            return response
+
+        async def read_all():
+            return await asyncio.gather(*(
+                AsyncClient().get('/api/v1/genres/') for _ in range(4)
+            ))
+
+        monkeypatch.setattr(async_views, 'run_read_view', slow)
+        try:
+            responses = async_to_sync(read_all)()
+        finally:
+            executor.shutdown()
+        assert [response.status_code for response in responses] == [200] * 4
+        assert max(start for start, _ in intervals) < min(
+            end for _, end in intervals
+        ), 'Параллельные чтения не должны выстраиваться в очередь'
+
+    def test_queries_counted_in_read_pool(self, catalog):
+        response = async_get('/api/v1/genres/')
+        assert 'desc="0 queries"' not in response['Server-Timing'], (
+            'SQL-запросы из пула чтения должны попадать в метрики'
+        )
+
+    def test_missing_title(self, catalog):
+        assert async_get('/api/v1/titles/0/').status_code == 404
+
+    def test_write_through_async_route(self, catalog, admin):
+        token = UserClaimsRefreshToken.for_user(admin).access_token
+        # AsyncClient превращает дополнительные аргументы в заголовки.
+        response = async_to_sync(AsyncClient().post)(
+            '/api/v1/genres/', {'name': 'Комедия', 'slug': 'comedy'},
+            content_type='application/json', authorization=f'Bearer {token}',
+        )
+        assert response.status_code == 201, (
+            'Запись через асинхронный маршрут должна работать как раньше'
+        )
+        assert Genre.objects.filter(slug='comedy').exists()
+        assert 'desc="0 queries"' not in response['Server-Timing'], (
+            'SQL-запросы синхронных вьюх под ASGI должны попадать в метрики'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestStreamingASGIHandler:
+
+    def test_export_streamed_from_thread(self, catalog, admin):
+        title, _ = catalog
+        token = UserClaimsRefreshToken.for_user(admin).access_token
+        status, body = asgi_get(
+            StreamingASGIHandler(), '/api/v1/titles/export/',
+            'output=ndjson',
+            [(b'authorization', f'Bearer {token}'.encode())],
+        )
+        assert status == 200
+        assert [
+            json.loads(line)['name'] for line in body.splitlines()
+        ] == [title.name], (
+            'Потоковый ответ с запросами к базе должен читаться под ASGI '
+            'вне цикла событий'
+        )
+
+    def test_export_rejected_by_plain_handler(self, catalog, admin):
+        token = UserClaimsRefreshToken.for_user(admin).access_token
+        status, body = asgi_get(
+            ASGIHandler(), '/api/v1/titles/export/', '',
+            [(b'authorization', f'Bearer {token}'.encode())],
+        )
+        assert status == 501, (
+            'Обработчик, читающий поток в цикле событий, должен получать '
+            'явный отказ, а не пустой ответ 200'
+        )
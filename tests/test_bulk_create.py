@@ -0,0 +1,137 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, GenreTitle, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBulkCreate:
+
+    def test_bulk_create_genres(self, admin_client):
+        Genre.objects.create(name='Драма', slug='drama')
+        data = [
+            {'name': f'Жанр {index}', 'slug': f'genre-{index}'}
+            for index in range(20)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                '/api/v1/genres/', data, format='json'
+            )
+        assert response.status_code == 201, (
+            'Список жанров должен создаваться одним запросом'
+        )
+        assert response.json() == data
+        assert Genre.objects.count() == 21
+        inserts = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('INSERT')
+        ]
+        assert len(inserts) == 1, (
+            'Жанры должны вставляться одним INSERT'
+        )
+
+    def test_bulk_errors_are_per_item(self, admin_client):
+        Category.objects.create(name='Кино', slug='movie')
+        data = [
+            {'name': 'Книги', 'slug': 'book'},
+            {'name': 'Кино', 'slug': 'movie'},
+            {'name': 'Ещё книги', 'slug': 'book'},
+            {'name': 'Без slug'},
+        ]
+        response = admin_client.post(
+            '/api/v1/categories/', data, format='json'
+        )
+        assert response.status_code == 400
+        errors = response.json()
+        assert len(errors) == 4, 'Ошибки должны возвращаться по элементам'
+        assert errors[0] == {}
+        assert 'slug' in errors[1], 'Занятый slug должен быть ошибкой'
+        assert 'slug' in errors[2], 'Повтор slug в пакете должен быть ошибкой'
+        assert 'slug' in errors[3]
+        assert Category.objects.count() == 1, (
+            'При ошибке пакет не должен сохраняться частично'
+        )
+
+    def test_bulk_create_titles(self, admin_client):
+        category = Category.objects.create(name='Кино', slug='movie')
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        data = [
+            {
+                'name': f'Фильм {index}',
+                'year': 2000 + index,
+                'category': 'movie',
+                'genre': ['drama', 'comedy'][:index % 3],
+            }
+            for index in range(30)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                '/api/v1/titles/', data, format='json'
+            )
+        assert response.status_code == 201, response.json()
+        result = response.json()
+        assert len(result) == 30
+        assert result[2]['category'] == {'name': 'Кино', 'slug': 'movie'}
+        assert [genre['slug'] for genre in result[2]['genre']] == [
+            'drama', 'comedy'
+        ]
+        assert result[0]['genre'] == []
+        assert Title.objects.filter(category=category).count() == 30
+        assert GenreTitle.objects.count() == 30
+        selects = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'reviews_' in query['sql']
+        ]
+        assert len(selects) == 3, (
+            'Категории, жанры и ответ должны загружаться '
+            'постоянным числом запросов'
+        )
+        if connection.features.can_return_rows_from_bulk_insert:
+            inserts = [
+                query for query in context.captured_queries
+                if query['sql'].startswith('INSERT')
+            ]
+            assert len(inserts) == 2
+
+    def test_bulk_title_unknown_slug(self, admin_client):
+        Category.objects.create(name='Кино', slug='movie')
+        data = [
+            {'name': 'Фильм', 'year': 2000, 'category': 'movie'},
+            {'name': 'Фильм', 'year': 2000, 'category': 'nope',
+             'genre': ['nope']},
+        ]
+        response = admin_client.post('/api/v1/titles/', data, format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert set(errors[1]) == {'category', 'genre'}
+        assert not Title.objects.exists()
+
+    def test_bulk_create_requires_admin(self, user_client):
+        data = [{'name': 'Жанр', 'slug': 'genre'}]
+        response = user_client.post('/api/v1/genres/', data, format='json')
+        assert response.status_code == 403, (
+            'Массовое создание должно быть доступно только администратору'
+        )
+        assert not Genre.objects.exists()
+
+    def test_bulk_create_invalidates_cache(self, admin_client):
+        assert admin_client.get('/api/v1/genres/').json()['count'] == 0
+        admin_client.post(
+            '/api/v1/genres/', [{'name': 'Жанр', 'slug': 'genre'}],
+            format='json'
+        )
+        assert admin_client.get('/api/v1/genres/').json()['count'] == 1, (
+            'Массовое создание должно сбрасывать кэш ответов'
+        )
+
+    def test_bulk_limits(self, admin_client, settings):
+        settings.BULK_CREATE_MAX_ITEMS = 2
+        data = [{'name': 'Жанр', 'slug': f'genre-{i}'} for i in range(3)]
+        response = admin_client.post('/api/v1/genres/', data, format='json')
+        assert response.status_code == 400
+        response = admin_client.post('/api/v1/genres/', [], format='json')
+        assert response.status_code == 400
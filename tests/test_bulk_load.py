@@ -0,0 +1,160 @@
+import csv
+import datetime as dt
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.loading import copy_value
+from reviews.models import Comment, Genre, Review, Title
+from users.models import User
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as output:
+        writer = csv.DictWriter(output, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def write_ndjson(path, rows):
+    with open(path, 'w', encoding='utf-8') as output:
+        for row in rows:
+            output.write(json.dumps(row, ensure_ascii=False) + '\n')
+    return path
+
+
+@pytest.fixture
+def catalog_files(tmp_path):
+    users = write_csv(tmp_path / 'users.csv', [
+        {'id': index, 'username': f'user{index}',
+         'email': f'user{index}@yamdb.fake', 'role': 'user', 'bio': '',
+         'first_name': '', 'last_name': ''}
+        for index in range(1, 6)
+    ])
+    categories = write_csv(tmp_path / 'categories.csv', [
+        {'id': 1, 'name': 'Кино', 'slug': 'movie'},
+    ])
+    genres = write_csv(tmp_path / 'genres.csv', [
+        {'id': 1, 'name': 'Драма', 'slug': 'drama'},
+        {'id': 2, 'name': 'Комедия', 'slug': 'comedy'},
+    ])
+    titles = write_csv(tmp_path / 'titles.csv', [
+        {'id': index, 'name': f'Фильм {index}', 'year': 2000,
+         'genre': '1,2' if index == 1 else '', 'description': '',
+         'category': 1}
+        for index in range(1, 4)
+    ])
+    reviews = write_ndjson(tmp_path / 'reviews.ndjson', [
+        {'id': index, 'title': 1 + index % 3, 'score': index, 'text': 'Да',
+         'author': 1 + index // 3, 'pub_date': '2020-01-02T03:04:05Z'}
+        for index in range(1, 10)
+    ])
+    comments = write_ndjson(tmp_path / 'comments.ndjson', [
+        {'id': 1, 'review': 1, 'text': 'Нет', 'author': 2,
+         'pub_date': '2021-05-06 07:08:09'},
+    ])
+    return {
+        'users': users, 'categories': categories, 'genres': genres,
+        'titles': titles, 'reviews': reviews, 'comments': comments,
+    }
+
+
+def inputs(files):
+    return [f'{name}={path}' for name, path in files.items()]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBulkLoad:
+
+    def test_load_catalog(self, catalog_files):
+        # Порядок аргументов не важен: таблицы загружаются по зависимостям.
+        call_command('bulk_load', *reversed(inputs(catalog_files)))
+        assert User.objects.count() == 5
+        assert not User.objects.get(pk=1).has_usable_password(), (
+            'Загруженные пользователи не должны получать пароль'
+        )
+        assert Title.objects.count() == 3
+        assert set(
+            Title.objects.get(pk=1).genre.values_list('slug', flat=True)
+        ) == {'drama', 'comedy'}, 'Колонка genre должна создавать связи'
+        assert Review.objects.count() == 9
+        assert Review.objects.get(pk=1).pub_date == dt.datetime(
+            2020, 1, 2, 3, 4, 5, tzinfo=dt.timezone.utc
+        ), 'Дата публикации должна браться из входных данных'
+        assert Comment.objects.get(pk=1).pub_date.year == 2021
+        for title in Title.objects.all():
+            scores = list(title.reviews.values_list('score', flat=True))
+            assert title.rating_count == len(scores), (
+                'После загрузки рецензий рейтинги должны пересчитываться'
+            )
+            assert title.rating_sum == sum(scores)
+
+    def test_chunks(self, catalog_files):
+        call_command(
+            'bulk_load', *inputs(catalog_files)[:4],
+        )
+        with CaptureQueriesContext(connection) as context:
+            call_command(
+                'bulk_load', f'reviews={catalog_files["reviews"]}',
+                '--chunk-size', '4', '--no-ratings'
+            )
+        inserts = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('INSERT INTO "reviews_review"')
+        ]
+        assert len(inserts) == 3, 'Рецензии должны вставляться пакетами'
+        author_checks = [
+            query for query in context.captured_queries
+            if 'FROM "users_user"' in query['sql']
+        ]
+        assert len(author_checks) <= 2, (
+            'Внешние ключи должны проверяться без запроса на строку'
+        )
+
+    def test_missing_foreign_key(self, catalog_files, tmp_path):
+        call_command('bulk_load', *inputs(catalog_files)[:4])
+        reviews = write_ndjson(tmp_path / 'bad.ndjson', [
+            {'id': 1, 'title': 1, 'score': 5, 'text': 'Да', 'author': 1},
+            {'id': 2, 'title': 99, 'score': 5, 'text': 'Да', 'author': 2},
+            {'id': 3, 'title': 1, 'score': 50, 'text': 'Да', 'author': 3},
+        ])
+        with pytest.raises(CommandError, match='строка 3'):
+            call_command('bulk_load', f'reviews={reviews}')
+        missing_title = write_ndjson(tmp_path / 'missing.ndjson', [
+            {'id': 2, 'title': 99, 'score': 5, 'text': 'Да', 'author': 2},
+        ])
+        with pytest.raises(CommandError, match='строка 1: title'):
+            call_command('bulk_load', f'reviews={missing_title}')
+        assert not Review.objects.exists()
+        call_command('bulk_load', f'reviews={reviews}', '--skip-invalid')
+        assert list(Review.objects.values_list('pk', flat=True)) == [1], (
+            'Некорректные строки должны пропускаться'
+        )
+
+    def test_sequences_reset(self, catalog_files):
+        call_command('bulk_load', f'genres={catalog_files["genres"]}')
+        genre = Genre.objects.create(name='Ужасы', slug='horror')
+        assert genre.pk > 2, (
+            'Новые объекты не должны получать загруженные id'
+        )
+
+    def test_bad_arguments(self, catalog_files):
+        with pytest.raises(CommandError):
+            call_command('bulk_load', 'nothing=file.csv')
+        with pytest.raises(CommandError):
+            call_command('bulk_load', 'users=/nonexistent.csv')
+
+
+class TestCopyValue:
+
+    def test_copy_value(self):
+        assert copy_value(None) == '', 'NULL пишется пустым полем'
+        assert copy_value('') == '""', 'Пустая строка пишется в кавычках'
+        assert copy_value('a"b') == '"a""b"'
+        assert copy_value(True) == 't'
+        assert copy_value(7) == '7'
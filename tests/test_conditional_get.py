@@ -0,0 +1,116 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def title(user):
+    title = Title.objects.create(name='Солярис', year=1972)
+    review = Review.objects.create(
+        title=title, author=user, text='Космос', score=8
+    )
+    Comment.objects.create(review=review, author=user, text='Согласен')
+    return title
+
+
+def urls(title):
+    review = title.reviews.get()
+    return [
+        f'/api/v1/titles/{title.pk}/',
+        '/api/v1/titles/',
+        f'/api/v1/titles/{title.pk}/reviews/',
+        f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+    ]
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_validators_present(self, client, title):
+        for url in urls(title):
+            response = client.get(url)
+            assert response.status_code == 200
+            assert response['ETag'].startswith('"'), (
+                f'Проверьте, что {url} отдаёт сильный ETag'
+            )
+            assert response.has_header('Last-Modified'), url
+
+    def test_if_none_match_returns_304(self, client, title):
+        for url in urls(title):
+            etag = client.get(url)['ETag']
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304, url
+            assert not response.content
+            assert len(context) <= 1, (
+                'Проверьте, что ответ 304 не выбирает и не сериализует данные'
+            )
+
+    def test_if_modified_since_returns_304(self, client, title):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        last_modified = client.get(url)['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304
+
+    def test_review_edit_changes_etag(self, client, title):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        etag = client.get(url)['ETag']
+        review = title.reviews.get()
+        review.text = 'Перечитал'
+        review.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_new_comment_changes_etag(self, client, title, user):
+        url = urls(title)[3]
+        etag = client.get(url)['ETag']
+        Comment.objects.create(
+            review=title.reviews.get(), author=user, text='Ещё'
+        )
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_genre_rename_changes_title_etag(self, client, title):
+        genre = Genre.objects.create(name='Фантастика', slug='sci-fi')
+        title.genre.set([genre])
+        url = f'/api/v1/titles/{title.pk}/'
+        etag = client.get(url)['ETag']
+        genre.name = 'Научная фантастика'
+        genre.save()
+        # Поколения кэша сдвигаются только после коммита, которого в тесте
+        # нет, поэтому закэшированный ответ сбрасывается вручную.
+        cache.clear()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    def test_title_list_etag_follows_generations(
+            self, client, title, django_capture_on_commit_callbacks):
+        url = '/api/v1/titles/'
+        etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        with django_capture_on_commit_callbacks(execute=True):
+            title.genre.add(Genre.objects.create(name='Драма', slug='drama'))
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Изменение каталога должно менять ETag списка произведений'
+        )
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        ).status_code == 304
+
+    def test_cached_response_answers_304(self, client, title):
+        url = f'/api/v1/titles/{title.pk}/'
+        etag = client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert len(context) == 0, (
+            'Проверьте, что закэшированный ответ отвечает 304 без БД'
+        )
+
+    def test_missing_title_is_404(self, client):
+        response = client.get('/api/v1/titles/999/', HTTP_IF_NONE_MATCH='"x"')
+        assert response.status_code == 404
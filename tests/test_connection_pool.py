@@ -0,0 +1,172 @@
+import threading
+import time
+
+import pytest
+from django.db.utils import load_backend
+from psycopg2 import extensions
+
+from api_yamdb.db.pool import ConnectionPool, PoolTimeout
+from api_yamdb.db.postgresql.base import reset_connection
+
+
+class FakeConnection:
+
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self.broken = False
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def close(self):
+        self.closed = True
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def get_transaction_status(self):
+        return self.status
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def ping(connection):
+    if connection.broken:
+        raise ConnectionError
+
+
+def make_pool(max_size=2, **kwargs):
+    opened = []
+
+    def connect():
+        connection = FakeConnection(len(opened))
+        opened.append(connection)
+        return connection
+
+    kwargs.setdefault('clock', FakeClock())
+    pool = ConnectionPool(
+        connect, max_size, reset=reset_connection, ping=ping, **kwargs
+    )
+    return pool, opened
+
+
+class TestConnectionPool:
+
+    def test_reuses_connections(self):
+        pool, opened = make_pool()
+        for _ in range(5):
+            pool.release(pool.acquire())
+        assert len(opened) == 1, 'Соединение должно переиспользоваться'
+        assert pool.stats() == {
+            'size': 2, 'in_use': 0, 'idle': 1, 'waiting': 0,
+            'created': 1, 'recycled': 0,
+        }
+
+    def test_exhausted_pool_times_out(self):
+        pool, _ = make_pool(max_size=1, timeout=0.05, clock=time.monotonic)
+        connection = pool.acquire()
+        with pytest.raises(PoolTimeout):
+            pool.acquire()
+        pool.release(connection)
+        assert pool.acquire() is connection
+
+    def test_waiter_gets_released_connection(self):
+        pool, _ = make_pool(max_size=1, timeout=5, clock=time.monotonic)
+        connection = pool.acquire()
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(
+            pool.acquire()
+        ))
+        waiter.start()
+        while pool.stats()['waiting'] == 0:
+            pass
+        pool.release(connection)
+        waiter.join(timeout=5)
+        assert acquired == [connection], (
+            'Ожидающий поток должен получить освободившееся соединение'
+        )
+
+    def test_lifetime(self):
+        clock = FakeClock()
+        pool, opened = make_pool(max_lifetime=60, clock=clock)
+        first = pool.acquire()
+        pool.release(first)
+        clock.now = 61
+        second = pool.acquire()
+        assert second is not first, 'Старое соединение должно заменяться'
+        assert first.closed
+        assert pool.stats()['recycled'] == 1
+
+    def test_health_check(self):
+        clock = FakeClock()
+        pool, _ = make_pool(check_interval=30, clock=clock)
+        first = pool.acquire()
+        pool.release(first)
+        first.broken = True
+        clock.now = 10
+        assert pool.acquire() is first, (
+            'Недавно работавшее соединение выдаётся без проверки'
+        )
+        pool.release(first)
+        clock.now = 100
+        second = pool.acquire()
+        assert second is not first, 'Мёртвое соединение должно отсеиваться'
+        assert first.closed
+
+    def test_reset_on_release(self):
+        pool, _ = make_pool()
+        connection = pool.acquire()
+        connection.status = extensions.TRANSACTION_STATUS_INTRANS
+        pool.release(connection)
+        assert connection.rollbacks == 1, (
+            'Незавершённая транзакция должна откатываться'
+        )
+        connection = pool.acquire()
+        connection.status = extensions.TRANSACTION_STATUS_UNKNOWN
+        pool.release(connection)
+        assert connection.closed, 'Потерянное соединение должно закрываться'
+        assert pool.stats()['idle'] == 0
+
+    def test_threads(self):
+        pool, opened = make_pool(max_size=4, timeout=5, clock=time.monotonic)
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(200):
+                    pool.release(pool.acquire())
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors
+        assert len(opened) <= 4, 'Пул не должен превышать заданный размер'
+        assert pool.stats()['in_use'] == 0
+
+    def test_fork(self, monkeypatch):
+        pool, opened = make_pool()
+        connection = pool.acquire()
+        pool.release(connection)
+        monkeypatch.setattr('os.getpid', lambda: -1)
+        assert pool.acquire() is not connection, (
+            'После fork соединения родителя не должны использоваться'
+        )
+        assert not connection.closed, (
+            'Сокет родителя нельзя закрывать из дочернего процесса'
+        )
+
+    def test_backend_loads(self):
+        backend = load_backend('api_yamdb.db.postgresql')
+        assert backend.DatabaseWrapper.vendor == 'postgresql'
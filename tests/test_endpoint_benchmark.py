@@ -0,0 +1,51 @@
+import sys
+from os.path import join
+
+import pytest
+
+from .conftest import root_dir
+
+sys.path.insert(0, join(root_dir, 'benchmarks'))
+
+import endpoints  # noqa: E402
+from catalog import generate_catalog  # noqa: E402
+
+
+@pytest.mark.django_db
+class TestEndpointBenchmark:
+
+    def test_all_routes_measured(self):
+        created = generate_catalog(
+            titles=5, genres_per_title=2, reviews_per_title=3,
+            comments_per_review=2, users=4,
+        )
+        assert created == {
+            'users': 4, 'titles': 5, 'reviews': 15, 'comments': 30
+        }, 'Каталог должен иметь заданный размер'
+        results = endpoints.run(repeat=2, warmup=0)
+        routes = {name.split()[1] for name in results}
+        assert routes == endpoints.api_route_names(), (
+            'Нагрузочный тест должен покрывать все маршруты API'
+        )
+        for result in results.values():
+            assert result['p50'] <= result['p95'] <= result['p99']
+
+    def test_regressions(self):
+        baseline = {
+            'GET titles-list': {'p50': 5, 'p95': 8, 'p99': 9, 'queries': 4},
+        }
+        same = {'GET titles-list': dict(baseline['GET titles-list'])}
+        assert endpoints.find_regressions(same, baseline, 0.5, 1) == []
+        more_queries = {
+            'GET titles-list': dict(same['GET titles-list'], queries=25),
+        }
+        assert endpoints.find_regressions(
+            more_queries, baseline, 0.5, 1
+        ) == ['GET titles-list: SQL-запросов 4 -> 25'], (
+            'Рост числа SQL-запросов должен считаться ухудшением'
+        )
+        slower = {'GET titles-list': dict(same['GET titles-list'], p50=9)}
+        assert len(endpoints.find_regressions(slower, baseline, 0.5, 1)) == 1
+        assert not endpoints.find_regressions(slower, baseline, 0.5, 5), (
+            'Рост меньше min_delta_ms не должен считаться ухудшением'
+        )
@@ -0,0 +1,159 @@
+import datetime as dt
+from collections import OrderedDict
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.lean import (CommentLeanSerializer, ReviewLeanSerializer,
+                      TitleLeanSerializer)
+from api.pagination import KeysetPagination
+from api.renderers import FastJSONRenderer
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleListSerializer)
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def catalog(django_user_model):
+    category = Category.objects.create(name='Кино «новое»', slug='movie')
+    genres = [
+        Genre.objects.create(name=name, slug=f'genre-{index}')
+        for index, name in enumerate(('Триллер', 'Драма', 'Аниме '))
+    ]
+    titles = [
+        Title.objects.create(
+            name='Без категории', year=1999, description=None
+        ),
+        Title.objects.create(
+            name='Фильм "в кавычках"', year=2001, category=category,
+            description='Строка\nс переносом и \\ слэшем',
+        ),
+    ]
+    titles[1].genre.set(genres)
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'автор{index}', email=f'author{index}@yamdb.fake'
+        )
+        for index in range(3)
+    ]
+    for author, score in zip(authors, (10, 7, 4)):
+        review = Review.objects.create(
+            title=titles[1], author=author, text='Текст 😀', score=score
+        )
+        Comment.objects.create(review=review, author=authors[0],
+                               text='Ответ')
+    return titles
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+def page(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, response.content
+    return response.content
+
+
+@pytest.mark.django_db
+class TestLeanSerializers:
+
+    def test_titles(self, client, catalog):
+        titles = Title.objects.prefetch_related('genre').order_by('id')
+        expected = render(OrderedDict([
+            ('count', 2), ('next', None), ('previous', None),
+            ('results', TitleListSerializer(titles, many=True).data),
+        ]))
+        assert page(client, '/api/v1/titles/') == expected, (
+            'Список произведений должен совпадать побайтно с выводом '
+            'TitleListSerializer'
+        )
+        title = titles.get(pk=catalog[1].pk)
+        assert page(client, f'/api/v1/titles/{title.pk}/') == render(
+            TitleListSerializer(title).data
+        )
+
+    def test_reviews_and_comments(self, client, catalog):
+        title = catalog[1]
+        reviews = title.reviews.select_related('author').order_by(
+            '-pub_date', '-id'
+        )
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        assert page(client, url) == render(OrderedDict([
+            ('count', 3), ('next', None), ('previous', None),
+            ('results', ReviewSerializer(reviews, many=True).data),
+        ]))
+        review = reviews[0]
+        assert page(client, f'{url}{review.pk}/') == render(
+            ReviewSerializer(review).data
+        )
+        comment = review.comments.select_related('author').get()
+        assert page(client, f'{url}{review.pk}/comments/') == render(
+            OrderedDict([
+                ('count', 1), ('next', None), ('previous', None),
+                ('results', CommentSerializer([comment], many=True).data),
+            ])
+        )
+        assert page(
+            client, f'{url}{review.pk}/comments/{comment.pk}/'
+        ) == render(CommentSerializer(comment).data)
+
+    @pytest.mark.parametrize('lean,serializer,queryset', [
+        (TitleLeanSerializer, TitleListSerializer,
+         lambda: Title.objects.prefetch_related('genre').order_by('id')),
+        (ReviewLeanSerializer, ReviewSerializer,
+         lambda: Review.objects.select_related('author').order_by('id')),
+        (CommentLeanSerializer, CommentSerializer,
+         lambda: Comment.objects.select_related('author').order_by('id')),
+    ])
+    def test_same_representation(self, catalog, lean, serializer, queryset):
+        rows = lean().serialize(lean().rows(queryset()))
+        assert rows == serializer(queryset(), many=True).data
+
+    def test_keyset_pages(self, client, catalog, monkeypatch):
+        monkeypatch.setattr(KeysetPagination, 'page_size', 2)
+        url = f'/api/v1/titles/{catalog[1].pk}/reviews/?cursor='
+        first = client.get(url).json()
+        second = client.get(first['next']).json()
+        assert len(first['results']) + len(second['results']) == 3, (
+            'Курсор должен строиться и по строкам сериализатора для чтения'
+        )
+
+
+class TestFastJSONRenderer:
+
+    DATA = OrderedDict([
+        ('text', 'Юникод 😀 \u2028\u2029 "кавычки" \\ \n\t\x00'),
+        ('numbers', [0, -1, 2 ** 53, 7.5, 0.001, 0.1, 2.0, 1e15]),
+        ('flags', [True, False, None]),
+        ('when', dt.datetime(2024, 1, 2, 3, 4, 5, 678000,
+                             tzinfo=dt.timezone.utc)),
+        ('date', dt.date(2024, 1, 2)),
+        ('error', ErrorDetail('Ошибка', code='invalid')),
+        ('lazy', gettext_lazy('Ленивая строка')),
+        ('nested', {'list': (1, 2), 'empty': {}}),
+    ])
+
+    def test_same_bytes(self):
+        assert FastJSONRenderer().render(self.DATA) == render(self.DATA)
+
+    @pytest.mark.parametrize('data', [
+        {1: 'нестроковый ключ'},
+        {'big': 2 ** 70},
+    ])
+    def test_falls_back(self, data):
+        assert FastJSONRenderer().render(data) == render(data)
+
+    def test_indent(self):
+        media_type = 'application/json; indent=2'
+        assert FastJSONRenderer().render(
+            self.DATA, media_type
+        ) == JSONRenderer().render(self.DATA, media_type)
+
+    def test_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        assert FastJSONRenderer().render(self.DATA) == render(self.DATA)
+        assert FastJSONRenderer().render(None) == b''
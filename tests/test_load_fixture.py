@@ -0,0 +1,164 @@
+import datetime as dt
+import io
+import json
+from os.path import join
+
+import pytest
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from reviews.fixtures import FixtureError, JSONArrayReader
+from reviews.models import Genre, Title
+
+from .conftest import infra_dir_path
+
+FIXTURE = join(infra_dir_path, 'fixtures.json')
+
+
+def fixture_models():
+    with open(FIXTURE, encoding='utf-8') as stream:
+        labels = {obj['model'] for obj in json.load(stream)}
+    models = [apps.get_model(label) for label in sorted(labels)]
+    return models + [
+        field.remote_field.through
+        for model in models for field in model._meta.many_to_many
+    ]
+
+
+def snapshot():
+    # В фикстуре нет updated_at: обе команды ставят текущее время.
+    return {
+        model._meta.label: [
+            {name: value for name, value in row.items()
+             if name != 'updated_at'}
+            for row in model._base_manager.order_by('pk').values()
+        ]
+        for model in fixture_models()
+    }
+
+
+def clear_fixture_tables():
+    # Типы содержимого, созданные миграциями, конфликтуют с фикстурой.
+    for model in reversed(fixture_models()):
+        model._base_manager.all().delete()
+    ContentType.objects.clear_cache()
+
+
+class TestJSONArrayReader:
+
+    def test_small_blocks(self):
+        with open(FIXTURE, encoding='utf-8') as stream:
+            expected = json.load(stream)
+        with open(FIXTURE, encoding='utf-8') as stream:
+            objects = list(JSONArrayReader(stream, block_size=7))
+        assert objects == expected, (
+            'Потоковый разбор должен давать те же объекты, что json.load'
+        )
+
+    def test_broken_input(self):
+        for text in ('{}', '[{"a": 1}', '[{"a": ]', '[1]'):
+            with pytest.raises(FixtureError):
+                list(JSONArrayReader(io.StringIO(text), block_size=2))
+        assert list(JSONArrayReader(io.StringIO(' [ ] '))) == []
+
+
+@pytest.mark.django_db(transaction=True)
+class TestLoadFixture:
+
+    def test_matches_loaddata(self):
+        clear_fixture_tables()
+        call_command('loaddata', FIXTURE, verbosity=0)
+        expected = snapshot()
+        clear_fixture_tables()
+        call_command('load_fixture', FIXTURE, '--chunk-size', '5')
+        assert snapshot() == expected, (
+            'Результат должен совпадать с loaddata'
+        )
+
+    def test_existing_objects_updated(self, tmp_path):
+        Genre.objects.create(name='Старое', slug='old')
+        genre = Genre.objects.get()
+        path = tmp_path / 'genres.json'
+        path.write_text(json.dumps([
+            {'model': 'reviews.genre', 'pk': genre.pk, 'fields': {
+                'name': 'Новое', 'slug': 'old',
+                'updated_at': '2023-01-01T00:00:00Z'}},
+            {'model': 'reviews.genre', 'pk': genre.pk + 1, 'fields': {
+                'name': 'Ещё', 'slug': 'more',
+                'updated_at': '2023-01-01T00:00:00Z'}},
+        ]))
+        call_command('load_fixture', str(path))
+        call_command('load_fixture', str(path))
+        assert list(Genre.objects.order_by('pk').values_list(
+            'name', flat=True
+        )) == ['Новое', 'Ещё'], 'Существующие объекты должны обновляться'
+        assert Genre.objects.create(name='Третье', slug='third').pk > (
+            genre.pk + 1
+        ), 'Последовательности ключей должны сдвигаться'
+
+    def test_ratings_rebuilt(self, tmp_path, user):
+        path = tmp_path / 'reviews.json'
+        path.write_text(json.dumps([
+            {'model': 'reviews.review', 'pk': 1, 'fields': {
+                'title': 1, 'text': 'Да', 'author': user.pk, 'score': 8,
+                'pub_date': '2023-01-01T00:00:00Z',
+                'updated_at': '2023-01-01T00:00:00Z'}},
+            {'model': 'reviews.title', 'pk': 1, 'fields': {
+                'name': 'Фильм', 'year': 2000,
+                'updated_at': '2023-01-01T00:00:00Z'}},
+        ]))
+        call_command('load_fixture', str(path))
+        title = Title.objects.get()
+        assert (title.rating_sum, title.rating_count) == (8, 1), (
+            'После загрузки рецензий рейтинги должны пересчитываться'
+        )
+
+    @pytest.mark.parametrize('command', ['loaddata', 'load_fixture'])
+    def test_without_updated_at(self, tmp_path, command):
+        path = tmp_path / 'old.json'
+        path.write_text(json.dumps([
+            {'model': 'reviews.genre', 'pk': 1, 'fields': {
+                'name': 'Драма', 'slug': 'drama'}},
+            {'model': 'reviews.title', 'pk': 1, 'fields': {
+                'name': 'Фильм', 'year': 2000, 'genre': [1]}},
+        ]))
+        call_command(command, str(path), verbosity=0)
+        assert Title.objects.get().updated_at is not None, (
+            'Фикстуры без updated_at должны загружаться с текущим временем'
+        )
+        assert Genre.objects.get().updated_at is not None
+
+    def test_broken_reference(self, tmp_path):
+        path = tmp_path / 'broken.json'
+        path.write_text(json.dumps([
+            {'model': 'reviews.title', 'pk': 1, 'fields': {
+                'name': 'Фильм', 'year': 2000, 'category': 42,
+                'updated_at': '2023-01-01T00:00:00Z'}},
+        ]))
+        with pytest.raises(CommandError):
+            call_command('load_fixture', str(path))
+        assert not Title.objects.exists(), (
+            'При ошибке фикстура не должна загружаться частично'
+        )
+
+
+@pytest.mark.django_db
+class TestModificationTime:
+
+    def test_save_updates_timestamp(self):
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        old = timezone.now() - dt.timedelta(days=1)
+        Genre.objects.filter(pk=genre.pk).update(updated_at=old)
+        genre.refresh_from_db()
+        genre.name = 'Драма!'
+        genre.save(update_fields=['name'])
+        genre.refresh_from_db()
+        assert genre.updated_at == old, (
+            'Как и auto_now, update_fields без updated_at не меняет дату'
+        )
+        genre.save()
+        genre.refresh_from_db()
+        assert genre.updated_at > old, 'Сохранение должно обновлять дату'
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api_yamdb import metrics
+from api_yamdb.db.pool import ConnectionPool
+from api_yamdb.db.postgresql import base as pool_backend
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    registry = metrics.Registry()
+    monkeypatch.setattr(metrics, 'registry', registry)
+    return registry
+
+
+@pytest.fixture
+def titles():
+    category = Category.objects.create(name='Кино', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    for number in range(3):
+        title = Title.objects.create(
+            name=f'Фильм {number}', year=2000, category=category
+        )
+        title.genre.add(genre)
+
+
+def server_timing(response):
+    return dict(
+        part.strip().split(';', 1)
+        for part in response['Server-Timing'].split(',')
+    )
+
+
+@pytest.mark.django_db
+class TestMetricsMiddleware:
+
+    def test_server_timing_counts_queries(self, client, titles):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/v1/titles/')
+        timing = server_timing(response)
+        assert set(timing) == {'db', 'serializer', 'total'}, (
+            'Заголовок Server-Timing должен содержать db, serializer и total'
+        )
+        assert f'desc="{len(queries)} queries"' in timing['db'], (
+            'В Server-Timing должно быть число SQL-запросов'
+        )
+        serializer_time = float(timing['serializer'].split('=')[1])
+        assert serializer_time > 0, 'Время сериализации должно учитываться'
+
+    def test_metrics_labelled_by_route(self, client, titles):
+        title = Title.objects.first()
+        client.get('/api/v1/titles/')
+        client.get(f'/api/v1/titles/{title.id}/')
+        client.get('/api/v1/nowhere/')
+        body = client.get('/metrics').content.decode()
+        assert (
+            'yamdb_http_requests_total{view="titles-list",method="GET",'
+            'status="200"} 1'
+        ) in body, 'Метрики должны быть помечены именем маршрута'
+        assert 'view="titles-detail"' in body
+        assert '/api/' not in body, (
+            'В метках не должно быть путей с идентификаторами'
+        )
+        assert 'view="<unresolved>"' in body, (
+            'Запросы к неизвестным адресам должны иметь общую метку'
+        )
+        assert '# TYPE yamdb_http_request_duration_seconds histogram' in body
+        assert (
+            'yamdb_http_request_duration_seconds_bucket{view="titles-list",'
+            'method="GET",le="+Inf"} 1'
+        ) in body
+
+    def test_workers_aggregated(self, client, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        client.get('/api/v1/genres/')
+        other = metrics.Registry()
+        other.record('genres-list', 'GET', '200', 0.01,
+                     metrics.RequestMetrics())
+        # Файл другого воркера gunicorn.
+        (tmp_path / 'metrics-999999.json').write_text(
+            json.dumps(other.snapshot())
+        )
+        body = client.get('/metrics').content.decode()
+        assert (
+            'yamdb_http_requests_total{view="genres-list",method="GET",'
+            'status="200"} 2'
+        ) in body, '/metrics должен суммировать метрики всех воркеров'
+
+    def test_pool_stats(self, client, monkeypatch):
+        pool = ConnectionPool(object, 4)
+        monkeypatch.setattr(pool_backend, '_pools', {('default', ()): pool})
+        connection = pool.acquire()
+        pool.release(pool.acquire())
+        body = client.get('/metrics').content.decode()
+        pool.release(connection)
+        assert '# TYPE yamdb_db_pool_in_use gauge' in body, (
+            '/metrics должен отдавать состояние пула соединений'
+        )
+        for line in (
+            'yamdb_db_pool_size{database="default"} 4',
+            'yamdb_db_pool_in_use{database="default"} 1',
+            'yamdb_db_pool_idle{database="default"} 1',
+            'yamdb_db_pool_created_total{database="default"} 2',
+        ):
+            assert line in body, f'В /metrics нет «{line}»'
@@ -0,0 +1,145 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import (OUTBOX_DEAD, OUTBOX_PENDING, OUTBOX_SENT,
+                          OutboxEmail)
+from users.outbox import enqueue_email
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class FlakySMTPBackend(EmailBackend):
+    """Как SMTP: без открытого соединения письмо открывает своё."""
+
+    opened = 0
+    failures = 0
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.connection = None
+
+    def open(self):
+        if self.connection:
+            return False
+        FlakySMTPBackend.opened += 1
+        self.connection = True
+        return True
+
+    def close(self):
+        self.connection = None
+
+    def send_messages(self, messages):
+        created = self.open()
+        try:
+            if FlakySMTPBackend.failures:
+                FlakySMTPBackend.failures -= 1
+                raise ConnectionError('Соединение разорвано')
+            return super().send_messages(messages)
+        finally:
+            if created:
+                self.close()
+
+
+def enqueue(count=1):
+    for i in range(count):
+        enqueue_email('Тема', f'Код {i}', 'from@yamdb.fake',
+                      f'to{i}@yamdb.fake')
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def test_signup_only_enqueues(self, client):
+        response = client.post('/api/v1/auth/signup/', {
+            'username': 'newbie', 'email': 'newbie@yamdb.fake'
+        })
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация не отправляет письмо синхронно'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.recipient == 'newbie@yamdb.fake'
+        assert email.status == OUTBOX_PENDING
+
+    def test_worker_sends_over_one_connection(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.CountingBackend'
+        CountingBackend.opened = 0
+        enqueue(3)
+        call_command('send_outbox', '--once', '--batch-size', '2')
+        assert len(mail.outbox) == 3
+        assert CountingBackend.opened == 1, (
+            'Проверьте, что пачки отправляются через одно соединение'
+        )
+        assert set(OutboxEmail.objects.values_list('status', flat=True)) == {
+            OUTBOX_SENT
+        }
+
+    def test_connection_reopened_after_failure(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.FlakySMTPBackend'
+        FlakySMTPBackend.opened = 0
+        FlakySMTPBackend.failures = 1
+        enqueue(4)
+        call_command('send_outbox', '--once')
+        assert len(mail.outbox) == 3
+        assert FlakySMTPBackend.opened == 2, (
+            'После ошибки остальные письма должны идти через одно заново '
+            'открытое соединение'
+        )
+
+    def test_filebased_backend(self, settings, tmp_path):
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+        settings.EMAIL_FILE_PATH = str(tmp_path)
+        enqueue()
+        call_command('send_outbox', '--once')
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1
+        assert 'to0@yamdb.fake' in files[0].read_text()
+
+    def test_failures_are_retried_with_backoff(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.FailingBackend'
+        enqueue()
+        call_command('send_outbox', '--once', '--backoff', '60')
+        email = OutboxEmail.objects.get()
+        assert email.status == OUTBOX_PENDING
+        assert email.attempts == 1
+        assert 'SMTP' in email.last_error
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что повторная попытка отложена'
+        )
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        call_command('send_outbox', '--once', '--backoff', '60')
+        email.refresh_from_db()
+        assert email.attempts == 2
+        delay = email.next_attempt_at - timezone.now()
+        assert delay.total_seconds() > 100
+
+    def test_dead_letter(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.FailingBackend'
+        enqueue()
+        for _ in range(3):
+            OutboxEmail.objects.update(next_attempt_at=timezone.now())
+            call_command('send_outbox', '--once', '--max-attempts', '3')
+        email = OutboxEmail.objects.get()
+        assert email.status == OUTBOX_DEAD
+        assert email.attempts == 3
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        call_command('send_outbox', '--once')
+        assert len(mail.outbox) == 0
@@ -0,0 +1,100 @@
+import datetime as dt
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import Comment, Review, Title
+
+REVIEWS = 12
+
+
+@pytest.fixture
+def title(django_user_model):
+    title = Title.objects.create(name='Сталкер', year=1979)
+    moment = timezone.now()
+    for i in range(REVIEWS):
+        author = django_user_model.objects.create_user(
+            username=f'author{i}', email=f'author{i}@yamdb.fake'
+        )
+        review = Review.objects.create(
+            title=title, author=author, text=f'Рецензия {i}', score=5
+        )
+        # Пары рецензий с одинаковой датой проверяют разрешение по id.
+        Review.objects.filter(pk=review.pk).update(
+            pub_date=moment - dt.timedelta(minutes=i // 2)
+        )
+    return title
+
+
+def walk(client, url, direction):
+    ids, pages = [], 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        ids.extend(item['id'] for item in data['results'])
+        url = data[direction]
+        pages += 1
+    return ids, pages
+
+
+@pytest.mark.django_db
+class TestTimelinePagination:
+
+    def test_page_number_mode_by_default(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        data = response.json()
+        assert data['count'] == REVIEWS, (
+            'Проверьте, что постраничная пагинация осталась по умолчанию'
+        )
+
+    def test_cursor_walk_forward_and_back(self, client, title):
+        expected = list(
+            Review.objects.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+        ids, pages = walk(
+            client, f'/api/v1/titles/{title.pk}/reviews/?cursor=', 'next'
+        )
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация отдаёт все рецензии '
+            'по порядку и без повторов'
+        )
+        assert pages == 3
+
+        response = client.get(f'/api/v1/titles/{title.pk}/reviews/?cursor=')
+        second = client.get(response.json()['next']).json()
+        assert 'count' not in second
+        back = client.get(second['previous']).json()
+        assert [item['id'] for item in back['results']] == expected[:5]
+        assert back['previous'] is None
+
+    def test_cursor_mode_skips_count(self, client, title):
+        with CaptureQueriesContext(connection) as context:
+            client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        assert any('"__count"' in query['sql'] for query in context)
+        with CaptureQueriesContext(connection) as context:
+            client.get(f'/api/v1/titles/{title.pk}/reviews/?cursor=')
+        assert not any('"__count"' in query['sql'] for query in context), (
+            'Проверьте, что курсорная пагинация не выполняет COUNT'
+        )
+
+    def test_comments_cursor(self, client, title, user):
+        review = Review.objects.first()
+        for i in range(7):
+            Comment.objects.create(review=review, author=user, text=str(i))
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        ids, pages = walk(client, url + '?cursor=', 'next')
+        assert ids == list(
+            review.comments.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+        assert pages == 2
+
+    def test_invalid_cursor(self, client, title):
+        response = client.get(
+            f'/api/v1/titles/{title.pk}/reviews/?cursor=broken'
+        )
+        assert response.status_code == 404
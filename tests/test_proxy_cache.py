@@ -0,0 +1,207 @@
+import json
+import os
+import shutil
+import socket
+import subprocess
+import time
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from api import proxy_cache
+from reviews.models import Genre, Title
+
+from .conftest import infra_dir_path
+
+
+@pytest.fixture
+def refreshed(settings, monkeypatch):
+    """Адреса запросов обновления вместо обращений к nginx."""
+    settings.PROXY_CACHE_REFRESH_URL = 'http://nginx:8080'
+    urls = []
+
+    class Executor:
+        def submit(self, function, *args):
+            function(*args)
+
+    class Response:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+        def read(self):
+            return b''
+
+    def fake_urlopen(request, timeout):
+        urls.append(request.full_url)
+        return Response()
+
+    monkeypatch.setattr(proxy_cache, 'get_refresh_executor', Executor)
+    monkeypatch.setattr(proxy_cache, 'urlopen', fake_urlopen)
+    return urls
+
+
+@pytest.mark.django_db
+class TestProxyCacheHeaders:
+
+    def test_anonymous(self, client, settings):
+        Genre.objects.create(name='Драма', slug='drama')
+        response = client.get('/api/v1/genres/')
+        assert response['Cache-Control'] == (
+            f'public, max-age={settings.PROXY_CACHE_SECONDS}'
+        ), 'Анонимный ответ должен разрешать кэширование в nginx'
+        assert response['Surrogate-Key'] == 'reviews.genre'
+        cached = client.get('/api/v1/genres/')
+        assert cached['Cache-Control'] == response['Cache-Control'], (
+            'Ответ из кэша приложения должен получать те же заголовки'
+        )
+        keys = client.get('/api/v1/titles/')['Surrogate-Key'].split()
+        assert 'reviews.review' in keys and 'reviews.category' in keys
+
+    def test_authenticated(self, user_client):
+        response = user_client.get('/api/v1/genres/')
+        assert response['Cache-Control'] == 'private', (
+            'Ответ пользователю с токеном не должен попадать в общий кэш'
+        )
+        assert 'Surrogate-Key' not in response
+
+    def test_reviews_are_not_cached(self, client):
+        title = Title.objects.create(name='Фильм', year=2000)
+        response = client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        assert response.status_code == 200
+        assert not response.has_header('Cache-Control')
+
+    def test_disabled(self, client, settings):
+        settings.PROXY_CACHE_SECONDS = 0
+        assert not client.get('/api/v1/genres/').has_header('Cache-Control')
+
+
+@pytest.mark.django_db
+class TestProxyCachePurge:
+
+    def test_write_refreshes_cached_paths(
+            self, client, admin_client, refreshed,
+            django_capture_on_commit_callbacks):
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/genres/?page=1')
+        client.get('/api/v1/categories/')
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.post(
+                '/api/v1/genres/', {'name': 'Комедия', 'slug': 'comedy'}
+            )
+        assert sorted(refreshed) == [
+            'http://nginx:8080/api/v1/genres/',
+            'http://nginx:8080/api/v1/genres/?page=1',
+        ], 'После записи обновляются ответы только изменённой модели'
+        refreshed.clear()
+        with django_capture_on_commit_callbacks(execute=True):
+            Genre.objects.create(name='Ужасы', slug='horror')
+        assert refreshed == [], (
+            'Обновлённые адреса запоминаются заново только после запроса'
+        )
+
+    def test_without_refresh_url(self, client, settings,
+                                 django_capture_on_commit_callbacks,
+                                 monkeypatch):
+        settings.PROXY_CACHE_REFRESH_URL = ''
+        monkeypatch.setattr(proxy_cache, 'urlopen', None)
+        client.get('/api/v1/genres/')
+        with django_capture_on_commit_callbacks(execute=True):
+            Genre.objects.create(name='Драма', slug='drama')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), 0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f'nginx не запустился на порту {port}')
+
+
+def fetch(url, **headers):
+    request = Request(url, headers={'Accept': 'application/json', **headers})
+    try:
+        with urlopen(request, timeout=5) as response:
+            return response.headers['X-Cache-Status'], json.load(response)
+    except HTTPError as error:
+        with error:
+            return error.headers['X-Cache-Status'], None
+
+
+@pytest.fixture
+def nginx(live_server, tmp_path, settings):
+    """nginx с конфигурацией из infra перед тестовым сервером Django."""
+    public, internal = free_port(), free_port()
+    with open(os.path.join(infra_dir_path, 'nginx', 'default.conf')) as f:
+        config = f.read()
+    for old, new in (
+        ('listen 80;', f'listen 127.0.0.1:{public};'),
+        ('listen 8080;', f'listen 127.0.0.1:{internal};'),
+        ('http://web:8000', live_server.url),
+        ('http://admin:8000', live_server.url),
+        ('/var/cache/nginx/api', str(tmp_path / 'cache')),
+        ('/var/html/', f'{tmp_path}/'),
+    ):
+        assert old in config, f'В default.conf нет «{old}»'
+        config = config.replace(old, new)
+    temp_paths = '\n'.join(
+        f'{name}_temp_path {tmp_path / name};'
+        for name in ('client_body', 'proxy', 'fastcgi', 'uwsgi', 'scgi')
+    )
+    (tmp_path / 'nginx.conf').write_text(
+        ('user root;\n' if os.geteuid() == 0 else '')
+        + f'daemon off;\npid {tmp_path / "nginx.pid"};\n'
+        f'error_log {tmp_path / "error.log"};\nevents {{}}\n'
+        f'http {{\naccess_log off;\n{temp_paths}\n{config}\n}}\n'
+    )
+    process = subprocess.Popen(
+        ['nginx', '-p', str(tmp_path), '-c', str(tmp_path / 'nginx.conf')]
+    )
+    try:
+        wait_for_port(public)
+        settings.PROXY_CACHE_REFRESH_URL = f'http://127.0.0.1:{internal}'
+        yield f'http://127.0.0.1:{public}'
+    finally:
+        process.terminate()
+        process.wait(5)
+
+
+@pytest.mark.skipif(shutil.which('nginx') is None,
+                    reason='nginx не установлен')
+@pytest.mark.django_db(transaction=True)
+class TestNginxMicroCache:
+
+    def test_hit_and_purge(self, nginx):
+        Genre.objects.create(name='Драма', slug='drama')
+        url = f'{nginx}/api/v1/genres/'
+        assert fetch(url)[0] == 'MISS'
+        status, data = fetch(url)
+        assert status == 'HIT', 'Повторный запрос должен отдаваться nginx'
+        assert data['count'] == 1
+        Genre.objects.create(name='Комедия', slug='comedy')
+        deadline = time.monotonic() + 5
+        while data['count'] == 1 and time.monotonic() < deadline:
+            time.sleep(0.1)
+            status, data = fetch(url)
+        assert data['count'] == 2, (
+            'После записи nginx должен отдавать обновлённый ответ'
+        )
+        assert status == 'HIT', 'Обновлённый ответ должен лежать в кэше'
+
+    def test_authorization_bypasses_cache(self, nginx):
+        url = f'{nginx}/api/v1/genres/'
+        fetch(url)
+        assert fetch(url, Authorization='Bearer token')[0] == 'BYPASS'
+        assert fetch(url, Accept='text/html')[0] == 'BYPASS'
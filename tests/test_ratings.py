@@ -0,0 +1,111 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Review, Title
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(name='Побег из Шоушенка', year=1994)
+
+
+@pytest.fixture
+def other_user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='OtherUser', email='otheruser@yamdb.fake'
+    )
+
+
+def refreshed(title):
+    title.refresh_from_db()
+    return title.rating_sum, title.rating_count
+
+
+@pytest.mark.django_db
+class TestTitleRatingAggregates:
+
+    def test_create_update_delete(self, title, user, other_user):
+        review = Review.objects.create(
+            title=title, author=user, text='Отлично', score=10
+        )
+        Review.objects.create(
+            title=title, author=other_user, text='Неплохо', score=6
+        )
+        assert refreshed(title) == (16, 2), (
+            'Проверьте, что создание рецензии обновляет агрегаты произведения'
+        )
+        assert title.rating == 8
+
+        review = Review.objects.get(pk=review.pk)
+        review.score = 4
+        review.save()
+        assert refreshed(title) == (10, 2), (
+            'Проверьте, что изменение оценки обновляет сумму оценок'
+        )
+
+        review.text = 'Передумал'
+        review.save()
+        assert refreshed(title) == (10, 2)
+
+        review.delete()
+        assert refreshed(title) == (6, 1), (
+            'Проверьте, что удаление рецензии обновляет агрегаты'
+        )
+
+    def test_cascade_from_user_deletion(self, title, user, other_user):
+        Review.objects.create(title=title, author=user, text='A', score=2)
+        Review.objects.create(
+            title=title, author=other_user, text='B', score=9
+        )
+        user.delete()
+        assert refreshed(title) == (9, 1), (
+            'Проверьте, что удаление автора пересчитывает рейтинг'
+        )
+
+    def test_title_deletion_cascades(self, title, user):
+        Review.objects.create(title=title, author=user, text='A', score=2)
+        title.delete()
+        assert not Review.objects.exists()
+
+    def test_rating_is_none_without_reviews(self, title, client):
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.status_code == 200
+        assert response.json()['rating'] is None
+
+    def test_rating_in_response(self, title, user, other_user, client):
+        Review.objects.create(title=title, author=user, text='A', score=3)
+        Review.objects.create(
+            title=title, author=other_user, text='B', score=8
+        )
+        response = client.get('/api/v1/titles/')
+        assert response.json()['results'][0]['rating'] == 5, (
+            'Проверьте, что рейтинг берётся из сохранённых агрегатов'
+        )
+
+    def test_rebuild_command(self, title, user):
+        Review.objects.create(title=title, author=user, text='A', score=7)
+        Title.objects.filter(pk=title.pk).update(rating_sum=0, rating_count=5)
+
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+
+        call_command('rebuild_ratings')
+        assert refreshed(title) == (7, 1)
+        call_command('rebuild_ratings', '--check')
+
+    def test_title_save_keeps_aggregates(self, title, user, admin_client):
+        stale = Title.objects.get(pk=title.pk)
+        Review.objects.create(title=title, author=user, text='A', score=7)
+        stale.name = 'Новое название'
+        stale.save()
+        assert refreshed(title) == (7, 1), (
+            'Проверьте, что сохранение произведения не затирает агрегаты'
+        )
+
+        response = admin_client.patch(
+            f'/api/v1/titles/{title.pk}/', {'year': 1995}, format='json'
+        )
+        assert response.status_code == 200
+        assert 'rating_sum' not in response.json()
+        assert refreshed(title) == (7, 1)
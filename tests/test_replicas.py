@@ -0,0 +1,130 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+
+from api_yamdb.replicas import ReplicaRouter
+from reviews.models import Category, Genre, Review, Title
+
+
+@pytest.fixture
+def replica(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    settings.REPLICA_PIN_SECONDS = 60
+    return 'replica'
+
+
+def create_title(using, name):
+    category, _ = Category.objects.using(using).get_or_create(
+        name='Кино', slug='movie'
+    )
+    return Title.objects.using(using).create(
+        name=name, year=2000, category=category
+    )
+
+
+def title_names(client):
+    response = client.get('/api/v1/titles/')
+    assert response.status_code == 200
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+class TestReplicaRouting:
+
+    def test_reads_go_to_replica(self, client, replica):
+        create_title('default', 'На основной')
+        create_title('replica', 'На реплике')
+        assert title_names(client) == ['На реплике'], (
+            'Безопасные запросы к API должны читать с реплики'
+        )
+
+    def test_reads_go_to_replica_under_asgi(self, replica):
+        create_title('default', 'На основной')
+        create_title('replica', 'На реплике')
+        response = async_to_sync(AsyncClient().get)('/api/v1/titles/')
+        assert [title['name'] for title in response.json()['results']] == [
+            'На реплике'
+        ], 'Под ASGI реплику должен выбирать асинхронный middleware'
+
+    def test_writes_go_to_primary(self, user, replica):
+        # Пользователь и произведение есть в обеих базах, как после
+        # репликации.
+        title = create_title('default', 'Фильм')
+        create_title('replica', 'Фильм')
+        user.save(using='replica')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            {'text': 'Отлично', 'score': 9}
+        )
+        assert response.status_code == 201
+        assert Review.objects.using('default').count() == 1, (
+            'Запись должна идти в основную базу'
+        )
+        assert not Review.objects.using('replica').exists()
+
+    def test_writer_pinned_to_primary(self, admin, replica):
+        create_title('replica', 'На реплике')
+        writer = APIClient(REMOTE_ADDR='10.0.0.1')
+        writer.force_authenticate(user=admin)
+        reader = APIClient(REMOTE_ADDR='10.0.0.2')
+        response = writer.post(
+            '/api/v1/genres/', {'name': 'Драма', 'slug': 'drama'}
+        )
+        assert response.status_code == 201
+        assert writer.get('/api/v1/genres/').json()['count'] == 1, (
+            'Автор изменений должен сразу видеть их в основной базе'
+        )
+        assert reader.get('/api/v1/genres/').json()['count'] == 0, (
+            'Остальные клиенты читают с реплики'
+        )
+
+    def test_anonymous_writes_do_not_pin(self, replica):
+        Genre.objects.create(name='Драма', slug='drama')
+        client = APIClient(REMOTE_ADDR='10.0.0.1')
+        response = client.post('/api/v1/auth/signup/', {
+            'username': 'newbie', 'email': 'newbie@yamdb.fake'
+        })
+        assert response.status_code == 200
+        assert client.get('/api/v1/genres/').json()['count'] == 0, (
+            'Анонимная регистрация не должна закреплять адрес за основной '
+            'базой'
+        )
+
+    def test_pin_disabled(self, admin, replica, settings):
+        settings.REPLICA_PIN_SECONDS = 0
+        client = APIClient(REMOTE_ADDR='10.0.0.1')
+        client.force_authenticate(user=admin)
+        client.post('/api/v1/genres/', {'name': 'Драма', 'slug': 'drama'})
+        assert client.get('/api/v1/genres/').json()['count'] == 0
+
+    def test_stale_replica_response_not_cached(self, admin, replica):
+        reader = APIClient(REMOTE_ADDR='10.0.0.2')
+        writer = APIClient(REMOTE_ADDR='10.0.0.1')
+        writer.force_authenticate(user=admin)
+        writer.post('/api/v1/genres/', {'name': 'Драма', 'slug': 'drama'})
+        assert reader.get('/api/v1/genres/').json()['count'] == 0
+        # Реплика догнала основную базу.
+        Genre.objects.using('replica').create(name='Драма', slug='drama')
+        assert reader.get('/api/v1/genres/').json()['count'] == 1, (
+            'Ответ, прочитанный с отстающей реплики, не должен кэшироваться'
+        )
+
+    def test_no_replicas(self, client):
+        create_title('default', 'На основной')
+        assert title_names(client) == ['На основной']
+
+
+class TestReplicaRouter:
+
+    def test_outside_requests_use_primary(self, settings):
+        settings.DATABASE_REPLICAS = ['replica']
+        router = ReplicaRouter()
+        assert router.db_for_read(Title) is None, (
+            'Вне запросов к API чтение должно идти в основную базу'
+        )
+        title = Title()
+        title._state.db = 'replica'
+        assert router.db_for_write(Title, instance=title) == 'default'
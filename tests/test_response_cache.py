@@ -0,0 +1,94 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Review, Title
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context), response.json()
+
+
+@pytest.fixture
+def catalog():
+    category = Category.objects.create(name='Фильмы', slug='movies')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(name='Сталкер', year=1979, category=category)
+    title.genre.set([genre])
+    return title
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/genres/', '/api/v1/categories/', '/api/v1/titles/',
+    ])
+    def test_second_request_is_cached(self, client, catalog, url):
+        queries, first = count_queries(client, url)
+        assert queries > 0
+        queries, second = count_queries(client, url)
+        assert queries == 0, (
+            'Проверьте, что повторный GET отдаётся из кэша без запросов к БД'
+        )
+        assert first == second
+
+    def test_query_string_is_part_of_key(self, client, catalog):
+        count_queries(client, '/api/v1/titles/')
+        queries, data = count_queries(client, '/api/v1/titles/?year=1980')
+        assert queries > 0
+        assert data['results'] == []
+
+    def test_role_is_part_of_key(self, client, admin_client, catalog):
+        count_queries(client, '/api/v1/genres/')
+        queries, _ = count_queries(admin_client, '/api/v1/genres/')
+        assert queries > 0
+
+    def test_write_invalidates(self, client, admin_client, catalog,
+                               django_capture_on_commit_callbacks):
+        count_queries(client, '/api/v1/genres/')
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.post(
+                '/api/v1/genres/', {'name': 'Комедия', 'slug': 'comedy'}
+            )
+        queries, data = count_queries(client, '/api/v1/genres/')
+        assert queries > 0
+        assert data['count'] == 2
+
+    def test_unrelated_write_keeps_cache(
+            self, client, catalog, django_capture_on_commit_callbacks):
+        count_queries(client, '/api/v1/genres/')
+        with django_capture_on_commit_callbacks(execute=True):
+            Category.objects.create(name='Книги', slug='books')
+        queries, _ = count_queries(client, '/api/v1/genres/')
+        assert queries == 0, (
+            'Проверьте, что запись в категории не сбрасывает кэш жанров'
+        )
+
+    def test_review_invalidates_titles(
+            self, client, user, catalog, django_capture_on_commit_callbacks):
+        url = f'/api/v1/titles/{catalog.pk}/'
+        count_queries(client, url)
+        with django_capture_on_commit_callbacks(execute=True):
+            Review.objects.create(
+                title=catalog, author=user, text='Шедевр', score=9
+            )
+        _, data = count_queries(client, url)
+        assert data['rating'] == 9
+
+    def test_genre_links_invalidate_titles(
+            self, client, catalog, django_capture_on_commit_callbacks):
+        count_queries(client, '/api/v1/titles/')
+        with django_capture_on_commit_callbacks(execute=True):
+            catalog.genre.clear()
+        _, data = count_queries(client, '/api/v1/titles/')
+        assert data['results'][0]['genre'] == []
+
+    def test_uncommitted_write_does_not_invalidate(self, client, catalog):
+        count_queries(client, '/api/v1/categories/')
+        Category.objects.create(name='Книги', slug='books')
+        queries, _ = count_queries(client, '/api/v1/categories/')
+        assert queries == 0
@@ -0,0 +1,142 @@
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Comment, Review, Title
+
+
+@pytest.fixture
+def title(django_user_model):
+    category = Category.objects.create(name='Кино', slug='movie')
+    title = Title.objects.create(name='Фильм', year=2000, category=category)
+    for number in range(3):
+        author = django_user_model.objects.create_user(
+            username=f'reader{number}', email=f'reader{number}@yamdb.fake'
+        )
+        review = Review.objects.create(
+            title=title, author=author, text='Рецензия', score=5
+        )
+        Comment.objects.create(review=review, author=author, text='Да')
+    return title
+
+
+def capture(client, method, url, data=None):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, data=data, format='json')
+    return response, [query['sql'] for query in context]
+
+
+@pytest.mark.django_db
+class TestReviewQueries:
+
+    def test_create_review(self, user_client, title):
+        response, queries = capture(
+            user_client, 'post', f'/api/v1/titles/{title.pk}/reviews/',
+            {'text': 'Отлично', 'score': 9},
+        )
+        assert response.status_code == 201, response.content
+        # Произведение, точка сохранения, INSERT, обновление рейтинга и
+        # статистики, чтение оценок и обновление строк рейтинга,
+        # освобождение точки сохранения.
+        assert len(queries) == 8, queries
+        assert sum('"reviews_title"."name"' in sql for sql in queries) == 1, (
+            'Произведение должно читаться один раз за запрос'
+        )
+
+    def test_duplicate_review(self, user_client, title):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        user_client.post(url, {'text': 'Отлично', 'score': 9})
+        response = user_client.post(url, {'text': 'Ещё раз', 'score': 1})
+        assert response.status_code == 400, (
+            'Повторная рецензия должна отклоняться с кодом 400'
+        )
+        assert 'non_field_errors' in response.json()
+        title.refresh_from_db()
+        assert title.rating_count == 4, (
+            'Отклонённая рецензия не должна попасть в рейтинг'
+        )
+
+    def test_other_integrity_error_not_reported_as_duplicate(
+            self, user_client, title, monkeypatch):
+        def broken_save(*args, **kwargs):
+            raise IntegrityError('NOT NULL constraint failed')
+
+        monkeypatch.setattr(Review, 'save', broken_save)
+        with pytest.raises(IntegrityError):
+            user_client.post(
+                f'/api/v1/titles/{title.pk}/reviews/',
+                {'text': 'Отлично', 'score': 9},
+            )
+
+    def test_review_missing_title(self, user_client):
+        response = user_client.post(
+            '/api/v1/titles/999/reviews/', {'text': 'Текст', 'score': 5}
+        )
+        assert response.status_code == 404
+
+    def test_list_reviews(self, client, title):
+        response, queries = capture(
+            client, 'get', f'/api/v1/titles/{title.pk}/reviews/'
+        )
+        assert response.status_code == 200
+        # Версия для ETag, произведение, COUNT для пагинации, рецензии
+        # с авторами.
+        assert len(queries) == 4, queries
+
+    def test_update_own_review(self, title):
+        review = Review.objects.filter(title=title).first()
+        client = APIClient()
+        client.force_authenticate(user=review.author)
+        response, queries = capture(
+            client, 'patch',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/',
+            {'text': 'Передумал'},
+        )
+        assert response.status_code == 200, response.content
+        assert not any(
+            'FROM "users_user"' in sql for sql in queries
+        ), 'Права автора должны проверяться по author_id без чтения автора'
+
+    def test_update_foreign_review(self, user_client, title):
+        review = Review.objects.filter(title=title).first()
+        response = user_client.patch(
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/',
+            {'text': 'Чужая'},
+        )
+        assert response.status_code == 403
+
+
+@pytest.mark.django_db
+class TestCommentQueries:
+
+    def test_create_comment(self, user_client, title):
+        review = Review.objects.filter(title=title).first()
+        response, queries = capture(
+            user_client, 'post',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+            {'text': 'Согласен'},
+        )
+        assert response.status_code == 201, response.content
+        # Рецензия вместе с проверкой произведения и INSERT.
+        assert len(queries) == 2, queries
+
+    def test_list_comments(self, client, title):
+        review = Review.objects.filter(title=title).first()
+        response, queries = capture(
+            client, 'get',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+        )
+        assert response.status_code == 200
+        # Версия для ETag, рецензия, COUNT для пагинации, комментарии
+        # с авторами.
+        assert len(queries) == 4, queries
+
+    def test_comment_review_of_other_title(self, user_client, title):
+        other = Title.objects.create(name='Другой', year=2001)
+        review = Review.objects.filter(title=title).first()
+        response = user_client.post(
+            f'/api/v1/titles/{other.pk}/reviews/{review.pk}/comments/',
+            {'text': 'Мимо'},
+        )
+        assert response.status_code == 404
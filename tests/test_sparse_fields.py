@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def title(django_user_model):
+    category = Category.objects.create(name='Фильмы', slug='movies')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(
+        name='Фильм', year=2000, category=category, description='Описание'
+    )
+    title.genre.set([genre])
+    author = django_user_model.objects.create_user(
+        username='reader', email='reader@yamdb.fake'
+    )
+    for number in range(3):
+        review = Review.objects.create(
+            title=Title.objects.create(name=f'Ещё {number}', year=2000),
+            author=author, text='Длинный текст', score=5,
+        )
+    review = Review.objects.create(
+        title=title, author=author, text='Длинный текст', score=8
+    )
+    Comment.objects.create(review=review, author=author, text='Ответ')
+    return title
+
+
+def get(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, response.content
+    return response.json(), [query['sql'] for query in context]
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_titles_fields(self, client, title):
+        data, queries = get(client, '/api/v1/titles/?fields=id,name')
+        assert [set(item) for item in data['results']] == [
+            {'id', 'name'}
+        ] * 4, 'В ответе должны остаться только запрошенные поля'
+        # COUNT для пагинации и сами произведения: версия для ETag берётся
+        # из кэша, жанры не загружаются.
+        assert len(queries) == 2, queries
+        assert 'description' not in queries[-1], (
+            'Из базы должны выбираться только нужные колонки'
+        )
+        assert 'rating_sum' not in queries[-1]
+
+    def test_titles_omit(self, client, title):
+        data, queries = get(
+            client, f'/api/v1/titles/{title.pk}/?omit=genre,category'
+        )
+        assert list(data) == ['id', 'rating', 'name', 'year', 'description']
+        assert not any('"reviews_genre"."slug"' in sql for sql in queries), (
+            'Жанры не должны загружаться, если их нет в ответе'
+        )
+
+    def test_reviews_and_comments(self, client, title):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        data, queries = get(client, f'{url}?fields=id&fields=score')
+        assert data['results'] == [
+            {'id': title.reviews.get().pk, 'score': 8}
+        ]
+        assert '"text"' not in queries[-1]
+        data, _ = get(client, f'{url}?fields=id&cursor=')
+        assert list(data['results'][0]) == ['id'], (
+            'Курсор должен работать и без поля pub_date в ответе'
+        )
+        review = title.reviews.get()
+        data, _ = get(client, f'{url}{review.pk}/comments/?omit=text,id')
+        assert list(data['results'][0]) == ['author', 'pub_date']
+
+    def test_genres(self, client, title):
+        data, _ = get(client, '/api/v1/genres/?fields=slug')
+        assert data['results'] == [{'slug': 'drama'}]
+
+    @pytest.mark.parametrize('query', ['fields=id,secret', 'omit=secret'])
+    def test_unknown_field(self, client, title, query):
+        response = client.get(f'/api/v1/titles/?{query}')
+        assert response.status_code == 400
+        assert 'secret' in str(response.json()), (
+            'Неизвестное поле должно быть ошибкой запроса'
+        )
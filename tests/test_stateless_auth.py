@@ -0,0 +1,116 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.authentication import UserClaimsRefreshToken
+
+
+def get_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def user_queries(queries):
+    return [
+        query['sql'] for query in queries
+        if 'FROM "users_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestStatelessAuth:
+
+    def test_token_contains_claims(self, admin):
+        token = UserClaimsRefreshToken.for_user(admin).access_token
+        assert token['username'] == admin.username, (
+            'Токен должен содержать имя пользователя'
+        )
+        assert token['role'] == 'admin', 'Токен должен содержать роль'
+        assert token['ver'] == admin.token_version, (
+            'Токен должен содержать версию токенов пользователя'
+        )
+
+    def test_warm_request_does_not_load_user(self, admin):
+        token = UserClaimsRefreshToken.for_user(admin).access_token
+        client = get_client(token)
+        response = client.get('/api/v1/users/')
+        assert response.status_code == 200
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                '/api/v1/genres/', {'name': 'Жанр', 'slug': 'genre'}
+            )
+        assert response.status_code == 201, (
+            'Администратор с токеном должен проходить проверку прав'
+        )
+        assert not user_queries(context.captured_queries), (
+            'При тёплом кэше аутентификация не должна читать пользователя'
+        )
+
+    def test_deferred_fields_loaded_in_one_query(self, user):
+        token = UserClaimsRefreshToken.for_user(user).access_token
+        client = get_client(token)
+        client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+        assert response.json()['email'] == user.email
+        assert len(user_queries(context.captured_queries)) == 1, (
+            'Недостающие поля пользователя должны догружаться одним запросом'
+        )
+
+    def test_profile_update_keeps_token(self, user):
+        token = UserClaimsRefreshToken.for_user(user).access_token
+        client = get_client(token)
+        response = client.patch('/api/v1/users/me/', {'bio': 'Обо мне'})
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert user.bio == 'Обо мне'
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == 200, (
+            'Изменение полей вне токена не должно отзывать токен'
+        )
+
+    def test_role_change_revokes_token(self, user, admin):
+        token = UserClaimsRefreshToken.for_user(admin).access_token
+        client = get_client(token)
+        assert client.get('/api/v1/users/').status_code == 200
+        admin.role = 'user'
+        admin.save()
+        response = client.get('/api/v1/users/')
+        assert response.status_code == 401, (
+            'Смена роли должна отзывать выданные токены'
+        )
+        new_token = UserClaimsRefreshToken.for_user(admin).access_token
+        response = get_client(new_token).get('/api/v1/users/')
+        assert response.status_code == 403, (
+            'Новый токен должен нести новую роль'
+        )
+
+    def test_deactivation_revokes_token(self, user):
+        token = UserClaimsRefreshToken.for_user(user).access_token
+        client = get_client(token)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Блокировка пользователя должна отзывать токены'
+        )
+
+    def test_deleted_user_token_rejected(self, user):
+        token = UserClaimsRefreshToken.for_user(user).access_token
+        client = get_client(token)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        user.delete()
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Токены удалённого пользователя не должны приниматься'
+        )
+
+    def test_legacy_token_accepted(self, user):
+        token = RefreshToken.for_user(user).access_token
+        response = get_client(token).get('/api/v1/users/me/')
+        assert response.status_code == 200, (
+            'Токены без новых утверждений должны приниматься'
+        )
@@ -0,0 +1,122 @@
+import csv
+import io
+import json
+import tracemalloc
+
+import pytest
+from django.utils import timezone
+
+from reviews.models import Category, Genre, GenreTitle, Review, Title
+
+
+def create_catalog(size):
+    category = Category.objects.create(name='Кино', slug='movie')
+    genres = [
+        Genre.objects.create(name=f'Жанр {index}', slug=f'genre-{index}')
+        for index in range(3)
+    ]
+    Title.objects.bulk_create(
+        Title(name=f'Фильм {index}', year=2000, category=category,
+              description='Описание ' * 10)
+        for index in range(size)
+    )
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title_id_id=title_id, genre_id=genres[title_id % 3])
+        for title_id in Title.objects.values_list('id', flat=True)
+    )
+
+
+def consume_peak(client, path):
+    """Пиковый объём памяти, выделенной при чтении потокового ответа."""
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.streaming, 'Выгрузка должна отдаваться потоком'
+    tracemalloc.start()
+    lines = 0
+    for part in response.streaming_content:
+        lines += part.count(b'\n')
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return lines, peak
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleExport:
+
+    def test_ndjson(self, admin_client, user):
+        create_catalog(3)
+        title = Title.objects.order_by('id').first()
+        Review.objects.create(title=title, author=user, score=7, text='Да')
+        response = admin_client.get('/api/v1/titles/export/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        records = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        assert len(records) == 3
+        first = records[0]
+        assert first['id'] == title.id
+        assert first['category'] == {'name': 'Кино', 'slug': 'movie'}
+        assert first['genre'] == [{
+            'name': title.genre.get().name, 'slug': title.genre.get().slug
+        }]
+        assert first['rating'] == 7, 'Выгрузка должна содержать рейтинг'
+        assert 'updated_at' in first
+
+    def test_csv(self, admin_client):
+        create_catalog(2)
+        response = admin_client.get('/api/v1/titles/export/?output=csv')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/csv')
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert len(rows) == 2
+        assert rows[0]['category'] == 'movie'
+        assert rows[0]['genre'].startswith('genre-')
+        assert rows[0]['rating'] == ''
+
+    def test_since(self, admin_client):
+        create_catalog(3)
+        since = timezone.now()
+        title = Title.objects.order_by('id').last()
+        title.name = 'Новое название'
+        title.save()
+        response = admin_client.get(
+            '/api/v1/titles/export/', {'since': since.isoformat()}
+        )
+        records = b''.join(response.streaming_content).splitlines()
+        assert [json.loads(line)['id'] for line in records] == [title.id], (
+            'Параметр since должен отбирать изменённые произведения'
+        )
+        response = admin_client.get(
+            '/api/v1/titles/export/', {'since': 'вчера'}
+        )
+        assert response.status_code == 400
+        response = admin_client.get(
+            '/api/v1/titles/export/', {'output': 'xml'}
+        )
+        assert response.status_code == 400
+
+    def test_admin_only(self, client, user_client):
+        assert client.get('/api/v1/titles/export/').status_code == 401
+        assert user_client.get('/api/v1/titles/export/').status_code == 403
+
+    def test_memory_is_flat(self, admin_client, settings):
+        settings.EXPORT_CHUNK_SIZE = 100
+        create_catalog(300)
+        small_lines, small_peak = consume_peak(
+            admin_client, '/api/v1/titles/export/'
+        )
+        Title.objects.all().delete()
+        Category.objects.all().delete()
+        Genre.objects.all().delete()
+        create_catalog(3000)
+        large_lines, large_peak = consume_peak(
+            admin_client, '/api/v1/titles/export/'
+        )
+        assert (small_lines, large_lines) == (300, 3000)
+        assert large_peak < small_peak * 2, (
+            'Память при выгрузке не должна расти вместе с каталогом: '
+            f'{small_peak} байт на 300 строк, {large_peak} на 3000'
+        )
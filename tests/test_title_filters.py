@@ -0,0 +1,130 @@
+import pytest
+from django.db import connection
+
+from api.filters import TitleFilter
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def catalog():
+    movies = Category.objects.create(name='Фильмы', slug='movies')
+    books = Category.objects.create(name='Книги', slug='books')
+    rock = Genre.objects.create(name='Рок', slug='rock')
+    hard_rock = Genre.objects.create(name='Хард-рок', slug='hard-rock')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    titles = {
+        'alpha': (1999, movies, [rock, drama]),
+        'beta': (2005, movies, [hard_rock]),
+        'gamma': (2010, books, [rock]),
+        'delta': (1919, books, [drama]),
+    }
+    for name, (year, category, genres) in titles.items():
+        title = Title.objects.create(name=name, year=year, category=category)
+        title.genre.set(genres)
+
+
+def filtered(params):
+    queryset = TitleFilter(params, queryset=Title.objects.all()).qs
+    return sorted(queryset.values_list('name', flat=True))
+
+
+def plan(params):
+    return TitleFilter(params, queryset=Title.objects.all()).qs.explain()
+
+
+@pytest.mark.django_db
+class TestTitleFilter:
+
+    def test_year_is_exact(self, catalog):
+        assert filtered({'year': 1999}) == ['alpha'], (
+            'Проверьте, что год сравнивается целиком, а не как подстрока'
+        )
+        assert filtered({'year': 19}) == []
+
+    def test_year_range(self, catalog):
+        assert filtered({'year_min': 2000}) == ['beta', 'gamma']
+        assert filtered({'year_max': 1999}) == ['alpha', 'delta']
+        assert filtered({'year_min': 1990, 'year_max': 2005}) == [
+            'alpha', 'beta'
+        ]
+
+    def test_slugs_are_exact(self, catalog):
+        assert filtered({'genre': 'rock'}) == ['alpha', 'gamma'], (
+            'Проверьте, что genre=rock не находит hard-rock'
+        )
+        assert filtered({'category': 'movie'}) == []
+        assert filtered({'category': 'movies'}) == ['alpha', 'beta']
+
+    def test_genre_any(self, catalog):
+        assert filtered({'genre': 'rock,hard-rock'}) == [
+            'alpha', 'beta', 'gamma'
+        ]
+
+    def test_genre_repeated_params(self, client, catalog):
+        response = client.get(
+            '/api/v1/titles/?genre=rock&genre=drama&genre_mode=and'
+        )
+        names = [item['name'] for item in response.json()['results']]
+        assert names == ['alpha'], (
+            'Проверьте, что genre_mode=and оставляет произведения со всеми '
+            'жанрами'
+        )
+
+    def test_genre_all(self, catalog):
+        assert filtered({'genre': 'rock,drama', 'genre_mode': 'and'}) == [
+            'alpha'
+        ]
+        assert filtered({'genre': 'rock,hard-rock', 'genre_mode': 'and'}) == []
+
+    def test_invalid_genre_mode(self, client, catalog):
+        response = client.get('/api/v1/titles/?genre=rock&genre_mode=xor')
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'sqlite',
+                    reason='План запроса SQLite')
+class TestTitleFilterSqlitePlans:
+
+    def test_year_uses_index(self, catalog):
+        for params in ({'year': 1999}, {'year_min': 1990, 'year_max': 2000}):
+            query_plan = plan(params)
+            assert 'reviews_title_year' in query_plan, query_plan
+            assert 'SCAN reviews_title' not in query_plan, query_plan
+
+    def test_category_uses_slug_index(self, catalog):
+        query_plan = plan({'category': 'movies'})
+        assert 'sqlite_autoindex_reviews_category' in query_plan, query_plan
+        assert 'reviews_title_category_id' in query_plan, query_plan
+
+    @pytest.mark.parametrize('mode', ['or', 'and'])
+    def test_genre_uses_slug_index(self, catalog, mode):
+        query_plan = plan({'genre': 'rock,drama', 'genre_mode': mode})
+        assert 'sqlite_autoindex_reviews_genre' in query_plan, query_plan
+        assert 'reviews_genretitle_' in query_plan, query_plan
+        assert 'SCAN reviews_title' not in query_plan, query_plan
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'postgresql',
+                    reason='План запроса Postgres')
+class TestTitleFilterPostgresPlans:
+
+    @pytest.fixture(autouse=True)
+    def no_seqscan(self, catalog):
+        # На маленьких таблицах Postgres выбирает полный просмотр даже при
+        # наличии индекса, поэтому проверяется лишь возможность его взять.
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    @pytest.mark.parametrize('params', [
+        {'year': 1999},
+        {'year_min': 1990, 'year_max': 2000},
+        {'category': 'movies'},
+        {'genre': 'rock,drama'},
+        {'genre': 'rock,drama', 'genre_mode': 'and'},
+    ])
+    def test_filters_use_indexes(self, params):
+        query_plan = plan(params)
+        assert 'Index' in query_plan, query_plan
+        assert 'Seq Scan on reviews_title' not in query_plan, query_plan
@@ -0,0 +1,87 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+def seed_catalog(titles, genres_per_title):
+    category = Category.objects.create(name='Фильмы', slug='movies')
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(genres_per_title)
+    ]
+    for i in range(titles):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000, category=category
+        )
+        title.genre.set(genres)
+    return Title.objects.order_by('id').first()
+
+
+def count_queries(client, method, url, data=None):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, data=data, format='json')
+    assert response.status_code < 300, response.content
+    return len(context)
+
+
+@pytest.mark.django_db
+class TestTitleQueryBudget:
+
+    @pytest.mark.parametrize('titles,genres', [(1, 1), (5, 1), (10, 6)])
+    def test_list(self, client, titles, genres):
+        seed_catalog(titles, genres)
+        # COUNT для пагинации, произведения с категорией, жанры страницы;
+        # версия для ETag берётся из кэша.
+        assert count_queries(client, 'get', '/api/v1/titles/') == 3, (
+            'Проверьте, что список произведений получается за постоянное '
+            'число запросов'
+        )
+
+    @pytest.mark.parametrize('genres', [0, 1, 6])
+    def test_retrieve(self, client, genres):
+        title = seed_catalog(1, genres)
+        url = f'/api/v1/titles/{title.pk}/'
+        # Версия для ETag, произведение с категорией, жанры.
+        assert count_queries(client, 'get', url) == 3
+
+    @pytest.mark.parametrize('genres', [1, 6])
+    def test_create(self, admin_client, genres):
+        seed_catalog(0, genres)
+        data = {
+            'name': 'Новое',
+            'year': 2001,
+            'category': 'movies',
+            'genre': [f'genre-{i}' for i in range(genres)],
+        }
+        # Категория, жанры одним запросом, INSERT, строки рейтинга,
+        # чтение текущих связей, проверка и вставка новых связей, оценки
+        # и строки рейтинга жанров, жанры для ответа.
+        assert count_queries(admin_client, 'post', '/api/v1/titles/',
+                             data) == 10
+
+    @pytest.mark.parametrize('genres', [1, 6])
+    def test_partial_update(self, admin_client, genres):
+        title = seed_catalog(1, 1)
+        for i in range(genres):
+            Genre.objects.create(name=f'Ещё {i}', slug=f'extra-{i}')
+        data = {
+            'name': 'Переименовано',
+            'genre': [f'extra-{i}' for i in range(genres)],
+        }
+        url = f'/api/v1/titles/{title.pk}/'
+        # Объект с категорией, жанры из запроса, UPDATE, чтение текущих
+        # связей, выборка и удаление старых (на удаление связей подписаны
+        # инвалидация кэша и рейтинг жанра), проверка и вставка новых
+        # связей, оценки и строки рейтинга новых жанров, жанры для ответа.
+        assert count_queries(admin_client, 'patch', url, data) == 12
+
+    def test_unknown_genre_slug(self, admin_client):
+        seed_catalog(0, 1)
+        response = admin_client.post('/api/v1/titles/', {
+            'name': 'Новое', 'year': 2001, 'category': 'movies',
+            'genre': ['genre-0', 'missing'],
+        }, format='json')
+        assert response.status_code == 400
+        assert 'missing' in str(response.json()['genre'])
@@ -0,0 +1,170 @@
+import math
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Category, Genre, Review, Title, TitleRanking
+from reviews.ranking import trending_score
+
+
+@pytest.fixture(autouse=True)
+def prior(settings):
+    settings.RANKING_PRIOR_MEAN = 6.0
+    settings.RANKING_PRIOR_WEIGHT = 10
+
+
+@pytest.fixture
+def readers(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=f'reader{number}', email=f'reader{number}@yamdb.fake'
+        )
+        for number in range(5)
+    ]
+
+
+@pytest.fixture
+def catalog():
+    movies = Category.objects.create(name='Фильмы', slug='movies')
+    books = Category.objects.create(name='Книги', slug='books')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    titles = {
+        name: Title.objects.create(name=name, year=2000, category=category)
+        for name, category in (
+            ('один', movies), ('много', movies), ('пусто', books),
+        )
+    }
+    titles['много'].genre.set([drama])
+    return titles
+
+
+def review(title, reader, score):
+    return Review.objects.create(
+        title=title, author=reader, text='Текст', score=score
+    )
+
+
+def names(client, query):
+    response = client.get(f'/api/v1/titles/?{query}')
+    assert response.status_code == 200, response.content
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestTitleRanking:
+
+    def test_bayesian_rank(self, client, catalog, readers):
+        review(catalog['один'], readers[0], 10)
+        for reader in readers:
+            review(catalog['много'], reader, 9)
+        assert names(client, 'ordering=rank') == ['много', 'один', 'пусто'], (
+            'Одна высокая оценка не должна обгонять много высоких, а '
+            'произведения без рецензий должны оставаться в выдаче'
+        )
+
+    def test_trending(self, client, catalog, readers):
+        review(catalog['один'], readers[0], 1)
+        for reader in readers[:3]:
+            review(catalog['пусто'], reader, 1)
+        assert names(client, 'ordering=trending') == [
+            'пусто', 'один', 'много'
+        ]
+
+    def test_trending_score_does_not_need_decay(self, settings):
+        half_life = settings.REVIEW_VELOCITY_HALF_LIFE
+        now = 1.7e9
+        later = now + 3 * half_life
+        assert trending_score(2, 4.0, now) == pytest.approx(
+            trending_score(2, 4.0 * 2 ** -3, later)
+        ), 'Оценка не должна зависеть от момента, к которому приведена'
+        assert trending_score(1, 1.0, now) == pytest.approx(
+            now / half_life
+        )
+        assert trending_score(0, 0.0, now) == 0.0
+
+    def test_scopes_from_filters(self, client, catalog, readers):
+        review(catalog['один'], readers[0], 10)
+        assert names(client, 'ordering=rank&category=movies') == [
+            'один', 'много'
+        ]
+        assert names(client, 'ordering=rank&genre=drama') == ['много']
+        assert names(client, 'ordering=rank&category=missing') == []
+
+    def test_scopes_follow_changes(self, catalog):
+        title = Title.objects.get(pk=catalog['много'].pk)
+        movies, books = Category.objects.order_by('pk')
+        title.category = books
+        title.save()
+        title.genre.clear()
+
+        def scopes():
+            return set(TitleRanking.objects.filter(
+                title=title
+            ).values_list('scope', flat=True))
+
+        assert scopes() == {'all', f'category:{books.pk}'}, (
+            'Смена категории и жанров должна переносить произведение '
+            'между областями рейтинга'
+        )
+        books.delete()
+        assert scopes() == {'all'}
+
+    def test_score_updates(self, catalog, readers):
+        title = catalog['один']
+        first = review(title, readers[0], 10)
+        review(title, readers[1], 2)
+        first.score = 4
+        first.save()
+        first.delete()
+        rows = TitleRanking.objects.filter(title=title)
+        assert len(rows) == 2
+        for row in rows:
+            assert row.rank_score == pytest.approx((10 * 6.0 + 2) / 11)
+
+    def test_bulk_created_titles(self, admin_client):
+        Category.objects.create(name='Фильмы', slug='movies')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        response = admin_client.post('/api/v1/titles/', [
+            {'name': f'Фильм {index}', 'year': 2000, 'category': 'movies',
+             'genre': ['drama']}
+            for index in range(3)
+        ], format='json')
+        assert response.status_code == 201, response.content
+        assert TitleRanking.objects.filter(
+            scope=f'genre:{genre.pk}'
+        ).count() == 3
+
+    def test_invalid_ordering(self, client):
+        response = client.get('/api/v1/titles/?ordering=name')
+        assert response.status_code == 400
+        assert 'ordering' in response.json()
+
+    def test_title_deleted_with_reviews(self, catalog, readers):
+        review(catalog['один'], readers[0], 5)
+        catalog['один'].delete()
+        assert not TitleRanking.objects.filter(
+            title_id=catalog['один'].pk
+        ).exists()
+
+
+@pytest.mark.django_db
+class TestRebuildRankings:
+
+    def test_check_and_rebuild(self, catalog, readers):
+        review(catalog['один'], readers[0], 10)
+        Review.objects.bulk_create([
+            Review(title=catalog['пусто'], author=readers[1], text='Текст',
+                   score=1)
+        ])
+        call_command('rebuild_ratings')
+        TitleRanking.objects.filter(title=catalog['много']).delete()
+        with pytest.raises(CommandError) as error:
+            call_command('rebuild_rankings', '--check')
+        for title in ('пусто', 'много'):
+            assert str(catalog[title].pk) in str(error.value)
+        call_command('rebuild_rankings')
+        row = TitleRanking.objects.get(title=catalog['пусто'], scope='all')
+        assert math.isclose(row.rank_score, (10 * 6.0 + 1) / 11)
+        assert TitleRanking.objects.filter(title=catalog['много']).count() == 3
+        call_command('rebuild_rankings', '--check')
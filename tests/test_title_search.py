@@ -0,0 +1,62 @@
+import pytest
+
+from reviews.models import Title
+
+
+@pytest.fixture
+def catalog():
+    Title.objects.create(
+        name='Властелин колец', year=2001,
+        description='Фэнтези о кольце всевластья'
+    )
+    Title.objects.create(
+        name='Хоббит', year=2012, description='Предыстория про кольцо'
+    )
+    Title.objects.create(
+        name='Властелин мира', year=1990, description='Комедия'
+    )
+    Title.objects.create(name='Матрица', year=1999, description='Кольцо')
+    Title.objects.create(name='Matrix', year=1999)
+
+
+def names(response):
+    assert response.status_code == 200
+    return [item['name'] for item in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_search_orders_by_relevance(self, client, catalog):
+        response = client.get('/api/v1/titles/', {'search': 'Властелин'})
+        assert names(response) == ['Властелин колец', 'Властелин мира'], (
+            'Проверьте, что параметр search ищет по названию'
+        )
+
+    def test_name_match_ranks_higher(self, client, catalog):
+        Title.objects.create(
+            name='Кольцо', year=2002, description='Ужасы'
+        )
+        response = client.get('/api/v1/titles/', {'search': 'Кольцо'})
+        assert names(response)[0] == 'Кольцо', (
+            'Проверьте, что совпадение в названии важнее описания'
+        )
+        assert 'Матрица' in names(response)
+
+    def test_search_without_matches(self, client, catalog):
+        response = client.get('/api/v1/titles/', {'search': 'Бэтмен'})
+        assert names(response) == []
+
+    def test_typeahead_prefix(self, client, catalog):
+        response = client.get('/api/v1/titles/', {'prefix': 'Влас'})
+        assert names(response) == ['Властелин колец', 'Властелин мира'], (
+            'Проверьте, что параметр prefix ищет по началу названия'
+        )
+        assert names(client.get('/api/v1/titles/', {'prefix': 'олец'})) == []
+        # SQLite сравнивает без учёта регистра только латиницу.
+        response = client.get('/api/v1/titles/', {'prefix': 'matr'})
+        assert names(response) == ['Matrix']
+
+    def test_search_vector_hidden(self, client, catalog):
+        response = client.get('/api/v1/titles/')
+        assert 'search_vector' not in response.json()['results'][0]
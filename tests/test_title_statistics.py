@@ -0,0 +1,136 @@
+import math
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title, TitleStatistics
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(name='Побег из Шоушенка', year=1994)
+
+
+@pytest.fixture
+def readers(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=f'reader{number}', email=f'reader{number}@yamdb.fake'
+        )
+        for number in range(4)
+    ]
+
+
+def stats(client, title):
+    response = client.get(f'/api/v1/titles/{title.pk}/stats/')
+    assert response.status_code == 200, response.content
+    return response.json()
+
+
+@pytest.mark.django_db
+class TestTitleStatistics:
+
+    def test_maintained_from_reviews(self, client, title, readers):
+        reviews = [
+            Review.objects.create(
+                title=title, author=reader, text='Текст', score=score
+            )
+            for reader, score in zip(readers, (10, 10, 7, 3))
+        ]
+        data = stats(client, title)
+        assert data['review_count'] == 4
+        assert data['scores'] == {
+            str(score): {3: 1, 7: 1, 10: 2}.get(score, 0)
+            for score in range(1, 11)
+        }, 'Проверьте, что оценки раскладываются по корзинам'
+        assert data['average'] == 7.5
+
+        review = Review.objects.get(pk=reviews[2].pk)
+        review.score = 1
+        review.save()
+        reviews[0].delete()
+        data = stats(client, title)
+        assert data['review_count'] == 3
+        assert (data['scores']['1'], data['scores']['7'],
+                data['scores']['10']) == (1, 0, 1), (
+            'Изменение и удаление рецензий должны обновлять статистику'
+        )
+
+    def test_review_moved_to_other_title(self, client, title, readers):
+        other = Title.objects.create(name='Другой', year=2000)
+        review = Review.objects.create(
+            title=title, author=readers[0], text='Текст', score=5
+        )
+        review.title = other
+        review.save()
+        assert stats(client, title)['review_count'] == 0
+        assert stats(client, other)['scores']['5'] == 1
+
+    def test_velocity(self, client, title, readers, settings):
+        for reader in readers:
+            Review.objects.create(
+                title=title, author=reader, text='Текст', score=5
+            )
+        expected = 4 * math.log(2) / settings.REVIEW_VELOCITY_HALF_LIFE
+        assert stats(client, title)['velocity'] == pytest.approx(
+            expected * 86400, rel=1e-3
+        ), 'Скорость должна учитывать свежие рецензии с весом около 1'
+
+    def test_single_primary_key_read(self, client, title, readers):
+        Review.objects.create(
+            title=title, author=readers[0], text='Текст', score=5
+        )
+        with CaptureQueriesContext(connection) as queries:
+            stats(client, title)
+        assert len(queries) == 1, (
+            'Статистика должна читаться одним запросом по первичному ключу'
+        )
+
+    def test_title_without_statistics(self, client, title, readers):
+        Review.objects.bulk_create([
+            Review(title=title, author=readers[0], text='Текст', score=8)
+        ])
+        data = stats(client, title)
+        assert (data['review_count'], data['scores']['8']) == (1, 1), (
+            'Без строки статистики она должна считаться по рецензиям'
+        )
+        empty = Title.objects.create(name='Пустое', year=2000)
+        assert stats(client, empty)['average'] is None
+
+    def test_missing_title(self, client):
+        assert client.get('/api/v1/titles/999/stats/').status_code == 404
+        assert client.get('/api/v1/titles/abc/stats/').status_code == 404
+
+    def test_title_deleted_with_reviews(self, title, readers):
+        Review.objects.create(
+            title=title, author=readers[0], text='Текст', score=5
+        )
+        title.delete()
+        assert not TitleStatistics.objects.exists()
+
+
+@pytest.mark.django_db
+class TestRebuildStatistics:
+
+    def test_check_and_rebuild(self, title, readers):
+        Review.objects.create(
+            title=title, author=readers[0], text='Текст', score=5
+        )
+        other = Title.objects.create(name='Другой', year=2000)
+        Review.objects.bulk_create([
+            Review(title=other, author=readers[1], text='Текст', score=9)
+        ])
+        TitleStatistics.objects.filter(pk=title.pk).update(score_5=3)
+        with pytest.raises(CommandError) as error:
+            call_command('rebuild_statistics', '--check')
+        assert str(title.pk) in str(error.value)
+        assert str(other.pk) in str(error.value), (
+            'Проверка должна находить произведения без строки статистики'
+        )
+        call_command('rebuild_statistics')
+        assert TitleStatistics.objects.get(pk=title.pk).score_5 == 1
+        assert TitleStatistics.objects.get(pk=other.pk).score_9 == 1
+        call_command('rebuild_statistics', '--check')